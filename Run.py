@@ -1,182 +1,244 @@
-#!/usr/bin/env python3
-
-# See you, space cowboy...
-
-import time
-import json
-import tradeogre
-from tradeogre import TradeOgre
-from funcs import *
-
-# ----[ CONFIG ]-----------------------------------------------
-with open("bountybot_config.json") as f:
-    CONFIG = json.load(f)
-
-# Load API creds
-with open(CONFIG['api_key_file']) as f:
-    key = f.readline().strip()
-    secret = f.readline().strip()
-
-# Create TradeOgre instance using only config args
-trade_ogre = tradeogre.TradeOgre(
-    key,
-    secret,
-    CONFIG["order_amount"],
-    CONFIG["grid_spacing"],
-    CONFIG["min_price"],
-    CONFIG["max_price"],
-    CONFIG["max_active_orders"]
-)
-# ------------------------------------------------------------
-
-def log(msg):
-    """Print, Bebop style."""
-    print(f"{get_time()} -- {msg}")
-
-def sleepy(secs=1):
-    """Jazz break."""
-    time.sleep(secs)
-
-ticker = trade_ogre.ticker(CONFIG['bot_ticker'])
-if not ticker or 'ask' not in ticker:
-    print(f"~*~~*~ ED PANIC!! {CONFIG['bot_ticker']} ticker lost in cyberspace. No 'ask' found! Look: {ticker} -- Bouncy, bounce, fix the connection, puhpuhpuhlease! ~*~~*~")
-    exit(1)
-sleepy()
-btc_bal = trade_ogre.balance(ticker_base_currency(CONFIG['bot_ticker']))['available']
-sleepy()
-pair_bal = trade_ogre.balance(ticker_pair_currency(CONFIG['bot_ticker']))['available']
-def get_balance_safe(asset):
-    try:
-        resp = trade_ogre.balance(asset)
-        if not isinstance(resp, dict) or 'available' not in resp:
-            print(f"(>^_^)> [ED-ALERT] Balance vanish! Asset={asset}. API mumbled: {resp} ~ Chasing it through cyberspace now!")
-            return 0.0
-        return float(resp['available'] or 0)
-    except Exception as ex:
-        print(f"ED KA-BOOM! Trouble grabbing balance for {asset}! Exception says: {ex} ... Ed rolls across keyboard dramatically!")
-        return 0.0
-def place_order_safe(side, ticker, amount, price):
-    try:
-        if side == 'buy':
-            resp = trade_ogre.buy(ticker, amount, price)
-        else:
-            resp = trade_ogre.sell(ticker, amount, price)
-        if not isinstance(resp, dict):
-            print(f"(=^.^=) ED SQUAWK! {side.upper()} order glitched—got a weird response: {resp} :O")
-            return None
-        if not resp.get("success", True):
-            print(f"ED RASPBERRY! {side.upper()} order REJECTED at {price}! API says: {resp.get('error', resp)} Whyyyyy?! >_<")
-            return None
-        if "uuid" not in resp:
-            print(f"ED FACEPLANT! {side.upper()} order at {price} has no uuid! Mysterious API: {resp} ... Ed grabs skateboard and chases it.")
-            return None
-        return resp
-    except Exception as exc:
-        print(f"(x_X) ED EXPLODE! {side.upper()} order at {price} blew up with: {exc} ... Send help! WHEEE!")
-        return None
-
-
-def bountiful_log(cfg, btc_bal, pair_bal, bot_trade_size):
-    """Startup log, Bebop chatter."""
-    print(f"-- [==BountyBotSUPER==trading==>: {cfg['bot_ticker']}] --")
-    print(f"-- Gridding {cfg['grid_count']} trades @ {bot_trade_size} creds each. --")
-    print(f"-- Wallet check: {ticker_base_currency(cfg['bot_ticker'])}: {btc_bal} | {ticker_pair_currency(cfg['bot_ticker'])}: {pair_bal} --\n")
-
-if __name__ == '__main__':
-    try:
-        ticker = trade_ogre.ticker(CONFIG['bot_ticker'])
-        if not isinstance(ticker, dict) or 'ask' not in ticker:
-            raise ValueError(f"Bad ticker data: {ticker}")
-    except Exception as exc:
-        print(f"[Ed WARN] Cannot fetch market ticker for {CONFIG['bot_ticker']}: {exc}")
-        exit(1)
-    # --- Init & grid setup ---
-    lower = float(ticker['ask']) + CONFIG['buffer']
-    print("DEBUG: Ticker response:", ticker)
-    bot_trade_size = CONFIG['order_amount']
-    grid_count = CONFIG['grid_count']
-    upper = CONFIG['max_price']
-    grid_levels = generate_grid(lower, upper, grid_count)
-    gridstep = grid_levels[1] - grid_levels[0]
-    current_price = float(ticker['ask'])
-    bountiful_log(CONFIG, btc_bal, pair_bal, bot_trade_size)
-    # Split grid into buy (below) and sell (at/above) bands
-    buy_prices = [p for p in grid_levels if p < current_price]
-    sell_prices = [p for p in grid_levels if p >= current_price]
-
-    orders = []
-    asset_base = ticker_base_currency(CONFIG['bot_ticker'])   # XTM
-    asset_quote = ticker_pair_currency(CONFIG['bot_ticker'])  # USDT
-
-    # --- Place buy grid orders below current price ---
-    for price in buy_prices:
-        bal_usdt = float(trade_ogre.balance(asset_quote).get('available', 0) or 0)
-        if bot_trade_size * price < 1:
-            print(f"Skipping BUY @{price}, size below minimum!")
-            continue
-        if bot_trade_size * price > bal_usdt:
-            print(f"Not enough USDT for BUY {bot_trade_size} {asset_base} @ {price}")
-            continue
-        resp = trade_ogre.buy(CONFIG['bot_ticker'], bot_trade_size, price)
-        if 'uuid' in resp:
-            orders.append({'uuid': resp['uuid'], 'type': 'buy', 'price': price})
-        sleepy(0.2)
-
-    # --- Place sell grid orders at/above current price ---
-    for price in sell_prices:
-        bal_xtm = get_balance_safe(asset_base)
-        if bot_trade_size > bal_xtm:
-            print(f"Not enough {asset_base} for SELL {bot_trade_size} @ {price}")
-            continue
-        resp = trade_ogre.sell(CONFIG['bot_ticker'], bot_trade_size, price)
-        if 'uuid' in resp:
-            orders.append({'uuid': resp['uuid'], 'type': 'sell', 'price': price})
-        sleepy(0.2)
-
-    print("Jet: Orders placed. Let the cosmic jazz commence.")
-    trades_filled = 0
-    pulse = 0
-    error_count = 0
-
-    # --- Main event loop ---
-    pulse = 0
-    trades_filled = 0
-    error_count = 0
-
-    try:
-        while True:
-            try:
-                sleepy(CONFIG['pulse_secs'])
-                pulse += 1
-
-                open_uuids = [o['uuid'] for o in trade_ogre.orders(CONFIG['bot_ticker'])]
-
-                for order in orders:
-                    if order['uuid'] not in open_uuids:
-                        print(f"Ed: Order at {order['price']} filled, time to FLIP! 🤩")
-                        # Flip logic
-                        if order['type'] == 'sell':
-                            order['type'] = 'buy'
-                            order['price'] -= gridstep
-                            resp = trade_ogre.buy(CONFIG['bot_ticker'], bot_trade_size, order['price'])
-                        else:
-                            order['type'] = 'sell'
-                            order['price'] += gridstep
-                            resp = trade_ogre.sell(CONFIG['bot_ticker'], bot_trade_size, order['price'])
-                        order['uuid'] = resp['uuid']
-                        print(f"Ed: Now {order['type']} at {order['price']}... WHEEE!")
-                        trades_filled += 1
-
-                if pulse == CONFIG['pulse_echo']:
-                    log(f"~o~ ED PULSE CHECK ~o~ Errors: {error_count}, Bounties: {trades_filled}")
-                    pulse = 0
-
-            except Exception as loop_ex:
-                print(f"[Ed LOOP EXCEPTION!!!] {loop_ex}")
-                error_count += 1
-
-    except KeyboardInterrupt:
-        print("\n[Jack-out] Session ended by user. See you, space cowboy!")
-    except Exception as boss_ex:
-        print(f"[Ed CRIT] FATAL UNHANDLED: {boss_ex}")
-
+#!/usr/bin/env python3
+
+# See you, space cowboy...
+
+import argparse
+import time
+import json
+import tradeogre
+from tradeogre import TradeOgre
+from funcs import *
+from placement import grid_table, DEFAULT_CONCURRENCY
+from ratelimit import TokenBucket
+from ledger import BalanceLedger
+from scheduler import PulseScheduler
+from engine import GridEngine, grid_configs, startup_snapshot
+from gridstate import GridState, DEFAULT_STATE_FILE
+from filljournal import FillJournal, DEFAULT_JOURNAL_FILE
+import metrics
+from profiler import PulseProfiler, DEFAULT_PROFILE_DIR
+
+# ----[ CONFIG ]-----------------------------------------------
+CONFIG_FILE = "bountybot_config.json"
+
+# Set by main(); importing this module reads no files and makes no requests
+CONFIG = None
+trade_ogre = None
+rate_bucket = None
+
+
+def load_config(path=CONFIG_FILE):
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_keys(path):
+    """API key and secret, one per line."""
+    with open(path) as f:
+        return f.readline().strip(), f.readline().strip()
+
+
+def make_client(config, key, secret):
+    """TradeOgre client built from config args only (no requests yet)."""
+    client = tradeogre.TradeOgre(
+        key,
+        secret,
+        config["order_amount"],
+        config["grid_spacing"],
+        config["min_price"],
+        config["max_price"],
+        config["max_active_orders"],
+        pool_size=config.get("pool_size", tradeogre.DEFAULT_POOL_SIZE),
+        timeouts=config.get("timeouts"),
+        cache=tradeogre.MarketDataCache(config.get("cache_ttls"))
+    )
+    if config.get("api_uri"):
+        # e.g. a local exchange_sim.py instead of the real exchange
+        client.uri = config["api_uri"]
+    return client
+# ------------------------------------------------------------
+
+def log(msg):
+    """Print, Bebop style."""
+    print(f"{get_time()} -- {msg}")
+
+def sleepy(secs=1):
+    """Jazz break."""
+    time.sleep(secs)
+
+def get_balance_safe(asset):
+    try:
+        resp = trade_ogre.balance(asset)
+        if not isinstance(resp, dict) or 'available' not in resp:
+            print(f"(>^_^)> [ED-ALERT] Balance vanish! Asset={asset}. API mumbled: {resp} ~ Chasing it through cyberspace now!")
+            return 0.0
+        return float(resp['available'] or 0)
+    except Exception as ex:
+        print(f"ED KA-BOOM! Trouble grabbing balance for {asset}! Exception says: {ex} ... Ed rolls across keyboard dramatically!")
+        return 0.0
+def place_order_safe(side, ticker, amount, price):
+    try:
+        if side == 'buy':
+            resp = trade_ogre.buy(ticker, amount, price)
+        else:
+            resp = trade_ogre.sell(ticker, amount, price)
+        if not isinstance(resp, dict):
+            print(f"(=^.^=) ED SQUAWK! {side.upper()} order glitched—got a weird response: {resp} :O")
+            return None
+        if not resp.get("success", True):
+            print(f"ED RASPBERRY! {side.upper()} order REJECTED at {price}! API says: {resp.get('error', resp)} Whyyyyy?! >_<")
+            return None
+        if "uuid" not in resp:
+            print(f"ED FACEPLANT! {side.upper()} order at {price} has no uuid! Mysterious API: {resp} ... Ed grabs skateboard and chases it.")
+            return None
+        return resp
+    except Exception as exc:
+        print(f"(x_X) ED EXPLODE! {side.upper()} order at {price} blew up with: {exc} ... Send help! WHEEE!")
+        return None
+
+
+def bountiful_log(cfg, btc_bal, pair_bal, bot_trade_size):
+    """Startup log, Bebop chatter."""
+    print(f"-- [==BountyBotSUPER==trading==>: {cfg['bot_ticker']}] --")
+    print(f"-- Gridding {cfg['grid_count']} trades @ {bot_trade_size} creds each. --")
+    print(f"-- Wallet check: {ticker_base_currency(cfg['bot_ticker'])}: {btc_bal} | {ticker_pair_currency(cfg['bot_ticker'])}: {pair_bal} --\n")
+
+def main():
+    global CONFIG, trade_ogre, rate_bucket
+    started = time.monotonic()
+    parser = argparse.ArgumentParser(description="BountyBotSUPER grid bot")
+    parser.add_argument("--config", default=CONFIG_FILE, help="bot config file (default: %(default)s)")
+    parser.add_argument("--profile", nargs="?", const=DEFAULT_PROFILE_DIR, metavar="DIR",
+                        help="profile every pulse into DIR (SIGUSR1 toggles it while running)")
+    args = parser.parse_args()
+    # per-pulse CPU/memory reports; off unless --profile, kill -USR1 <pid> flips it at runtime
+    profiler = PulseProfiler(args.profile or DEFAULT_PROFILE_DIR, enabled=bool(args.profile))
+    profiler.install()
+
+    CONFIG = load_config(args.config)
+    trade_ogre = make_client(CONFIG, *load_keys(CONFIG['api_key_file']))
+    # One request budget for every call the bot makes (requests/sec, burst)
+    rate_bucket = TokenBucket(CONFIG.get("rate_limit", 10), CONFIG.get("rate_burst"))
+    # Every configured grid (one, or CONFIG['markets'])
+    grid_cfgs = grid_configs(CONFIG)
+
+    # --- Startup snapshot: markets(), balances() and orders() in one concurrent round trip ---
+    try:
+        tickers, balances, open_orders = startup_snapshot(trade_ogre, rate_bucket)
+    except Exception as exc:
+        print(f"[Ed WARN] Startup fetch came back funny: {exc}")
+        exit(1)
+    print(f"Jet: Market, wallet and order snapshot in {time.monotonic() - started:.2f}s.")
+    for grid_cfg in grid_cfgs:
+        ticker = tickers.get(grid_cfg['bot_ticker'])
+        if not ticker or 'ask' not in ticker:
+            print(f"~*~~*~ ED PANIC!! {grid_cfg['bot_ticker']} ticker lost in cyberspace. No 'ask' found! Look: {ticker} -- Bouncy, bounce, fix the connection, puhpuhpuhlease! ~*~~*~")
+            exit(1)
+    # The balances() snapshot seeds the local ledger; funds locked by orders already on the book stay reserved
+    ledger = BalanceLedger()
+    ledger.seed(balances, open_orders)
+
+    engine = GridEngine(trade_ogre, grid_cfgs, ledger, bucket=rate_bucket,
+                        concurrency=CONFIG.get('place_concurrency', DEFAULT_CONCURRENCY),
+                        state=GridState(CONFIG.get('state_file', DEFAULT_STATE_FILE)),
+                        journal=FillJournal(CONFIG.get('fill_journal', DEFAULT_JOURNAL_FILE)))
+    # --- Init & grid setup ---
+    for grid in engine.grids:
+        print("DEBUG: Ticker response:", tickers[grid.market])
+        bountiful_log(grid.cfg, ledger.available(grid.base), ledger.available(grid.quote), grid.qty)
+
+    # --- Pick up saved grids from the same orders() snapshot, place the rest: budget once, submit concurrently ---
+    grid_started = time.monotonic()
+    placed = engine.bootstrap(tickers, open_orders)
+    if placed:
+        for line in grid_table(placed):
+            print(line)
+    live = sum(len(grid.orders) for grid in engine.grids)
+    print(f"Ed: {live} levels live ({len(engine.restored)} grid(s) restored, {len(placed)} levels planned) "
+          f"in {time.monotonic() - grid_started:.2f}s! Zoom zoom!")
+    first = min((row['placed_at'] for row in placed if row['status'] == 'placed'), default=None)
+    if first is not None:
+        print(f"Ed: Time to first order: {first - started:.2f}s from startup.")
+
+    print("Jet: Orders placed. Let the cosmic jazz commence.")
+
+    # --- Optional Prometheus-style scrape endpoint ---
+    if CONFIG.get('metrics_port'):
+        metrics.serve(port=CONFIG['metrics_port'])
+        print(f"Jet: Metrics on http://127.0.0.1:{CONFIG['metrics_port']}/metrics")
+    loop_errors = metrics.REGISTRY.counter('bountybot_loop_errors_total', 'Main loop exceptions')
+    pulse_interval = metrics.REGISTRY.gauge('bountybot_pulse_interval_seconds', 'Next pulse interval')
+
+    # --- Main event loop ---
+    pulse = 0
+    error_count = 0
+    reconcile_every = CONFIG.get('reconcile_pulses', 10)
+    pulses_since_reconcile = 0
+    # orders() + markets() every pulse, however many grids; flips and reconciles draw from the same budget
+    scheduler = PulseScheduler(
+        CONFIG['pulse_secs'], CONFIG.get('pulse_min_secs'), CONFIG.get('pulse_max_secs'),
+        move_threshold=CONFIG.get('pulse_move_threshold', 0.005), bucket=rate_bucket, requests_per_pulse=2
+    )
+
+    # --- Optional market feed: a price reaching an order wakes the loop now, not at the next pulse ---
+    feed = None
+    if CONFIG.get('stream'):
+        # on_tick only reads prices, so trades would just spend rate budget
+        feed = trade_ogre.stream(list(engine.by_market), channels=('ticker',), push_uri=CONFIG.get('stream_uri'),
+                                 poll_secs=CONFIG.get('stream_poll_secs'), bucket=rate_bucket)
+
+        def on_tick(event):
+            if engine.crossed(event.market, event.data.price):
+                scheduler.wake()
+
+        feed.subscribe(on_tick)
+        feed.start()
+        print(f"Jet: Listening to {'the push stream' if CONFIG.get('stream_uri') else 'polled ticks'} "
+              f"for {', '.join(feed.markets)}.")
+
+    try:
+        while True:
+            try:
+                scheduler.wait()
+                scheduler.begin()
+                pulse += 1
+
+                with profiler.pulse():
+                    fills, prices = engine.pulse()
+
+                pulses_since_reconcile += 1
+                if pulses_since_reconcile >= reconcile_every:
+                    pulses_since_reconcile = 0
+                    rate_bucket.acquire()
+                    drift = engine.reconcile(trade_ogre.balances())
+                    if drift:
+                        log(f"Jet: Ledger was off from the exchange, fixed it up: {drift}")
+
+                pulse_interval.set(scheduler.record(fills, prices))
+
+                if pulse == CONFIG['pulse_echo']:
+                    m = scheduler.metrics()
+                    tripped = [ep for ep, state in trade_ogre.breaker_states().items() if state != 'closed']
+                    log(f"~o~ ED PULSE CHECK ~o~ Errors: {error_count}, Bounties: {engine.trades_filled}, "
+                        f"next pulse in {m['interval_secs']:.1f}s, fill reaction {m['reaction_latency_secs']}s"
+                        + (f", circuits tripped: {', '.join(tripped)}" if tripped else ""))
+                    pulse = 0
+
+            except Exception as loop_ex:
+                print(f"[Ed LOOP EXCEPTION!!!] {loop_ex}")
+                error_count += 1
+                loop_errors.inc()
+                # a failed pulse counts as a quiet one, so repeated errors back off instead of hammering
+                pulse_interval.set(scheduler.record())
+
+    except KeyboardInterrupt:
+        print("\n[Jack-out] Session ended by user. See you, space cowboy!")
+    except Exception as boss_ex:
+        print(f"[Ed CRIT] FATAL UNHANDLED: {boss_ex}")
+    finally:
+        if feed is not None:
+            feed.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+backtest.py – Offline replay of the grid strategy over recorded trades.
+
+Usage:
+    python backtest.py ticks.csv                   # uses bountybot_config.json
+    python backtest.py ticks.csv --config my.json
+    python backtest.py --synthetic 2600000         # random walk, ~a month of 1s ticks
+    python backtest.py --collect XTM-USDT ticks.csv  # append history() trades to a CSV
+
+The grid is laid out and funded exactly like the live bot (engine.Grid and
+placement.plan_grid), fills are detected once per simulated pulse like the
+pulse loop, and filled orders flip to the adjacent ladder level
+(engine.Grid.flip_target).
+Between two pulses the open orders cannot change, so each pulse window only
+needs the window's low/high, which NumPy computes for all windows at once.
+"""
+import argparse
+import csv
+import json
+import os
+import time
+
+import numpy as np
+
+from engine import Grid
+from placement import plan_grid, MIN_NOTIONAL
+
+# TradeOgre charges 0.2% of notional on every fill.
+DEFAULT_FEE = 0.002
+
+FILL_DTYPE = np.dtype([('time', 'f8'), ('pulse', 'i8'), ('side', 'i1'), ('price', 'f8'), ('level', 'i8')])
+
+
+def load_ticks(path):
+    """ Load a tick series as (times, prices) float arrays sorted by time.
+    Accepts a ``date,price[,quantity]`` CSV (header optional) or a JSON list
+    of ``history()`` trades. """
+    if path.endswith('.json'):
+        with open(path) as f:
+            trades = json.load(f)
+        data = np.array([(float(t['date']), float(t['price'])) for t in trades], dtype='f8').reshape(-1, 2)
+    else:
+        with open(path) as f:
+            first = f.readline()
+        skip = 0 if first[:1].isdigit() else 1
+        data = np.loadtxt(path, delimiter=',', skiprows=skip, usecols=(0, 1), ndmin=2)
+    order = np.argsort(data[:, 0], kind='stable')
+    return data[order, 0], data[order, 1]
+
+
+def collect_history(client, market, path):
+    """ Append the trades from one ``history()`` call that are newer than
+    the CSV's last row. Run it every few minutes to build a tick series.
+
+    :returns: number of trades appended
+    """
+    last = -1.0
+    if os.path.exists(path):
+        with open(path) as f:
+            for row in csv.reader(f):
+                if row and row[0][:1].isdigit():
+                    last = float(row[0])
+    trades = sorted(client.history(market), key=lambda t: t['date'])
+    new = [t for t in trades if float(t['date']) > last]
+    with open(path, 'a', newline='') as f:
+        writer = csv.writer(f)
+        if last < 0:
+            writer.writerow(['date', 'price', 'quantity'])
+        for t in new:
+            writer.writerow([t['date'], t['price'], t['quantity']])
+    return len(new)
+
+
+def synthetic_ticks(count, start_price=0.0065, step_secs=1.0, vol=0.0004, seed=7):
+    """ Geometric random walk, handy for throughput checks. """
+    rng = np.random.default_rng(seed)
+    times = np.arange(count, dtype='f8') * step_secs
+    prices = start_price * np.exp(np.cumsum(rng.normal(0.0, vol, count)))
+    return times, prices
+
+
+class BacktestResult(object):
+    """ Output of :py:func:`run_backtest`.
+
+    ``fills`` is a structured array (time, pulse, side: +1 buy/-1 sell,
+    price, level). ``pulse_times``, ``inventory``, ``cash`` and ``equity``
+    are per-pulse arrays; ``realized_pnl`` uses average cost, net of fees.
+    """
+
+    def __init__(self, fills, pulse_times, inventory, cash, equity, realized_pnl, ticks, elapsed):
+        self.fills = fills
+        self.pulse_times = pulse_times
+        self.inventory = inventory
+        self.cash = cash
+        self.equity = equity
+        self.realized_pnl = realized_pnl
+        self.ticks = ticks
+        self.elapsed = elapsed
+
+    @property
+    def ticks_per_sec(self):
+        return self.ticks / self.elapsed if self.elapsed else float('inf')
+
+    def summary(self):
+        return {
+            'ticks': self.ticks,
+            'pulses': len(self.pulse_times),
+            'fills': len(self.fills),
+            'buys': int((self.fills['side'] == 1).sum()),
+            'sells': int((self.fills['side'] == -1).sum()),
+            'realized_pnl': self.realized_pnl,
+            'final_inventory': float(self.inventory[-1]) if len(self.inventory) else 0.0,
+            'final_equity': float(self.equity[-1]) if len(self.equity) else 0.0,
+            'elapsed_secs': self.elapsed,
+            'ticks_per_sec': self.ticks_per_sec,
+        }
+
+
+def run_backtest(cfg, times, prices, base_balance, quote_balance, fee=DEFAULT_FEE):
+    """ Replay ``(times, prices)`` through the grid described by ``cfg``
+    (the bot config keys: order_amount, buffer, max_price, grid_count,
+    pulse_secs, optional min_notional/bot_ticker).
+
+    :returns: :py:class:`BacktestResult`
+    """
+    started = time.perf_counter()
+    times = np.asarray(times, dtype='f8')
+    prices = np.asarray(prices, dtype='f8')
+    cfg = dict(cfg)
+    cfg.setdefault('bot_ticker', 'BASE-QUOTE')
+    grid = Grid(cfg)
+    qty = float(grid.qty)
+
+    # --- bootstrap: same layout and funding rules as the live engine ---
+    buy_prices, sell_prices = grid.layout(float(prices[0]))
+    budget = {grid.base: base_balance, grid.quote: quote_balance}
+    rows = plan_grid(grid.market, qty, buy_prices, sell_prices, budget, cfg.get('min_notional', MIN_NOTIONAL))
+    rows = [row for row in rows if row['status'] == 'pending']
+    is_buy = np.array([row['side'] == 'buy' for row in rows], dtype=bool)
+    order_price = np.array([row['price'] for row in rows], dtype='f8')
+    order_level = np.array([grid.level_of(row['price']) for row in rows], dtype='i8')
+
+    # --- pulse windows: [t0 + k*pulse, t0 + (k+1)*pulse), fills seen at the window's end ---
+    pulse = float(cfg['pulse_secs'])
+    n_windows = max(1, int(np.ceil((times[-1] - times[0]) / pulse + 1e-12)))
+    edges = times[0] + pulse * np.arange(n_windows + 1)
+    edges[-1] = max(edges[-1], np.nextafter(times[-1], np.inf))
+    bounds = np.searchsorted(times, edges, side='left')
+    starts, ends = bounds[:-1], bounds[1:]
+    nonempty = starts < ends
+    lows = np.full(n_windows, np.inf)
+    highs = np.full(n_windows, -np.inf)
+    lows[nonempty] = np.minimum.reduceat(prices, starts[nonempty])
+    highs[nonempty] = np.maximum.reduceat(prices, starts[nonempty])
+    last_idx = np.maximum.accumulate(np.where(nonempty, ends - 1, 0))
+    last_price = prices[last_idx]
+
+    def best_quotes():
+        buys = order_price[is_buy]
+        sells = order_price[~is_buy]
+        return (buys.max() if buys.size else -np.inf), (sells.min() if sells.size else np.inf)
+
+    best_buy, best_sell = best_quotes()
+    fill_chunks = []
+    for k in np.flatnonzero(nonempty):
+        if lows[k] > best_buy and highs[k] < best_sell:
+            continue  # nothing crossed this pulse
+        hit = np.flatnonzero((is_buy & (order_price >= lows[k])) | (~is_buy & (order_price <= highs[k])))
+        was_buy = is_buy[hit]
+        chunk = np.empty(hit.size, dtype=FILL_DTYPE)
+        chunk['time'] = edges[k + 1]
+        chunk['pulse'] = k
+        chunk['side'] = np.where(was_buy, 1, -1)
+        chunk['price'] = order_price[hit]
+        chunk['level'] = order_level[hit]
+        fill_chunks.append(chunk)
+        # Grid.flip_target, vectorized: buy -> sell one level up, sell -> buy one level down
+        is_buy[hit] = ~was_buy
+        order_level[hit] += np.where(was_buy, 1, -1)
+        order_price[hit] = grid.ladder.price_at(order_level[hit])
+        best_buy, best_sell = best_quotes()
+    fills = np.concatenate(fill_chunks) if fill_chunks else np.empty(0, dtype=FILL_DTYPE)
+
+    # --- inventory / cash per pulse, straight from the fills ---
+    side = fills['side'].astype('f8')
+    notional = fills['price'] * qty
+    d_inv = np.zeros(n_windows)
+    d_cash = np.zeros(n_windows)
+    np.add.at(d_inv, fills['pulse'], side * qty)
+    np.add.at(d_cash, fills['pulse'], -side * notional - fee * notional)
+    inventory = base_balance + np.cumsum(d_inv)
+    cash = quote_balance + np.cumsum(d_cash)
+    equity = cash + inventory * last_price
+
+    # --- realized PnL, average-cost basis (starting inventory at the first price) ---
+    held, cost = float(base_balance), float(base_balance) * float(prices[0])
+    realized = 0.0
+    for s, p in zip(fills['side'].tolist(), fills['price'].tolist()):
+        realized -= fee * p * qty
+        if s == 1:
+            held += qty
+            cost += p * qty
+        elif held > 0:
+            avg = cost / held
+            sold = min(qty, held)
+            realized += sold * (p - avg)
+            held -= sold
+            cost -= sold * avg
+
+    return BacktestResult(fills, edges[1:], inventory, cash, equity, realized, len(times),
+                          time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BountyBot grid backtester")
+    parser.add_argument("ticks", nargs="?", help="tick CSV (date,price[,quantity]) or history() JSON")
+    parser.add_argument("--config", default="bountybot_config.json", help="bot config to replay")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="replay N random-walk ticks instead")
+    parser.add_argument("--base", type=float, help="starting base balance (default: enough for the grid)")
+    parser.add_argument("--quote", type=float, default=1000.0, help="starting quote balance")
+    parser.add_argument("--fee", type=float, default=DEFAULT_FEE)
+    parser.add_argument("--collect", metavar="MARKET", help="append history() trades for MARKET to the CSV")
+    args = parser.parse_args()
+
+    if args.collect:
+        from tradeogre import TradeOgre
+        print(f"Jet: {collect_history(TradeOgre(), args.collect, args.ticks)} new trades recorded.")
+        return
+
+    if os.path.exists(args.config):
+        with open(args.config) as f:
+            cfg = json.load(f)
+    else:
+        cfg = {"bot_ticker": "XTM-USDT", "order_amount": 200, "buffer": 0.000005, "max_price": 0.0075,
+               "grid_count": 10, "pulse_secs": 60}
+    if args.synthetic:
+        times, prices = synthetic_ticks(args.synthetic)
+        cfg["max_price"] = float(prices[0]) * 1.15
+    else:
+        times, prices = load_ticks(args.ticks)
+    base = args.base if args.base is not None else cfg["order_amount"] * cfg["grid_count"]
+
+    result = run_backtest(cfg, times, prices, base, args.quote, args.fee)
+    for name, value in result.summary().items():
+        print(f"{name:<16} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+bench.py – Reproducible benchmarks against the local exchange simulator.
+
+Usage:
+    python bench.py                        # everything, saved to bench_results.json
+    python bench.py pool -n 1000           # cold vs pooled request latency only
+    python bench.py pulse                  # fill detection / flip loop cost vs open orders
+    python bench.py grid                   # time-to-full-grid vs grid_count
+    python bench.py levels                 # generate_grid / Ladder cost vs level count
+    python bench.py endpoints              # client overhead per endpoint
+    python bench.py journal                # fill journal append cost and PnL query time
+    python bench.py book                   # order book mirror ingest and depth/VWAP queries
+    python bench.py memory                 # bytes per tracked order, GridOrder vs dict per order
+    python bench.py decode                 # JSON parsing and record conversion of big orders()/order_book() bodies
+    python bench.py --compare old.json     # flag regressions against an earlier run
+
+Everything runs against exchange_sim.py, so no API keys or network are needed.
+"""
+import argparse
+import base64
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import requests
+
+from engine import GridEngine
+from exchange_sim import SimExchange, serve, attach
+from filljournal import FillJournal, FILL_DTYPE, read_fills, round_trips, pnl_by_level
+from funcs import generate_grid
+from ladder import Ladder
+from ledger import BalanceLedger
+from metrics import ClientMetrics, Registry
+from orderbook import OrderBook
+from orderstore import OrderStore
+import records
+from tradeogre import TradeOgre, DEFAULT_TIMEOUTS
+
+SECTIONS = ("pool", "pulse", "grid", "levels", "endpoints", "journal", "book", "memory", "decode")
+MARKET = "XTM-USDT"
+START_PRICE = 0.0065
+# Ratio of new/old median above which --compare calls it a regression.
+REGRESSION_RATIO = 1.2
+
+
+def p95(samples):
+    """ Nearest-rank 95th percentile of sorted ``samples``. """
+    return samples[min(len(samples) - 1, math.ceil(len(samples) * 0.95) - 1)]
+
+
+def timed(fn, n):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    samples.sort()
+    return {"median_ms": statistics.median(samples),
+            "p95_ms": p95(samples),
+            "mean_ms": statistics.fmean(samples),
+            "samples": n}
+
+
+def sim_exchange(levels=0, key="key"):
+    """ Simulator with one market and enough funds for ``levels`` grid orders. """
+    sim = SimExchange({MARKET: START_PRICE})
+    sim.fund(key, "USDT", 10000.0 + levels * 2)
+    sim.fund(key, "XTM", 200.0 * (levels + 10))
+    return sim
+
+
+def grid_config(grid_count):
+    """ A one-market bot config whose ladder starts right above the price. """
+    return {"bot_ticker": MARKET, "order_amount": 200, "buffer": 0.00000001, "grid_count": grid_count,
+            "max_price": START_PRICE + grid_count * 0.0000001 + 0.00000001, "tick_size": 0.00000001}
+
+
+def start_engine(sim, uri, grid_count, concurrency=8):
+    """ Seed a ledger and build a quiet :py:class:`GridEngine` on ``sim``. """
+    client = TradeOgre("key", "secret", cache=False)
+    if uri is None:
+        attach(client, sim)
+    else:
+        client.uri = uri
+    ledger = BalanceLedger()
+    ledger.seed(client.balances(), client.orders())
+    engine = GridEngine(client, [grid_config(grid_count)], ledger, concurrency=concurrency, log=lambda msg: None)
+    return client, engine
+
+
+def bench_cold_vs_pooled(n):
+    """ Compare bare ``requests`` calls (fresh connection per call, the old
+    client behaviour) against the pooled :py:class:`TradeOgre` session. """
+    server, uri = serve(sim_exchange())
+    client = TradeOgre("key", "secret", cache=False)
+    client.uri = uri
+    results = {}
+    try:
+        results["ticker_cold"] = timed(
+            lambda: requests.get(uri + "/ticker/" + MARKET, timeout=DEFAULT_TIMEOUTS["ticker"]).json(), n)
+        results["ticker_pooled"] = timed(lambda: client.ticker(MARKET), n)
+        results["orders_cold"] = timed(
+            lambda: requests.post(uri + "/account/orders", data={"market": MARKET}, auth=("key", "secret"),
+                                  timeout=DEFAULT_TIMEOUTS["orders"]).json(), n)
+        results["orders_pooled"] = timed(lambda: client.orders(MARKET), n)
+    finally:
+        client.close()
+        server.shutdown()
+    return results
+
+
+def open_orders_snapshot(count, fill_ratio=0.01):
+    """ ``orders()``-shaped list for ``count`` tracked orders with a
+    ``fill_ratio`` share of them gone (filled). """
+    tracked = [{"uuid": "%08x-grid" % i, "type": "buy" if i % 2 else "sell", "price": "%.8f" % (0.006 + i * 1e-7),
+                "quantity": "200", "market": MARKET} for i in range(count)]
+    gone = max(1, int(count * fill_ratio))
+    return tracked, tracked[gone:]
+
+
+def bench_fill_detection(sizes, n):
+    """ Per-pulse fill detection: the old list scan vs :py:class:`OrderStore`. """
+    results = {}
+    for count in sizes:
+        tracked, snapshot = open_orders_snapshot(count)
+        reps = max(1, n // max(1, count // 100))
+
+        orders = [{"uuid": o["uuid"], "type": o["type"], "price": float(o["price"])} for o in tracked]
+
+        def list_scan():
+            open_uuids = [o["uuid"] for o in snapshot]
+            return [order for order in orders if order["uuid"] not in open_uuids]
+
+        store = OrderStore()
+        for level, o in enumerate(tracked):
+            store.add(o["uuid"], o["type"], float(o["price"]), level)
+
+        def store_sync():
+            store.snapshot = {}
+            return store.sync(snapshot).removed
+
+        assert len(list_scan()) == len(store_sync())
+        results[f"list_scan_{count}"] = timed(list_scan, reps)
+        results[f"store_sync_{count}"] = timed(store_sync, reps)
+    return results
+
+
+def bench_pulse_loop(sizes, n, fill_ratio=0.01):
+    """ Whole :py:meth:`GridEngine.pulse` (orders snapshot, fill detection,
+    flips, tickers) against the in-process simulator, once with nothing
+    filled and once after the price crossed ``fill_ratio`` of the levels. """
+    results = {}
+    for count in sizes:
+        sim = sim_exchange(count)
+        client, engine = start_engine(sim, None, count)
+        engine.bootstrap()
+        grid = engine.grids[0]
+        reps = max(1, min(n, int(1 / fill_ratio) // 2))
+        results[f"pulse_quiet_{count}"] = timed(engine.pulse, reps)
+
+        step = max(1, int(count * fill_ratio))
+        samples = []
+        for rep in range(reps):
+            # trade up through the next `step` sell levels, then time the pulse that flips them
+            sim.move_price(MARKET, grid.ladder[min(count - 1, (rep + 1) * step - 1)])
+            start = time.perf_counter()
+            fills, _ = engine.pulse()
+            samples.append((time.perf_counter() - start) * 1000.0)
+        samples.sort()
+        results[f"pulse_fills_{count}"] = {"median_ms": statistics.median(samples),
+                                           "p95_ms": p95(samples),
+                                           "mean_ms": statistics.fmean(samples), "samples": reps,
+                                           "fills_per_pulse": step}
+        client.close()
+    return results
+
+
+def bench_time_to_grid(counts, concurrency=8):
+    """ Time from an empty account to a fully placed grid (``Run.py``'s
+    bootstrap: ledger seed, tickers, layout, concurrent placement) over
+    localhost HTTP, for each grid_count. No rate limit is applied. """
+    results = {}
+    for count in counts:
+        sim = sim_exchange(count)
+        server, uri = serve(sim)
+        start = time.perf_counter()
+        client, engine = start_engine(sim, uri, count, concurrency)
+        rows = engine.bootstrap()
+        elapsed = time.perf_counter() - start
+        placed = sum(1 for row in rows if row["status"] == "placed")
+        ms = elapsed * 1000.0
+        results[f"full_grid_{count}"] = {"median_ms": ms, "p95_ms": ms, "mean_ms": ms, "samples": 1,
+                                         "placed": placed, "orders_per_sec": placed / elapsed}
+        client.close()
+        server.shutdown()
+    return results
+
+
+def bench_levels(counts, n):
+    """ ``funcs.generate_grid`` vs :py:class:`Ladder` for each level count. """
+    results = {}
+    for count in counts:
+        reps = max(1, n // max(1, count // 1000))
+        upper = 0.006 + count * 0.0000001
+        results[f"generate_grid_{count}"] = timed(lambda: generate_grid(0.006, upper, count), reps)
+        results[f"ladder_{count}"] = timed(lambda: Ladder(0.006, upper, count), reps)
+    return results
+
+
+def bench_endpoints(n):
+    """ Per-endpoint cost: the simulator alone, the client mounted straight
+    on it (so the difference is pure client overhead) and over localhost HTTP. """
+    sim = sim_exchange(n)
+    server, uri = serve(sim)
+    inproc = attach(TradeOgre("key", "secret", cache=False), sim)
+    http = TradeOgre("key", "secret", cache=False)
+    http.uri = uri
+    auth = {"Authorization": "Basic " + base64.b64encode(b"key:secret").decode()}
+    resting = inproc.buy(MARKET, 200, 0.005)["uuid"]
+
+    calls = {
+        "markets": (lambda c: c.markets(), ("GET", "/api/v1/markets", None)),
+        "ticker": (lambda c: c.ticker(MARKET), ("GET", "/api/v1/ticker/" + MARKET, None)),
+        "order_book": (lambda c: c.order_book(MARKET), ("GET", "/api/v1/orders/" + MARKET, None)),
+        "history": (lambda c: c.history(MARKET), ("GET", "/api/v1/history/" + MARKET, None)),
+        "balance": (lambda c: c.balance("USDT"), ("POST", "/api/v1/account/balance", {"currency": "USDT"})),
+        "balances": (lambda c: c.balances(), ("GET", "/api/v1/account/balances", None)),
+        "orders": (lambda c: c.orders(MARKET), ("POST", "/api/v1/account/orders", {"market": MARKET})),
+        "order": (lambda c: c.order(resting), ("GET", "/api/v1/account/order/" + resting, None)),
+        "buy": (lambda c: c.buy(MARKET, 1, 0.001), ("POST", "/api/v1/order/buy",
+                                                     {"market": MARKET, "quantity": "1", "price": "0.001"})),
+    }
+    results = {}
+    try:
+        for name, (call, (method, path, form)) in calls.items():
+            results[f"{name}_sim"] = timed(lambda: sim.handle(method, path, dict(form or {}), auth), n)
+            results[f"{name}_inproc"] = timed(lambda: call(inproc), n)
+            results[f"{name}_http"] = timed(lambda: call(http), n)
+        for client in (inproc, http):
+            uuids = [client.buy(MARKET, 1, 0.001)["uuid"] for _ in range(n)]
+            label = "inproc" if client is inproc else "http"
+            results[f"cancel_{label}"] = timed(lambda: client.cancel(uuids.pop()), n)
+        # what instrumentation adds per request (1000 per sample, so ms read as microseconds per request),
+        # on the request path alone and including the periodic fold
+        for label, fold_every in (("request_path", 10 ** 9), ("amortized", 4096)):
+            recorder = ClientMetrics(Registry(), fold_every)
+            results[f"metrics_{label}_x1000"] = timed(
+                lambda: [recorder.end(recorder.begin("ticker"), 200) for _ in range(1000)], n)
+    finally:
+        inproc.close()
+        http.close()
+        server.shutdown()
+    return results
+
+
+def synthetic_fills(count, levels=200, seed=7):
+    """ ``FILL_DTYPE`` array of alternating buys at L and sells at L + 1. """
+    rng = np.random.default_rng(seed)
+    fills = np.empty(count, dtype=FILL_DTYPE)
+    fills['time'] = np.arange(count, dtype='f8') * 5
+    fills['market'] = MARKET.encode()
+    fills['side'] = np.where(np.arange(count) % 2 == 0, 1, -1)
+    low = rng.integers(0, levels, count)
+    fills['level'] = np.where(fills['side'] == 1, low, low + 1)
+    fills['price'] = START_PRICE + fills['level'] * 0.0000001
+    fills['qty'] = 200.0
+    return fills
+
+
+def bench_journal(counts, n):
+    """ Cost of one :py:meth:`FillJournal.append` (what a flip pays) and of
+    mapping a journal and computing round trips + PnL per level. """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = FillJournal(os.path.join(tmp, "append.bin"))
+        results["append"] = timed(lambda: journal.append(MARKET, "buy", 3, START_PRICE, 200.0), n * 10)
+        journal.close()
+        for count in counts:
+            path = os.path.join(tmp, f"fills_{count}.bin")
+            FillJournal(path).close()
+            with open(path, "ab") as f:
+                f.write(synthetic_fills(count).tobytes())
+            results[f"pnl_query_{count}"] = timed(lambda: pnl_by_level(round_trips(read_fills(path))),
+                                                  max(1, min(n, 10_000_000 // count)))
+    return results
+
+
+def book_snapshot(depth, changed=0, seed=11):
+    """ ``order_book()``-shaped response with ``depth`` levels a side, the
+    first ``changed`` of them on each side with a different quantity. """
+    rng = np.random.default_rng(seed)
+    tick = 0.0000001
+    qty = rng.integers(1, 5000, (2, depth)).astype(float)
+    qty[:, :changed] += 1
+    return {"success": "true",
+            "buy": {f"{START_PRICE - (i + 1) * tick:.8f}": f"{q:.8f}" for i, q in enumerate(qty[0])},
+            "sell": {f"{START_PRICE + i * tick:.8f}": f"{q:.8f}" for i, q in enumerate(qty[1])}}
+
+
+def bench_book(depths, n):
+    """ :py:class:`OrderBook` cost: a first snapshot, a snapshot with a few
+    changed levels (the steady state), and the queries placement uses. """
+    results = {}
+    for depth in depths:
+        reps = max(1, n // max(1, depth // 100))
+        first, moved = book_snapshot(depth), book_snapshot(depth, changed=5)
+        results[f"ingest_{depth}"] = timed(lambda: OrderBook(MARKET).apply(first), reps)
+        book = OrderBook(MARKET)
+        book.apply(first)
+        snapshots = [moved, first]
+        results[f"update_{depth}"] = timed(lambda: book.apply(snapshots[book.snapshots % 2]), reps)
+        book.vwap("ask", 1.0)
+        size = book.depth("ask", depth) / 2
+        results[f"vwap_{depth}_x1000"] = timed(lambda: [book.vwap("ask", size) for _ in range(1000)], n)
+    return results
+
+
+def traced_kib(build):
+    """ KiB still allocated by whatever ``build()`` returns. """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del kept
+    return used / 1024.0
+
+
+def bench_memory(counts):
+    """ Memory held by ``count`` tracked orders: :py:class:`OrderStore` vs
+    the dict-per-order layout it replaced (uuid strings are the exchange's
+    and excluded from both). Entries are sizes, not timings. """
+    results = {}
+    for count in counts:
+        tracked, _ = open_orders_snapshot(count)
+        rows = [(o["uuid"], o["type"], o["price"], level) for level, o in enumerate(tracked)]
+
+        def dicts():
+            by_uuid, by_level = {}, {}
+            for uuid, side, price, level in rows:
+                order = {"uuid": uuid, "type": side, "price": float(price), "level": level}
+                by_uuid[uuid] = order
+                by_level.setdefault(level, {})[uuid] = order
+            return by_uuid, by_level
+
+        def store():
+            orders = OrderStore()
+            orders.add_many((uuid, side, float(price), level) for uuid, side, price, level in rows)
+            return orders
+
+        for name, build in (("dict_orders", dicts), ("order_store", store)):
+            kib = traced_kib(build)
+            results[f"{name}_{count}"] = {"kib": kib, "bytes_per_order": kib * 1024 / count}
+    return results
+
+
+def bench_decode(sizes, n):
+    """ Response decoding on big bodies: stdlib ``json`` vs
+    :py:func:`records.loads` (orjson when installed), the conversion to
+    records, and reading prices back from raw dicts vs records. """
+    results = {}
+    for count in sizes:
+        reps = max(1, n // max(1, count // 1000))
+        orders = json.dumps(open_orders_snapshot(count)[0]).encode()
+        book = json.dumps(book_snapshot(count)).encode()
+        raw, typed = json.loads(orders), records.decode_orders(json.loads(orders))
+        results[f"json_orders_{count}"] = timed(lambda: json.loads(orders), reps)
+        results[f"loads_orders_{count}"] = timed(lambda: records.loads(orders), reps)
+        results[f"records_orders_{count}"] = timed(lambda: records.decode_orders(records.loads(orders)), reps)
+        results[f"json_book_{count}"] = timed(lambda: json.loads(book), reps)
+        results[f"loads_book_{count}"] = timed(lambda: records.loads(book), reps)
+        results[f"records_book_{count}"] = timed(lambda: records.decode_book(records.loads(book)), reps)
+        results[f"notional_dicts_{count}"] = timed(
+            lambda: sum(float(o["price"]) * float(o["quantity"]) for o in raw), reps)
+        results[f"notional_records_{count}"] = timed(lambda: sum(o.price * o.quantity for o in typed), reps)
+    return results
+
+
+def run(sections, n):
+    """ Run the chosen sections and return ``{section: {name: stats}}``. """
+    results = {}
+    if "pool" in sections:
+        results["pool"] = bench_cold_vs_pooled(n)
+    if "pulse" in sections:
+        results["pulse"] = bench_fill_detection((10, 1000, 10000), n)
+        results["pulse"].update(bench_pulse_loop((10, 100, 1000), n))
+    if "grid" in sections:
+        results["grid"] = bench_time_to_grid((10, 100, 1000))
+    if "levels" in sections:
+        results["levels"] = bench_levels((10, 1000, 100000), n)
+    if "endpoints" in sections:
+        results["endpoints"] = bench_endpoints(n)
+    if "journal" in sections:
+        results["journal"] = bench_journal((10000, 1000000), n)
+    if "book" in sections:
+        results["book"] = bench_book((100, 10000), n)
+    if "memory" in sections:
+        results["memory"] = bench_memory((1000, 100000))
+    if "decode" in sections:
+        results["decode"] = bench_decode((1000, 100000), n)
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": commit, "python": sys.version.split()[0],
+            "platform": platform.platform(), "processor": platform.processor() or platform.machine()}
+
+
+def report(results):
+    for name, r in results.items():
+        if "kib" in r:
+            print(f"{name:<24} {r['kib']:.1f} KiB  {r['bytes_per_order']:.0f} B/order")
+        else:
+            print(f"{name:<24} median {r['median_ms']:.3f} ms  p95 {r['p95_ms']:.3f} ms  mean {r['mean_ms']:.3f} ms")
+
+
+def compare(results, old_path):
+    """ Print new/old median (or KiB) ratios for every measurement in both runs.
+
+    :returns: names that got slower by more than ``REGRESSION_RATIO``
+    """
+    with open(old_path) as f:
+        old = json.load(f)["results"]
+    slower = []
+    for section, entries in results.items():
+        for name, r in entries.items():
+            before = old.get(section, {}).get(name)
+            unit = "kib" if "kib" in r else "median_ms"
+            if not before or not before.get(unit):
+                continue
+            ratio = r[unit] / before[unit]
+            flag = "  <-- REGRESSION" if ratio > REGRESSION_RATIO else ""
+            label = "KiB" if unit == "kib" else "ms"
+            print(f"{section + '.' + name:<34} {before[unit]:.3f} -> {r[unit]:.3f} {label}  x{ratio:.2f}{flag}")
+            if flag:
+                slower.append(section + "." + name)
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BountyBot benchmarks")
+    parser.add_argument("section", nargs="?", choices=SECTIONS, help="run one section only")
+    parser.add_argument("-n", type=int, default=200, help="samples per measurement")
+    parser.add_argument("--json", default="bench_results.json", help="where to save results ('' to skip)")
+    parser.add_argument("--compare", metavar="OLD_JSON", help="compare against an earlier results file")
+    args = parser.parse_args()
+
+    results = run((args.section,) if args.section else SECTIONS, args.n)
+    for section, entries in results.items():
+        print(f"--- {section}")
+        report(entries)
+    if "decode" in results:
+        print(f"Jet: decoding with {records.JSON_LIBRARY}")
+    if "pool" in results:
+        for endpoint in ("ticker", "orders"):
+            pool = results["pool"]
+            speedup = pool[endpoint + "_cold"]["median_ms"] / pool[endpoint + "_pooled"]["median_ms"]
+            print(f"{endpoint}: pooled is {speedup:.2f}x faster (median)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"environment": environment(), "samples": args.n, "results": results}, f, indent=2)
+        print(f"Jet: results saved to {args.json}")
+    if args.compare:
+        slower = compare(results, args.compare)
+        print(f"Ed: {len(slower)} regression(s)" + (": " + ", ".join(slower) if slower else " -- smooth sailing!"))
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
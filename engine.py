@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+engine.py – Single-process grid engine for one or many markets.
+
+All grids share one client, one :py:class:`ledger.BalanceLedger` and one
+request budget. A pulse costs one ``orders()`` call for every market plus one
+``markets()`` call for prices; further requests are only made to flip fills.
+With a :py:class:`gridstate.GridState` attached, grids survive a restart; with
+a :py:class:`filljournal.FillJournal`, every fill is recorded.
+"""
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from funcs import flip_level, ticker_base_currency, ticker_pair_currency
+from ladder import Ladder, DEFAULT_TICK
+from metrics import REGISTRY
+from orderbook import OrderBook
+from orderstore import OrderStore
+from ticks import Fixed, QTY_DECIMALS
+from placement import plan_grid, submit_rows, cancel_orders, DEFAULT_CONCURRENCY, MIN_NOTIONAL
+
+# With ``trail`` on, how many levels past either end of the grid the price
+# must get before the grid follows it.
+DEFAULT_TRAIL_HYSTERESIS = 2
+
+
+def grid_configs(config):
+    """ Per-market configs from a bot config. A ``markets`` list holds
+    per-grid overrides (at least ``bot_ticker``) on top of the top-level
+    settings; without it the config describes a single grid. """
+    markets = config.get('markets')
+    if not markets:
+        return [config]
+    configs = []
+    for overrides in markets:
+        cfg = {k: v for k, v in config.items() if k != 'markets'}
+        cfg.update(overrides)
+        configs.append(cfg)
+    return configs
+
+
+def market_tickers(markets):
+    """ ``markets()`` response (a list of one-key dicts) -> {market: ticker}. """
+    if not isinstance(markets, list):
+        raise Exception('Bad markets response: %r' % (markets,))
+    tickers = {}
+    for entry in markets:
+        tickers.update(entry)
+    return tickers
+
+
+def startup_snapshot(client, bucket=None):
+    """ Everything the bot needs before placing its first order, in one
+    round-trip window: ``markets()``, ``balances()`` and ``orders()`` are
+    fetched concurrently on the client's pooled session.
+
+    :param bucket: (optional) :py:class:`ratelimit.TokenBucket` each call
+        passes through
+    :returns: ({market: ticker}, balances response, orders response)
+    """
+    def fetch(call):
+        if bucket is not None:
+            bucket.acquire()
+        return call()
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        markets, balances, orders = (pool.submit(fetch, call)
+                                     for call in (client.markets, client.balances, client.orders))
+        return market_tickers(markets.result()), balances.result(), orders.result()
+
+
+class Grid(object):
+    """ One market's grid: its settings, price levels and tracked orders. """
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self.market = cfg['bot_ticker']
+        self.qty = Fixed.parse(cfg['order_amount'], QTY_DECIMALS)
+        self.base = ticker_base_currency(self.market)
+        self.quote = ticker_pair_currency(self.market)
+        self.orders = OrderStore()
+        self.book = OrderBook(self.market)
+        self.ladder = None
+        self.trades_filled = 0
+        self.pending = []  # flips not placed yet: {'uuid' (the filled order), 'side', 'price', 'level'}
+        self.stale = []  # uuids a re-centre failed to cancel, retried every pulse
+
+    def layout(self, ask):
+        """ Build the ladder from the current ask and split it into the
+        buy band (below the ask) and the sell band (at/above it). ``grid_type``
+        picks 'arithmetic' (default) or 'geometric' spacing, ``tick_size``
+        the market's price increment. """
+        try:
+            self.ladder = Ladder(ask + self.cfg['buffer'], self.cfg['max_price'], self.cfg['grid_count'],
+                                 self.cfg.get('tick_size', DEFAULT_TICK), self.cfg.get('grid_type', 'arithmetic'))
+        except ValueError as exc:
+            raise Exception('No grid for %s, check buffer/max_price/grid_count: %s' % (self.market, exc))
+        return self.ladder.split(ask)
+
+    def level_of(self, price):
+        return self.ladder.index(price)
+
+    def fits(self, ladder):
+        """ Whether a saved ladder still matches this grid's settings (the
+        lower end follows the ask at layout time, and a trailing grid's upper
+        end follows the price, so those are not compared). """
+        return ((self.cfg.get('trail') or ladder.upper == float(self.cfg['max_price']))
+                and ladder.count == int(self.cfg['grid_count'])
+                and ladder.tick == float(self.cfg.get('tick_size', DEFAULT_TICK))
+                and ladder.kind == self.cfg.get('grid_type', 'arithmetic'))
+
+    def flip_target(self, order):
+        """ Side, price (:py:class:`ticks.Fixed`) and level an order flips to:
+        the exact adjacent ladder level. """
+        side, level = flip_level(order.side, order.level)
+        return side, self.ladder.fixed(level), level
+
+
+class GridEngine(object):
+    """ Runs every configured grid off shared exchange calls.
+
+    :py:meth:`bootstrap` places all grids at once; each :py:meth:`pulse`
+    detects fills for every grid from a single all-markets ``orders()``
+    snapshot and flips them.
+
+    A flip whose order could not be placed (rejected, circuit open, or an
+    error that leaves it unknown whether the exchange took it) is kept as
+    pending. The next snapshot is checked for it first, so an order that did
+    land is adopted rather than placed twice.
+    """
+
+    def __init__(self, client, configs, ledger, bucket=None, concurrency=DEFAULT_CONCURRENCY, log=print,
+                 state=None, journal=None, metrics=None):
+        """
+        :param client: :py:class:`tradeogre.TradeOgre`
+        :param configs: per-market configs, see :py:func:`grid_configs`
+        :param ledger: shared :py:class:`ledger.BalanceLedger`, already seeded
+        :param bucket: (optional) shared :py:class:`ratelimit.TokenBucket`
+        :param concurrency: orders in flight while bootstrapping
+        :param log: callable taking one message string
+        :param state: (optional) :py:class:`gridstate.GridState` to persist to
+            and warm-restart from
+        :param journal: (optional) :py:class:`filljournal.FillJournal` fills
+            are appended to
+        :param metrics: (optional) :py:class:`metrics.Registry`, defaults to
+            :py:data:`metrics.REGISTRY`
+        """
+        self.client = client
+        self.ledger = ledger
+        self.bucket = bucket
+        self.concurrency = concurrency
+        self.log = log
+        self.state = state
+        self.journal = journal
+        self.restored = []
+        self.grids = [Grid(cfg) for cfg in configs]
+        self.by_market = {}
+        for grid in self.grids:
+            if grid.market in self.by_market:
+                raise Exception('Market %s is configured twice' % grid.market)
+            self.by_market[grid.market] = grid
+        self.trades_filled = 0
+        self.metrics = metrics if metrics is not None else REGISTRY
+        self._pulse_seconds = self.metrics.histogram('bountybot_pulse_seconds', 'Engine pulse duration')
+        self._fills = {m: self.metrics.counter('bountybot_fills_total', 'Filled grid orders', market=m)
+                       for m in self.by_market}
+        self._flips = {m: self.metrics.counter('bountybot_flips_total', 'Replacement orders placed', market=m)
+                       for m in self.by_market}
+        self._open = {m: self.metrics.gauge('bountybot_open_orders', 'Tracked open grid orders', market=m)
+                      for m in self.by_market}
+        self._recenters = {m: self.metrics.counter('bountybot_recenters_total', 'Trailing grid re-centers',
+                                                   market=m) for m in self.by_market}
+
+    def tickers(self):
+        """ Tickers for every market from one ``markets()`` call. """
+        return market_tickers(self.client.markets())
+
+    def anchor(self, grid, tickers):
+        """ Price a fresh grid is laid out from. Normally the ticker ask; with
+        ``book_depth`` set, the ask level that many base units deep into the
+        live order book, so the first sells sit behind real liquidity rather
+        than in front of a thin top of book. Falls back to the ticker ask when
+        the book is thinner than that. """
+        depth = grid.cfg.get('book_depth')
+        if depth:
+            if self.bucket is not None:
+                self.bucket.acquire()
+            grid.book.apply(self.client.order_book(grid.market))
+            price = grid.book.price_at_depth('ask', float(depth))
+            if price is not None:
+                return price
+        return float(tickers[grid.market]['ask'])
+
+    def bootstrap(self, tickers=None, open_orders=None):
+        """ Pick up saved grids (see :py:meth:`restore`), then lay out every
+        other grid from the current asks and place all fundable levels in one
+        concurrent, rate-limited batch.
+
+        :param tickers: (optional) {market: ticker}, fetched if needed
+        :param open_orders: (optional) ``orders()`` response for the restore,
+            fetched if needed
+        :returns: per-level result rows for the newly placed grids, see
+            :py:func:`placement.plan_grid`
+        """
+        self.restored = self.restore(open_orders) if self.state is not None else []
+        fresh = [grid for grid in self.grids if grid.market not in self.restored]
+        if not fresh:
+            return []
+        tickers = tickers if tickers is not None else self.tickers()
+        budget = {}
+        rows = []
+        for grid in fresh:
+            buy_prices, sell_prices = grid.layout(self.anchor(grid, tickers))
+            if self.state is not None:
+                self.state.forget(grid.market)
+                self.state.save_ladder(grid.market, grid.ladder)
+            for currency in (grid.base, grid.quote):
+                budget.setdefault(currency, self.ledger.available(currency))
+            rows.extend(plan_grid(grid.market, grid.qty, buy_prices, sell_prices, budget,
+                                  grid.cfg.get('min_notional', MIN_NOTIONAL)))
+        submit_rows(self.client, rows, self.bucket, self.concurrency)
+        saved = defaultdict(list)
+        for row in rows:
+            if row['status'] == 'placed':
+                grid = self.by_market[row['market']]
+                self.ledger.reserve(row['uuid'], row['side'], grid.market, grid.qty, row['price'])
+                saved[grid.market].append((row['uuid'], row['side'], row['price'], grid.level_of(row['price'])))
+        for market, orders in saved.items():
+            self.by_market[market].orders.add_many(orders)
+            if self.state is not None:
+                self.state.add_many(market, orders)
+        return rows
+
+    def restore(self, open_orders=None):
+        """ Rebuild saved grids and reconcile them against one ``orders()``
+        snapshot: saved orders still open are adopted, saved orders that are
+        gone filled while the bot was down and get flipped, and open orders
+        sitting on a ladder level that never made it into the state (placed
+        just before a crash) are adopted too. The ledger is expected to have
+        been seeded from the same snapshot.
+
+        :returns: markets picked up from the state
+        """
+        if open_orders is None:
+            open_orders = self.client.orders()
+        if not isinstance(open_orders, list):
+            raise Exception('Bad orders response: %r' % (open_orders,))
+        by_market = defaultdict(list)
+        for order in open_orders:
+            by_market[order['market']].append(order)
+        restored = []
+        for grid in self.grids:
+            ladder = self.state.load_ladder(grid.market)
+            if ladder is None:
+                continue
+            if not grid.fits(ladder):
+                self.log(f"Ed: {grid.market} settings changed since last run, laying out a fresh grid!")
+                self.retire(grid, by_market.get(grid.market, []))
+                continue
+            grid.ladder = ladder
+            grid.orders.add_many((uuid, side, ladder.fixed(level), level)
+                                 for uuid, side, _, level in self.state.orders(grid.market))
+            live = by_market.get(grid.market, [])
+            for order in live:
+                level = grid.level_of(order['price'])
+                if order['uuid'] not in grid.orders and level is not None:
+                    price = ladder.fixed(level)
+                    grid.orders.add(order['uuid'], order['type'], price, level)
+                    self.state.add(grid.market, order['uuid'], order['type'], price, level)
+            for uuid in grid.orders.sync(live).removed:
+                if uuid in grid.orders:
+                    self.flip(grid, uuid)
+            self.log(f"Ed: {grid.market} grid is back with {len(grid.orders)} orders, no re-grid needed!")
+            restored.append(grid.market)
+        return restored
+
+    def retire(self, grid, live):
+        """ Cancel a saved grid that no longer fits its config: every saved
+        order still in ``live`` (the market's ``orders()`` entries) is
+        cancelled and its funds released, then the saved state is dropped, so
+        the fresh grid is budgeted without the old one holding funds. Orders
+        whose cancel fails stay reserved and go to ``grid.stale``, retried
+        every pulse like a re-centre's (see :py:meth:`retry_cancels`).
+
+        :returns: uuids whose cancel failed (left open on the exchange)
+        """
+        saved = {uuid for uuid, _, _, _ in self.state.orders(grid.market)}
+        stale = [order['uuid'] for order in live if order['uuid'] in saved]
+        cancelled = cancel_orders(self.client, stale, self.bucket, self.concurrency)
+        failed = [uuid for uuid, ok in cancelled.items() if not ok]
+        for uuid, ok in cancelled.items():
+            if ok:
+                self.ledger.release(uuid)
+        self.state.forget(grid.market)
+        grid.stale.extend(failed)
+        self.log(f"Ed: Cleared {len(stale) - len(failed)} old {grid.market} orders off the book"
+                 + (f", {len(failed)} wouldn't cancel, retrying next pulse" if failed else "") + "!")
+        return failed
+
+    def pulse(self):
+        """ Detect fills across all grids and flip them.
+
+        :returns: (fills, {market: last price})
+        """
+        started = time.perf_counter()
+        if not self.client.available('orders'):
+            self.log("Ed: Exchange isn't answering, sitting this pulse out... zzz")
+            return 0, {}
+        snapshot = self.client.orders()
+        if not isinstance(snapshot, list):
+            raise Exception('Bad orders response: %r' % (snapshot,))
+        by_market = defaultdict(list)
+        for order in snapshot:
+            by_market[order['market']].append(order)
+        fills = 0
+        for grid in self.grids:
+            live = by_market.get(grid.market, [])
+            events = grid.orders.sync(live)
+            if grid.pending:
+                self.retry_pending(grid, [order for order in live if order['uuid'] in events.added])
+            if grid.stale:
+                self.retry_cancels(grid, {order['uuid'] for order in live})
+            for uuid in events.removed:
+                if uuid in grid.orders:
+                    self.flip(grid, uuid)
+                    fills += 1
+            self._open[grid.market].set(len(grid.orders))
+        try:
+            tickers = self.tickers()
+            prices = {m: float(tickers[m]['price']) for m in self.by_market if 'price' in tickers.get(m, {})}
+        except Exception as exc:
+            self.log(f"Ed: No prices this pulse ({exc}), flips still went out!")
+            prices = {}
+        for grid in self.grids:
+            if grid.cfg.get('trail') and grid.market in prices:
+                self.recenter(grid, prices[grid.market])
+        self._pulse_seconds.observe(time.perf_counter() - started)
+        return fills, prices
+
+    def crossed(self, market, price):
+        """ Whether ``price`` has reached one of ``market``'s grid orders (at
+        or below a buy, at or above a sell), i.e. whether a pulse now would
+        likely find a fill. Cheap enough to call on every tick of a
+        :py:class:`stream.MarketFeed`, from its thread. """
+        grid = self.by_market.get(market)
+        if grid is None:
+            return False
+        # two reads, O(1) however deep the grid: the store keeps both bounds current
+        buy, sell = grid.orders.highest_buy, grid.orders.lowest_sell
+        return (buy is not None and price <= buy) or (sell is not None and price >= sell)
+
+    def reconcile(self, balances):
+        """ Reconcile the ledger against a ``balances()`` response and
+        publish the drift per currency.
+
+        :returns: see :py:meth:`ledger.BalanceLedger.reconcile`
+        """
+        drift = self.ledger.reconcile(balances)
+        for currency in set(self.ledger.totals) | set(drift):
+            self.metrics.gauge('bountybot_ledger_drift', 'Exchange minus ledger total at the last reconcile',
+                               currency=currency).set(drift.get(currency, 0.0))
+        return drift
+
+    def recenter(self, grid, price):
+        """ Move a trailing grid (``trail`` on) back around ``price`` once
+        the price is more than ``trail_hysteresis`` levels past either end.
+
+        The ladder is shifted by whole levels so every level the old and new
+        grid share keeps its price; orders already on a shared level with the
+        right side stay put: buys below the price, sells above, and the level
+        just under the price left empty for the next flip. One pass over
+        the tracked orders and the new levels finds the rest, which are
+        cancelled and placed in bulk.
+
+        :returns: (cancelled, placed) counts, or None if the grid stayed
+        """
+        ladder = grid.ladder
+        position = ladder.position(price)
+        slack = grid.cfg.get('trail_hysteresis', DEFAULT_TRAIL_HYSTERESIS)
+        if -slack <= position <= ladder.count - 1 + slack:
+            return None
+        if grid.pending:
+            # unsettled flips belong to the old levels; let the next snapshot settle them first
+            return None
+        shift = int(round(position - (ladder.count - 1) / 2.0))
+        new = ladder.shifted(shift)
+        first_sell = new.below(price)
+        gap = first_sell - 1
+
+        keep, cancel = set(), []
+        for order in grid.orders:
+            level = order.level - shift
+            side = 'buy' if level < gap else 'sell'
+            if 0 <= level < new.count and level != gap and order.side == side and level not in keep:
+                keep.add(level)
+            else:
+                cancel.append(order.uuid)
+        cancelled = cancel_orders(self.client, cancel, self.bucket, self.concurrency)
+        gone = [uuid for uuid, ok in cancelled.items() if ok]
+        failed = [uuid for uuid, ok in cancelled.items() if not ok]
+        grid.orders.remove_many(gone + failed)
+        for uuid in gone:
+            self.ledger.release(uuid)
+        if self.state is not None:
+            for uuid in gone + failed:
+                self.state.remove(uuid)
+        # a failed cancel is off the new grid either way; it keeps its funds reserved until retry_cancels settles it
+        grid.stale.extend(failed)
+        grid.orders.relevel(-shift)
+        grid.ladder = new
+        if self.state is not None:
+            self.state.relevel(grid.market, -shift)
+            self.state.save_ladder(grid.market, new)
+
+        missing = [level for level in range(new.count) if level not in keep and level != gap]
+        buy_prices = [new.fixed(level) for level in missing if level < gap]
+        sell_prices = [new.fixed(level) for level in missing if level >= first_sell]
+        budget = {currency: self.ledger.available(currency) for currency in (grid.base, grid.quote)}
+        rows = plan_grid(grid.market, grid.qty, buy_prices, sell_prices, budget,
+                         grid.cfg.get('min_notional', MIN_NOTIONAL))
+        submit_rows(self.client, rows, self.bucket, self.concurrency)
+        placed = []
+        for row in rows:
+            if row['status'] == 'placed':
+                self.ledger.reserve(row['uuid'], row['side'], grid.market, grid.qty, row['price'])
+                placed.append((row['uuid'], row['side'], row['price'], new.index(row['price'])))
+        grid.orders.add_many(placed)
+        if self.state is not None:
+            self.state.add_many(grid.market, placed)
+        self._recenters[grid.market].inc()
+        self._open[grid.market].set(len(grid.orders))
+        self.log(f"Ed: {grid.market} wandered off to {price}, grid slides {shift:+d} levels "
+                 f"({len(keep)} kept, {len(gone)} cancelled, {len(placed)} placed"
+                 + (f", {len(failed)} cancels failed, retrying next pulse" if failed else "")
+                 + ")! Follow that bounty!")
+        return len(gone), len(placed)
+
+    def retry_cancels(self, grid, open_uuids):
+        """ Cancel again the orders a re-centre could not (``grid.stale``).
+        Ones no longer in ``open_uuids`` filled meanwhile and are settled in
+        the ledger as fills (the next reconcile corrects it if they were
+        cancelled after all); ones whose cancel fails again stay for the next
+        pulse. """
+        stale, grid.stale = grid.stale, []
+        retry = [uuid for uuid in stale if uuid in open_uuids]
+        for uuid in stale:
+            if uuid not in open_uuids:
+                self.ledger.fill(uuid)
+        for uuid, ok in cancel_orders(self.client, retry, self.bucket, self.concurrency).items():
+            if ok:
+                self.ledger.release(uuid)
+            else:
+                grid.stale.append(uuid)
+
+    def flip(self, grid, uuid):
+        """ Settle a filled order and replace it with the opposite side one
+        level over. """
+        order = grid.orders.remove(uuid)
+        self.log(f"Ed: {grid.market} order at {order.price} filled, time to FLIP! 🤩")
+        self.ledger.fill(uuid)
+        self._fills[grid.market].inc()
+        if self.journal is not None:
+            self.journal.append(grid.market, order.side, order.level, order.price, grid.qty)
+        grid.trades_filled += 1
+        self.trades_filled += 1
+        side, price, level = grid.flip_target(order)
+        self.place_flip(grid, {'uuid': uuid, 'side': side, 'price': price, 'level': level})
+
+    def place_flip(self, grid, flip):
+        """ Place a flip's order, or park it in ``grid.pending``.
+
+        :returns: True if it was placed
+        """
+        side, price = flip['side'], flip['price']
+        if not self.client.available(side):
+            grid.pending.append(flip)
+            return False
+        if self.bucket is not None:
+            self.bucket.acquire()
+        try:
+            if side == 'buy':
+                resp = self.client.buy(grid.market, grid.qty, price)
+            else:
+                resp = self.client.sell(grid.market, grid.qty, price)
+        except Exception as exc:
+            # it may or may not have landed: the next snapshot decides, never a blind resend
+            self.log(f"Ed: {side} at {price} went into the void ({exc}), checking next pulse!")
+            grid.pending.append(flip)
+            return False
+        if not isinstance(resp, dict) or 'uuid' not in resp:
+            self.log(f"Ed: {side} at {price} bounced: {resp.get('error', resp) if isinstance(resp, dict) else resp}")
+            grid.pending.append(flip)
+            return False
+        self.adopt(grid, flip, resp['uuid'])
+        self.log(f"Ed: Now {side} at {price}... WHEEE!")
+        return True
+
+    def adopt(self, grid, flip, uuid):
+        """ Track ``uuid`` as the order placed for ``flip``. """
+        grid.orders.add(uuid, flip['side'], flip['price'], flip['level'])
+        if self.state is not None:
+            self.state.replace(grid.market, flip['uuid'], uuid, flip['side'], flip['price'], flip['level'])
+        self.ledger.reserve(uuid, flip['side'], grid.market, grid.qty, flip['price'])
+        self._flips[grid.market].inc()
+
+    def retry_pending(self, grid, unknown_orders):
+        """ Settle pending flips: adopt an untracked open order at the flip's
+        side and price if the snapshot has one (an earlier attempt landed
+        after all), otherwise try placing it again.
+
+        :param unknown_orders: open orders in this grid's market that the
+            store did not know about
+        """
+        pending, grid.pending = grid.pending, []
+        # match on exact price units rather than level: flips past either end of the ladder have no ladder index
+        key = grid.ladder.key
+        unknown = {}
+        for order in unknown_orders:
+            unknown.setdefault((order['type'], key(order['price'])), []).append(order['uuid'])
+        for flip in pending:
+            landed = unknown.get((flip['side'], key(flip['price'])))
+            if landed:
+                self.adopt(grid, flip, landed.pop())
+                self.log(f"Ed: Found our {flip['side']} at {flip['price']} on the book after all!")
+            else:
+                self.place_flip(grid, flip)
@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+exchange_sim.py – Local TradeOgre stand-in with a matching engine.
+
+Usage:
+    python exchange_sim.py --market XTM-USDT=0.0065 --fund KEY:USDT=1000 --fund KEY:XTM=5000
+    # then set "api_uri": "http://127.0.0.1:8099/api/v1" in bountybot_config.json
+
+Implements the endpoints :py:class:`tradeogre.TradeOgre` calls with
+price-time priority matching, per-key balances and optional latency/error
+injection. It can be served over localhost HTTP (:py:func:`serve`) or
+mounted straight onto a client's session (:py:func:`attach`), which skips
+sockets entirely so the simulator never becomes the bottleneck in benchmarks.
+
+Served over HTTP it also pushes market data: ``GET /api/v1/stream?markets=...``
+is a Server-Sent Events stream of ticker changes and trades as they happen
+(see :py:class:`stream.PushFeed`).
+"""
+import argparse
+import base64
+import bisect
+import io
+import json
+import queue
+import random
+import threading
+import time
+import uuid as uuidlib
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from funcs import ticker_base_currency, ticker_pair_currency
+
+# Account used by move_price() to trade against resting orders.
+MARKET_TAKER = '__market__'
+
+# Seconds of silence before a push stream sends a keep-alive comment.
+STREAM_KEEPALIVE_SECS = 10
+
+
+def _fmt(x):
+    return '%.8f' % x
+
+
+class _Book(object):
+    """ One market's resting orders. Each side maps price -> {uuid: order}
+    (dicts keep insertion order, i.e. time priority) plus a sorted list of
+    the prices that have orders. """
+
+    def __init__(self, price):
+        self.levels = {'buy': {}, 'sell': {}}
+        self.prices = {'buy': [], 'sell': []}
+        self.last = price
+        self.initial = price
+        self.high = price
+        self.low = price
+        self.volume = 0.0
+        self.history = deque(maxlen=100)
+
+    def best(self, side):
+        prices = self.prices[side]
+        if not prices:
+            return None
+        return prices[-1] if side == 'buy' else prices[0]
+
+    def add(self, order):
+        side, price = order['type'], order['price']
+        level = self.levels[side].get(price)
+        if level is None:
+            level = self.levels[side][price] = {}
+            bisect.insort(self.prices[side], price)
+        level[order['uuid']] = order
+
+    def remove(self, order):
+        side, price = order['type'], order['price']
+        level = self.levels[side][price]
+        del level[order['uuid']]
+        if not level:
+            del self.levels[side][price]
+            prices = self.prices[side]
+            del prices[bisect.bisect_left(prices, price)]
+
+
+class SimExchange(object):
+    """ In-memory exchange. All state sits behind one lock, so it can be
+    driven from many client threads at once.
+
+    Balances are per API key; :py:meth:`fund` credits them. Resting orders
+    lock ``qty * price`` quote (buys) or ``qty`` base (sells).
+    """
+
+    def __init__(self, markets=None, latency=0.0, error_rate=0.0, error_status=503, seed=None):
+        """
+        :param markets: {market: starting price}
+        :param latency: seconds added to every request, or (min, max)
+        :param error_rate: share of requests answered with ``error_status``
+            and a non-JSON body
+        """
+        self.books = {m: _Book(float(p)) for m, p in (markets or {}).items()}
+        self.accounts = {}  # key -> {currency: [total, locked]}
+        self.orders = {}  # uuid -> order (open or not)
+        self.open_by_key = {}  # key -> {uuid: order}
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = 0
+        self.watchers = []  # callables fed (channel, market, body) on every ticker change and trade
+        self._published = {}  # market -> ticker body last sent to watchers
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+
+    # --- accounts ---------------------------------------------------------
+
+    def _account(self, key):
+        return self.accounts.setdefault(key, {})
+
+    def _wallet(self, key, currency):
+        return self._account(key).setdefault(currency, [0.0, 0.0])
+
+    def fund(self, key, currency, amount):
+        with self._lock:
+            self._wallet(key, currency)[0] += amount
+
+    def add_market(self, market, price):
+        with self._lock:
+            self.books[market] = _Book(float(price))
+
+    # --- push -------------------------------------------------------------
+
+    def watch(self, callback):
+        """ Call ``callback(channel, market, body)`` for every trade
+        (channel 'trades', a ``history()`` entry) and every ticker change
+        (channel 'ticker', a ``ticker()`` body). It runs under the exchange
+        lock, so it must only hand the event off. """
+        with self._lock:
+            self.watchers.append(callback)
+
+    def unwatch(self, callback):
+        with self._lock:
+            if callback in self.watchers:
+                self.watchers.remove(callback)
+
+    def _push(self, channel, market, body):
+        for callback in list(self.watchers):
+            callback(channel, market, body)
+
+    def _push_ticker(self, market):
+        """ Push ``market``'s ticker if it differs from the last one pushed. """
+        if not self.watchers:
+            return
+        ticker = self.ticker(market)
+        if ticker != self._published.get(market):
+            self._published[market] = ticker
+            self._push('ticker', market, ticker)
+
+    # --- matching ---------------------------------------------------------
+
+    def _settle(self, maker, taker, price, qty, now):
+        """ Move funds for ``qty`` traded at ``price`` between two orders. """
+        market = maker['market']
+        base, quote = ticker_base_currency(market), ticker_pair_currency(market)
+        for order in (maker, taker):
+            key = order['key']
+            if key == MARKET_TAKER:
+                continue
+            b, q = self._wallet(key, base), self._wallet(key, quote)
+            if order['type'] == 'buy':
+                q[0] -= qty * price
+                q[1] -= qty * order['price']  # locked at the limit price; refund any improvement
+                b[0] += qty
+            else:
+                b[0] -= qty
+                b[1] -= qty
+                q[0] += qty * price
+        book = self.books[market]
+        book.last = price
+        book.high = max(book.high, price)
+        book.low = min(book.low, price)
+        book.volume += qty * price
+        book.history.append({'date': int(now), 'type': taker['type'], 'price': _fmt(price), 'quantity': _fmt(qty)})
+        if self.watchers:
+            self._push('trades', market, book.history[-1])
+
+    def _match(self, book, taker, now):
+        opposite = 'sell' if taker['type'] == 'buy' else 'buy'
+        while taker['quantity'] > 1e-12:
+            best = book.best(opposite)
+            if best is None:
+                break
+            if (taker['type'] == 'buy' and best > taker['price']) or (taker['type'] == 'sell' and best < taker['price']):
+                break
+            level = book.levels[opposite][best]
+            maker = next(iter(level.values()))
+            qty = min(maker['quantity'], taker['quantity'])
+            self._settle(maker, taker, best, qty, now)
+            maker['quantity'] -= qty
+            maker['filled'] += qty
+            taker['quantity'] -= qty
+            taker['filled'] += qty
+            if maker['quantity'] <= 1e-12:
+                book.remove(maker)
+                self.open_by_key.get(maker['key'], {}).pop(maker['uuid'], None)
+
+    def place(self, key, side, market, qty, price):
+        """ Submit a limit order. Returns the TradeOgre-style response. """
+        with self._lock:
+            book = self.books.get(market)
+            if book is None:
+                return {'success': False, 'error': 'Invalid market'}
+            qty, price = float(qty), float(price)
+            if qty <= 0 or price <= 0:
+                return {'success': False, 'error': 'Invalid quantity or price'}
+            base, quote = ticker_base_currency(market), ticker_pair_currency(market)
+            if key != MARKET_TAKER:
+                currency, need = (quote, qty * price) if side == 'buy' else (base, qty)
+                wallet = self._wallet(key, currency)
+                if wallet[0] - wallet[1] < need - 1e-12:
+                    return {'success': False, 'error': 'Insufficient funds'}
+                wallet[1] += need
+            now = time.time()
+            order = {'uuid': str(uuidlib.uuid4()), 'key': key, 'market': market, 'type': side, 'price': price,
+                     'quantity': qty, 'filled': 0.0, 'date': int(now)}
+            self.orders[order['uuid']] = order
+            self._match(book, order, now)
+            if order['quantity'] > 1e-12 and key != MARKET_TAKER:
+                book.add(order)
+                self.open_by_key.setdefault(key, {})[order['uuid']] = order
+            resp = {'success': True, 'uuid': order['uuid']}
+            if key != MARKET_TAKER:
+                resp['bnewbalavail'] = _fmt(self._available(key, quote))
+                resp['snewbalavail'] = _fmt(self._available(key, base))
+            self._push_ticker(market)
+            return resp
+
+    def cancel(self, key, uuid):
+        with self._lock:
+            mine = self.open_by_key.get(key, {})
+            targets = list(mine.values()) if uuid == 'all' else [mine[uuid]] if uuid in mine else None
+            if targets is None:
+                return {'success': False, 'error': 'Order not found'}
+            for order in targets:
+                market = order['market']
+                self.books[market].remove(order)
+                del mine[order['uuid']]
+                if order['type'] == 'buy':
+                    self._wallet(key, ticker_pair_currency(market))[1] -= order['quantity'] * order['price']
+                else:
+                    self._wallet(key, ticker_base_currency(market))[1] -= order['quantity']
+                self._push_ticker(market)
+            return {'success': True}
+
+    def move_price(self, market, price):
+        """ Trade the market to ``price`` as an outside taker, filling every
+        resting order it crosses, and make it the last price. """
+        with self._lock:
+            book = self.books[market]
+            price = float(price)
+            best_ask, best_bid = book.best('sell'), book.best('buy')
+            if best_ask is not None and price >= best_ask:
+                self.place(MARKET_TAKER, 'buy', market, sum(o['quantity'] for p in book.prices['sell'] if p <= price
+                                                            for o in book.levels['sell'][p].values()), price)
+            elif best_bid is not None and price <= best_bid:
+                self.place(MARKET_TAKER, 'sell', market, sum(o['quantity'] for p in book.prices['buy'] if p >= price
+                                                             for o in book.levels['buy'][p].values()), price)
+            book.last = price
+            book.high = max(book.high, price)
+            book.low = min(book.low, price)
+            self._push_ticker(market)
+
+    def _available(self, key, currency):
+        total, locked = self._wallet(key, currency)
+        return total - locked
+
+    # --- read side --------------------------------------------------------
+
+    def ticker(self, market):
+        book = self.books[market]
+        bid, ask = book.best('buy'), book.best('sell')
+        return {'success': True, 'initialprice': _fmt(book.initial), 'price': _fmt(book.last),
+                'high': _fmt(book.high), 'low': _fmt(book.low), 'volume': _fmt(book.volume),
+                'bid': _fmt(bid if bid is not None else book.last), 'ask': _fmt(ask if ask is not None else book.last)}
+
+    def order_book(self, market):
+        book = self.books[market]
+        return {'success': 'true',
+                'buy': {_fmt(p): _fmt(sum(o['quantity'] for o in book.levels['buy'][p].values()))
+                        for p in reversed(book.prices['buy'])},
+                'sell': {_fmt(p): _fmt(sum(o['quantity'] for o in book.levels['sell'][p].values()))
+                         for p in book.prices['sell']}}
+
+    def open_orders(self, key, market=''):
+        return [{'uuid': o['uuid'], 'date': o['date'], 'type': o['type'], 'price': _fmt(o['price']),
+                 'quantity': _fmt(o['quantity']), 'market': o['market']}
+                for o in self.open_by_key.get(key, {}).values() if not market or o['market'] == market]
+
+    # --- HTTP-shaped entry point ------------------------------------------
+
+    def handle(self, method, path, form=None, headers=None):
+        """ Serve one API request. ``path`` starts at ``/api/v1``.
+
+        :returns: (status, body) where body is JSON-serialisable, or a
+            str for injected non-JSON errors
+        """
+        self.requests += 1
+        if self.latency:
+            lo, hi = self.latency if isinstance(self.latency, (tuple, list)) else (self.latency, self.latency)
+            time.sleep(self._random.uniform(lo, hi))
+        if self.error_rate and self._random.random() < self.error_rate:
+            return self.error_status, '<html><body>%d Service Unavailable</body></html>' % self.error_status
+        form = form or {}
+        parts = [p for p in path.split('?')[0].split('/') if p][2:]  # drop 'api', 'v1'
+        key = _basic_key((headers or {}).get('Authorization'))
+        with self._lock:
+            try:
+                return self._route(method, parts, form, key)
+            except KeyError as exc:
+                return 404, {'success': False, 'error': 'Unknown %s' % exc}
+
+    def _route(self, method, parts, form, key):
+        head = parts[0] if parts else ''
+        if head == 'markets':
+            return 200, [{m: {k: v for k, v in self.ticker(m).items() if k != 'success'}} for m in self.books]
+        if head == 'ticker':
+            return 200, self.ticker(parts[1])
+        if head == 'orders':
+            return 200, self.order_book(parts[1])
+        if head == 'history':
+            return 200, list(reversed(self.books[parts[1]].history))
+        if key is None:
+            return 401, {'success': False, 'error': 'Must be authorized'}
+        if head == 'account':
+            what = parts[1]
+            if what == 'balance':
+                total, locked = self._wallet(key, form['currency'])
+                return 200, {'success': True, 'balance': _fmt(total), 'available': _fmt(total - locked)}
+            if what == 'balances':
+                return 200, {'success': True, 'balances': {c: _fmt(w[0]) for c, w in self._account(key).items()}}
+            if what == 'orders':
+                return 200, self.open_orders(key, form.get('market', ''))
+            if what == 'order':
+                o = self.orders.get(parts[2])
+                if o is None or o['key'] != key:
+                    return 200, {'success': False, 'error': 'Order not found'}
+                return 200, {'success': True, 'date': o['date'], 'type': o['type'], 'market': o['market'],
+                             'price': _fmt(o['price']), 'quantity': _fmt(o['quantity'] + o['filled']),
+                             'fulfilled': _fmt(o['filled'])}
+        if head == 'order':
+            what = parts[1]
+            if what in ('buy', 'sell'):
+                return 200, self.place(key, what, form['market'], form['quantity'], form['price'])
+            if what == 'cancel':
+                return 200, self.cancel(key, form['uuid'])
+        return 404, {'success': False, 'error': 'Unknown endpoint'}
+
+
+def _basic_key(header):
+    """ API key from an HTTP basic Authorization header, or None. """
+    if not header or not header.startswith('Basic '):
+        return None
+    try:
+        return base64.b64decode(header[6:]).decode('latin1').split(':', 1)[0]
+    except Exception:
+        return None
+
+
+def _form(body):
+    return {k: v[-1] for k, v in parse_qs(body or '').items()}
+
+
+class SimHandler(BaseHTTPRequestHandler):
+    """ Keep-alive HTTP front end for :py:attr:`server.sim`. """
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _serve(self, method):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode() if length else ''
+        status, payload = self.server.sim.handle(method, self.path, _form(body), self.headers)
+        data = payload.encode() if isinstance(payload, str) else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html" if isinstance(payload, str) else "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self):
+        """ Server-Sent Events: the current ticker of each requested market,
+        then every ticker change and trade until the client goes away. """
+        sim = self.server.sim
+        query = parse_qs(urlsplit(self.path).query)
+        markets = set(','.join(query.get('markets', [])).split(',')) - {''} or set(sim.books)
+        channels = set(','.join(query.get('channels', [])).split(',')) - {''} or {'ticker', 'trades'}
+        events = queue.Queue()
+
+        def watcher(channel, market, body):
+            if market in markets and channel in channels:
+                events.put((channel, market, body))
+
+        with sim._lock:
+            if 'ticker' in channels:
+                for market in markets & set(sim.books):
+                    events.put(('ticker', market, sim.ticker(market)))
+            sim.watch(watcher)
+        self.close_connection = True
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Transfer-Encoding", "chunked")  # one chunk per event, so clients see it at once
+            self.send_header("Connection", "close")
+            self.end_headers()
+            while True:
+                try:
+                    channel, market, body = events.get(timeout=STREAM_KEEPALIVE_SECS)
+                except queue.Empty:
+                    data = b": keep-alive\n\n"
+                else:
+                    body = {k: v for k, v in body.items() if k != 'success'}
+                    body['market'] = market
+                    data = ("event: %s\ndata: %s\n\n" % (channel, json.dumps(body))).encode()
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            sim.unwatch(watcher)
+
+    def do_GET(self):
+        if urlsplit(self.path).path.rstrip('/').endswith('/stream'):
+            self._stream()
+            return
+        self._serve('GET')
+
+    def do_POST(self):
+        self._serve('POST')
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def serve(sim, host="127.0.0.1", port=0):
+    """ Serve ``sim`` over HTTP in a daemon thread.
+
+    :returns: (server, api uri to put in :py:attr:`TradeOgre.uri`)
+    """
+    server = ThreadingHTTPServer((host, port), SimHandler)
+    server.daemon_threads = True
+    server.sim = sim
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, "http://%s:%d/api/v1" % (host, server.server_address[1])
+
+
+def attach(client, sim, base="http://sim.local"):
+    """ Route a :py:class:`tradeogre.TradeOgre` client's requests straight
+    into ``sim`` through a requests transport adapter (no sockets). """
+    import requests
+    from requests.adapters import BaseAdapter
+    from requests.structures import CaseInsensitiveDict
+
+    class SimAdapter(BaseAdapter):
+        def send(self, request, **kwargs):
+            body = request.body.decode() if isinstance(request.body, bytes) else request.body
+            status, payload = sim.handle(request.method, urlsplit(request.url).path, _form(body),
+                                         request.headers)
+            resp = requests.Response()
+            resp.status_code = status
+            resp._content = payload.encode() if isinstance(payload, str) else json.dumps(payload).encode()
+            resp.headers = CaseInsensitiveDict({'Content-Type': 'text/html' if isinstance(payload, str)
+                                                else 'application/json'})
+            resp.encoding = 'utf-8'
+            resp.raw = io.BytesIO(resp._content)
+            resp.url = request.url
+            resp.request = request
+            return resp
+
+        def close(self):
+            pass
+
+    client.session.mount(base, SimAdapter())
+    client.uri = base + '/api/v1'
+    return client
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local TradeOgre stand-in")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--market", action="append", default=[], metavar="MARKET=PRICE")
+    parser.add_argument("--fund", action="append", default=[], metavar="KEY:CURRENCY=AMOUNT")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests that fail")
+    args = parser.parse_args()
+
+    sim = SimExchange({m.split('=')[0]: float(m.split('=')[1]) for m in args.market or ['XTM-USDT=0.0065']},
+                      latency=args.latency, error_rate=args.error_rate)
+    for spec in args.fund:
+        who, amount = spec.rsplit('=', 1)
+        key, currency = who.split(':', 1)
+        sim.fund(key, currency, float(amount))
+    server, uri = serve(sim, port=args.port)
+    print(f"Jet: Sim exchange up at {uri} -- Ctrl+C to close the bar.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+filljournal.py – Append-only binary journal of grid fills.
+
+Usage:
+    python filljournal.py bountybot_fills.bin          # PnL per level, round trips per day, holding time
+    python filljournal.py bountybot_fills.bin --fee 0.002
+
+Every fill is one fixed-width 45-byte record (see ``FILL_DTYPE``) appended
+after a 16-byte header, so the whole file maps straight onto a NumPy
+structured array with no parsing. Queries pair each buy at level L with a
+sell at level L + 1 (the grid's round trip) in time order, all vectorized.
+"""
+import argparse
+import os
+import struct
+import time
+
+import numpy as np
+
+DEFAULT_JOURNAL_FILE = 'bountybot_fills.bin'
+
+MAGIC = b'BBFILLS1'
+HEADER_SIZE = 16
+# time, market, side (+1 buy / -1 sell), level, price, quantity
+RECORD = struct.Struct('<d16sbidd')
+FILL_DTYPE = np.dtype([('time', '<f8'), ('market', 'S16'), ('side', 'i1'), ('level', '<i4'),
+                       ('price', '<f8'), ('qty', '<f8')])
+assert FILL_DTYPE.itemsize == RECORD.size
+# ``level`` of a fill whose grid level is unknown. A flip past the bottom of
+# the ladder has real negative levels, so -1 cannot mean "unknown".
+NO_LEVEL = int(np.iinfo('<i4').min)
+
+ROUND_TRIP_DTYPE = np.dtype([('market', 'S16'), ('level', '<i4'), ('open_time', '<f8'), ('close_time', '<f8'),
+                             ('buy_price', '<f8'), ('sell_price', '<f8'), ('qty', '<f8'), ('pnl', '<f8')])
+
+DAY_SECS = 86400
+
+
+class FillJournal(object):
+    """ Appends fills to ``path``. Each :py:meth:`append` is one ``write``
+    of a packed record on a buffered file, flushed per record so a crash
+    loses nothing the OS already has. """
+
+    def __init__(self, path=DEFAULT_JOURNAL_FILE):
+        self.path = path
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, 'ab')
+        if new:
+            self.file.write(MAGIC.ljust(HEADER_SIZE, b'\0'))
+            self.file.flush()
+        else:
+            with open(path, 'rb') as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    raise Exception('%s is not a fill journal' % path)
+
+    def append(self, market, side, level, price, qty, when=None):
+        """ Record one fill. ``side`` is the filled order's side; a None
+        ``level`` is stored as :py:data:`NO_LEVEL`. """
+        self.file.write(RECORD.pack(time.time() if when is None else when, market.encode(),
+                                    1 if side == 'buy' else -1, NO_LEVEL if level is None else level, price, qty))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __len__(self):
+        self.file.flush()
+        return (os.path.getsize(self.path) - HEADER_SIZE) // RECORD.size
+
+
+def read_fills(path, market=None):
+    """ Memory-map a journal as a ``FILL_DTYPE`` array (a trailing partial
+    record from a crash mid-write is ignored).
+
+    :param market: (optional) only this market's fills (a copy)
+    """
+    count = max(0, (os.path.getsize(path) - HEADER_SIZE) // RECORD.size)
+    if not count:
+        return np.empty(0, dtype=FILL_DTYPE)
+    fills = np.memmap(path, dtype=FILL_DTYPE, mode='r', offset=HEADER_SIZE, shape=(count,))
+    if market is not None:
+        fills = fills[fills['market'] == market.encode()]
+    return fills
+
+
+def _market_codes(markets):
+    """ (distinct markets, int code per row). One vectorized compare per
+    distinct market, which beats sorting millions of strings. """
+    code = np.zeros(len(markets), dtype='i8')
+    todo = np.ones(len(markets), dtype=bool)
+    found = []
+    while todo.any():
+        market = markets[np.argmax(todo)]
+        hit = markets == market
+        code[hit] = len(found)
+        found.append(market)
+        todo &= ~hit
+    return found, code
+
+
+def _ranks(keys):
+    """ 0, 1, 2... within each run of equal values in a sorted array. """
+    if not len(keys):
+        return np.empty(0, dtype='i8')
+    starts = np.r_[True, keys[1:] != keys[:-1]]
+    idx = np.arange(len(keys))
+    return idx - np.maximum.accumulate(np.where(starts, idx, 0))
+
+
+def round_trips(fills, fee=0.0):
+    """ Completed round trips: the n-th buy at level L paired with the n-th
+    sell at level L + 1 of the same market, whichever came first. ``level``
+    in the result is L; ``pnl`` is net of ``fee`` on both legs. Fills at
+    :py:data:`NO_LEVEL` cannot be paired and are left out.
+
+    :returns: ``ROUND_TRIP_DTYPE`` array
+    """
+    fills = np.asarray(fills)
+    known = fills['level'] != NO_LEVEL
+    if not known.all():
+        fills = fills[known]
+    # contiguous copies: gathering from the 45-byte strided records is several times slower
+    times, prices, qtys = (np.ascontiguousarray(fills[name]) for name in ('time', 'price', 'qty'))
+    side, level = np.ascontiguousarray(fills['side']), fills['level'].astype('i8')
+    markets, code = _market_codes(fills['market'])
+    pair = level - (side == -1)  # a sell at L + 1 belongs to pair L
+    # one small group id per (market, pair): under 2 ** 16 groups NumPy's stable sort is a radix sort
+    low = pair.min() if len(pair) else 0
+    span = (pair.max() - low + 1) if len(pair) else 1
+    group = code * span + (pair - low)
+    if group.max(initial=0) < 1 << 16:
+        group = group.astype('u2')
+    # the journal is appended in time order, so a stable sort on the group keeps each group's fills in order
+    chrono = np.all(times[1:] >= times[:-1])
+    legs = []
+    for sign in (1, -1):
+        idx = np.flatnonzero(side == sign)
+        if not chrono:
+            idx = idx[np.argsort(times[idx], kind='stable')]
+        idx = idx[np.argsort(group[idx], kind='stable')]
+        key = group[idx].astype('i8')
+        legs.append((idx, (key << 32) | _ranks(key)))
+    (b_idx, b_key), (s_idx, s_key) = legs
+    _, bi, si = np.intersect1d(b_key, s_key, assume_unique=True, return_indices=True)
+    b, s = b_idx[bi], s_idx[si]
+    out = np.empty(len(b), dtype=ROUND_TRIP_DTYPE)
+    out['market'] = np.array(markets, dtype='S16')[code[b]] if markets else b''
+    buy_price, sell_price = prices[b], prices[s]
+    buy_qty, sell_qty = qtys[b], qtys[s]
+    buy_time, sell_time = times[b], times[s]
+    out['level'] = level[b]
+    out['open_time'] = np.minimum(buy_time, sell_time)
+    out['close_time'] = np.maximum(buy_time, sell_time)
+    out['buy_price'] = buy_price
+    out['sell_price'] = sell_price
+    qty = np.minimum(buy_qty, sell_qty)
+    out['qty'] = qty
+    out['pnl'] = qty * (sell_price - buy_price) - fee * (buy_qty * buy_price + sell_qty * sell_price)
+    return out
+
+
+def pnl_by_level(trips):
+    """ Realized PnL per grid level from :py:func:`round_trips`.
+
+    :returns: {(market, level): pnl}
+    """
+    markets, code = _market_codes(trips['market'])
+    keys, inverse = np.unique((code << 32) | (trips['level'].astype('i8') + (1 << 31)),
+                              return_inverse=True)
+    totals = np.bincount(inverse.ravel(), weights=trips['pnl'], minlength=len(keys))
+    return {(markets[k >> 32].decode(), int((k & 0xFFFFFFFF) - (1 << 31))): float(v) for k, v in zip(keys, totals)}
+
+
+def round_trips_per_day(trips):
+    """ {UTC day (YYYY-MM-DD): round trips closed that day} """
+    days, counts = np.unique((trips['close_time'] // DAY_SECS).astype('i8'), return_counts=True)
+    return {time.strftime('%Y-%m-%d', time.gmtime(int(d) * DAY_SECS)): int(c) for d, c in zip(days, counts)}
+
+
+def mean_holding_secs(trips):
+    """ Average seconds between a round trip's opening and closing fill. """
+    if not len(trips):
+        return None
+    return float(np.mean(trips['close_time'] - trips['open_time']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BountyBot fill journal report")
+    parser.add_argument("journal", nargs="?", default=DEFAULT_JOURNAL_FILE)
+    parser.add_argument("--market", help="only this market")
+    parser.add_argument("--fee", type=float, default=0.0, help="fee rate charged on each leg")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    fills = read_fills(args.journal, args.market)
+    trips = round_trips(fills, args.fee)
+    print(f"Jet: {len(fills)} fills, {len(trips)} round trips "
+          f"(crunched in {(time.perf_counter() - started) * 1000:.1f} ms)")
+    print("MARKET       LEVEL  PNL")
+    for (market, level), pnl in sorted(pnl_by_level(trips).items()):
+        print(f"{market:<12} {level:<6} {pnl:.8f}")
+    for day, count in round_trips_per_day(trips).items():
+        print(f"{day}  {count} round trips")
+    holding = mean_holding_secs(trips)
+    print(f"Average holding time: {holding:.1f}s" if holding is not None else "No round trips yet.")
+
+
+if __name__ == "__main__":
+    main()
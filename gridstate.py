@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+gridstate.py – Grid state that survives a restart.
+
+Every grid's ladder parameters and every order the bot placed (uuid, side,
+price, level) are written to a small SQLite file as they change. On startup
+:py:meth:`engine.GridEngine.bootstrap` rebuilds the grids from it and
+reconciles them against one ``orders()`` call instead of placing everything
+again and orphaning the old grid on the exchange.
+"""
+import sqlite3
+
+from ladder import Ladder
+from ticks import Fixed
+
+DEFAULT_STATE_FILE = 'bountybot_state.db'
+
+# Prices are stored as REAL; 8-decimal values round-trip exactly through a double.
+sqlite3.register_adapter(Fixed, float)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ladders (
+    market TEXT PRIMARY KEY,
+    lower REAL NOT NULL,
+    upper REAL NOT NULL,
+    count INTEGER NOT NULL,
+    tick REAL NOT NULL,
+    kind TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS orders (
+    uuid TEXT PRIMARY KEY,
+    market TEXT NOT NULL,
+    side TEXT NOT NULL,
+    price REAL NOT NULL,
+    level INTEGER
+);
+CREATE INDEX IF NOT EXISTS orders_market ON orders (market);
+"""
+
+
+class GridState(object):
+    """ SQLite-backed record of each grid's ladder and live orders.
+
+    Writes commit straight away; with WAL and ``synchronous=NORMAL`` that is
+    a few tens of microseconds, so it can sit in the pulse loop.
+    """
+
+    def __init__(self, path=DEFAULT_STATE_FILE):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(SCHEMA)
+
+    def save_ladder(self, market, ladder):
+        with self.db:
+            self.db.execute('INSERT OR REPLACE INTO ladders VALUES (?, ?, ?, ?, ?, ?)',
+                            (market, ladder.lower, ladder.upper, ladder.count, ladder.tick, ladder.kind))
+
+    def load_ladder(self, market):
+        """ The market's saved :py:class:`ladder.Ladder`, or None. """
+        row = self.db.execute('SELECT lower, upper, count, tick, kind FROM ladders WHERE market = ?',
+                              (market,)).fetchone()
+        return Ladder(*row) if row else None
+
+    def orders(self, market):
+        """ Saved orders for a market as ``(uuid, side, price, level)``
+        tuples, ready for :py:meth:`orderstore.OrderStore.add_many`. """
+        return self.db.execute('SELECT uuid, side, price, level FROM orders WHERE market = ?', (market,)).fetchall()
+
+    def add(self, market, uuid, side, price, level):
+        self.add_many(market, [(uuid, side, price, level)])
+
+    def add_many(self, market, orders):
+        """ Save ``(uuid, side, price, level)`` tuples in one transaction. """
+        with self.db:
+            self.db.executemany('INSERT OR REPLACE INTO orders VALUES (?, ?, ?, ?, ?)',
+                                [(uuid, market, side, price, level) for uuid, side, price, level in orders])
+
+    def replace(self, market, old_uuid, new_uuid, side, price, level):
+        """ Swap a filled order for its flip atomically. """
+        with self.db:
+            self.db.execute('DELETE FROM orders WHERE uuid = ?', (old_uuid,))
+            self.db.execute('INSERT OR REPLACE INTO orders VALUES (?, ?, ?, ?, ?)',
+                            (new_uuid, market, side, price, level))
+
+    def relevel(self, market, offset):
+        """ Add ``offset`` to the level of every saved order in a market. """
+        with self.db:
+            self.db.execute('UPDATE orders SET level = level + ? WHERE market = ?', (offset, market))
+
+    def remove(self, uuid):
+        with self.db:
+            self.db.execute('DELETE FROM orders WHERE uuid = ?', (uuid,))
+
+    def forget(self, market):
+        """ Drop everything saved for a market. """
+        with self.db:
+            self.db.execute('DELETE FROM orders WHERE market = ?', (market,))
+            self.db.execute('DELETE FROM ladders WHERE market = ?', (market,))
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+ladder.py – Grid price ladders snapped to the market tick size.
+
+Levels are computed in one shot from their index (``lower + i * step`` or
+``lower * ratio ** i``), so nothing drifts however many levels there are or
+how often an order flips, and every price is a whole number of ticks.
+Exact prices live in ``units`` (integers of ``10 ** -decimals``); level
+lookups compare those, and :py:meth:`Ladder.fixed` hands out
+:py:class:`ticks.Fixed` prices for orders.
+"""
+import bisect
+import math
+
+import numpy as np
+
+from ticks import Fixed, to_units, tick_decimals
+
+# TradeOgre quotes prices with 8 decimals.
+DEFAULT_TICK = 1e-8
+
+
+class Ladder(object):
+    """ Sorted, tick-aligned grid levels.
+
+    ``prices`` is a NumPy array; :py:meth:`price_at` also works past either
+    end of the ladder, so a flip from the outermost level lands exactly one
+    step further out instead of drifting by float ``± gridstep``.
+    """
+
+    def __init__(self, lower, upper, count, tick=DEFAULT_TICK, kind='arithmetic'):
+        """
+        :param lower: first level
+        :param upper: levels stop below this, like :py:func:`funcs.generate_grid`
+        :param count: number of levels
+        :param tick: market price increment
+        :param kind: 'arithmetic' (equal steps) or 'geometric' (equal ratios)
+        """
+        if upper <= lower or lower <= 0:
+            raise ValueError('Ladder needs 0 < lower < upper, got %r..%r' % (lower, upper))
+        if count < 2:
+            raise ValueError('Ladder needs at least 2 levels')
+        if kind not in ('arithmetic', 'geometric'):
+            raise ValueError('Unknown ladder kind %r' % (kind,))
+        self.lower = float(lower)
+        self.upper = float(upper)
+        self.count = int(count)
+        self.tick = float(tick)
+        self.kind = kind
+        self.decimals = tick_decimals(tick)
+        self.scale = 10 ** self.decimals
+        self.tick_units = to_units(self.tick, self.decimals)
+        if kind == 'arithmetic':
+            self.step = (self.upper - self.lower) / self.count
+        else:
+            self.step = (self.upper / self.lower) ** (1.0 / self.count)
+        self.units = self.units_at(np.arange(self.count))
+        if np.any(np.diff(self.units) <= 0):
+            raise ValueError('Grid spacing is finer than the tick size %r' % (tick,))
+        self.prices = self.units / self.scale
+        self._units = self.units.tolist()
+        self._list = self.prices.tolist()
+
+    @classmethod
+    def arithmetic(cls, lower, upper, count, tick=DEFAULT_TICK):
+        return cls(lower, upper, count, tick, 'arithmetic')
+
+    @classmethod
+    def geometric(cls, lower, upper, count, tick=DEFAULT_TICK):
+        return cls(lower, upper, count, tick, 'geometric')
+
+    def snap(self, price):
+        """ Round a price (or array of prices) to the nearest tick. """
+        return np.round(np.rint(np.asarray(price, dtype='f8') / self.tick) * self.tick, self.decimals)
+
+    def units_at(self, level):
+        """ Exact tick-aligned price of a level index (scalar or array) in
+        ``10 ** -decimals`` units, including indexes outside ``0..count-1``. """
+        level = np.asarray(level)
+        if self.kind == 'arithmetic':
+            raw = self.lower + level * self.step
+        else:
+            raw = self.lower * self.step ** level
+        units = np.rint(raw / self.tick).astype(np.int64) * self.tick_units
+        return int(units) if units.ndim == 0 else units
+
+    def price_at(self, level):
+        """ :py:meth:`units_at` as a float (scalar or array). """
+        return self.units_at(level) / self.scale
+
+    def fixed(self, level):
+        """ Price of a level (any index) as a :py:class:`ticks.Fixed`. """
+        return Fixed(self.units_at(level), self.decimals)
+
+    def key(self, price):
+        """ Exact integer key of a price (str, float or Fixed) on this ladder's
+        scale: equal for every spelling of the same tick-rounded price. """
+        return to_units(price, self.decimals)
+
+    def position(self, price):
+        """ Fractional level index of any price: 0.0 at the first level,
+        ``count - 1`` at the last, negative or beyond past either end. """
+        if self.kind == 'arithmetic':
+            return (price - self.lower) / self.step
+        return math.log(price / self.lower) / math.log(self.step)
+
+    def shifted(self, levels):
+        """ The same ladder moved ``levels`` steps up (down if negative):
+        level ``i`` of the result is level ``i + levels`` of this one, so
+        the levels both share keep their exact prices. """
+        if self.kind == 'arithmetic':
+            lower, upper = self.lower + levels * self.step, self.upper + levels * self.step
+        else:
+            lower, upper = self.lower * self.step ** levels, self.upper * self.step ** levels
+        return Ladder(lower, upper, self.count, self.tick, self.kind)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, level):
+        return self._list[level]
+
+    def __iter__(self):
+        return iter(self._list)
+
+    def index(self, price):
+        """ Level index of a ladder price (str, float or Fixed), or None.
+        Compared in integer units, so "0.00650000" and 0.0065 both match.
+        O(log n). """
+        key = self.key(price)
+        i = bisect.bisect_left(self._units, key)
+        if i < self.count and self._units[i] == key:
+            return i
+        return None
+
+    def nearest(self, price):
+        """ Index of the level closest to ``price``. O(log n). """
+        i = bisect.bisect_left(self._list, price)
+        if i == 0:
+            return 0
+        if i == self.count:
+            return self.count - 1
+        return i if self._list[i] - price < price - self._list[i - 1] else i - 1
+
+    def neighbours(self, price):
+        """ Indexes of the closest level strictly below and strictly above
+        ``price`` (None past either end). O(log n). """
+        lo = bisect.bisect_left(self._list, price) - 1
+        hi = bisect.bisect_right(self._list, price)
+        return (lo if lo >= 0 else None), (hi if hi < self.count else None)
+
+    def below(self, price):
+        """ Number of levels strictly below ``price``. O(log n). """
+        return bisect.bisect_left(self._list, float(price))
+
+    def split(self, price):
+        """ Levels below ``price`` (buy band) and at/above it (sell band), as
+        :py:class:`ticks.Fixed` prices. """
+        i = self.below(price)
+        return ([Fixed(units, self.decimals) for units in self._units[:i]],
+                [Fixed(units, self.decimals) for units in self._units[i:]])
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+ledger.py – Local balance reservation ledger.
+
+Seeded from one ``balances()`` call, the ledger tracks what each open order
+has locked so the bot can check funds locally instead of asking the exchange
+before every order and every flip. It is reconciled against the exchange
+every so often; any difference (fees, manual trades, missed fills) is
+reported as drift and the exchange figure wins.
+"""
+import logging
+
+from funcs import ticker_base_currency, ticker_pair_currency
+
+# Differences smaller than this are float noise, not drift.
+DRIFT_EPSILON = 1e-9
+
+
+class BalanceLedger(object):
+    """ Per-currency totals plus the funds reserved by each open order.
+
+    ``available = total - reserved``. Buys on 'XTM-USDT' reserve
+    ``qty * price`` USDT, sells reserve ``qty`` XTM. Not thread-safe: mutate
+    it from the pulse loop only.
+    """
+
+    def __init__(self):
+        self.totals = {}
+        self.reserved = {}
+        self.holds = {}  # uuid -> (side, market, qty, price)
+
+    @staticmethod
+    def _parse(balances):
+        """ ``balances()`` response (or a plain mapping) -> {currency: float}. """
+        if 'success' in balances:
+            if not isinstance(balances.get('balances'), dict):
+                raise Exception('Bad balances response: %r' % (balances,))
+            balances = balances['balances']
+        return {currency: float(amount or 0) for currency, amount in balances.items()}
+
+    @staticmethod
+    def _locks(side, market, qty, price):
+        """ (currency, amount) an order of this shape keeps locked. """
+        if side == 'buy':
+            return ticker_pair_currency(market), qty * price
+        return ticker_base_currency(market), qty
+
+    def seed(self, balances, open_orders=()):
+        """ Reset from a ``balances()`` response and reserve funds for
+        orders that are already open on the exchange.
+
+        :param balances: ``balances()`` response
+        :param open_orders: (optional) ``orders()`` response
+        """
+        self.totals = self._parse(balances)
+        self.reserved = {}
+        self.holds = {}
+        for order in open_orders if isinstance(open_orders, list) else ():
+            self.reserve(order['uuid'], order['type'], order['market'], float(order['quantity']),
+                         float(order['price']))
+
+    def total(self, currency):
+        return self.totals.get(currency, 0.0)
+
+    def available(self, currency):
+        return self.totals.get(currency, 0.0) - self.reserved.get(currency, 0.0)
+
+    def can_afford(self, side, market, qty, price):
+        currency, amount = self._locks(side, market, qty, price)
+        return amount <= self.available(currency) + DRIFT_EPSILON
+
+    def reserve(self, uuid, side, market, qty, price):
+        """ Record a successfully placed order and lock its funds. """
+        currency, amount = self._locks(side, market, qty, price)
+        self.reserved[currency] = self.reserved.get(currency, 0.0) + amount
+        self.holds[uuid] = (side, market, qty, price)
+
+    def release(self, uuid):
+        """ Unlock the funds of a cancelled order. Unknown uuids are ignored. """
+        hold = self.holds.pop(uuid, None)
+        if hold is None:
+            return None
+        currency, amount = self._locks(*hold)
+        self.reserved[currency] = self.reserved.get(currency, 0.0) - amount
+        return hold
+
+    def fill(self, uuid):
+        """ Settle a fully filled order: its reservation is spent and the
+        counter currency is credited (fees are left to reconcile). """
+        hold = self.release(uuid)
+        if hold is None:
+            return None
+        side, market, qty, price = hold
+        base, quote = ticker_base_currency(market), ticker_pair_currency(market)
+        sign = 1 if side == 'buy' else -1
+        self.totals[base] = self.totals.get(base, 0.0) + sign * qty
+        self.totals[quote] = self.totals.get(quote, 0.0) - sign * qty * price
+        return hold
+
+    def reconcile(self, balances):
+        """ Adopt exchange totals from a ``balances()`` response.
+
+        :returns: {currency: exchange_total - ledger_total} for every
+            currency that drifted
+        """
+        exchange = self._parse(balances)
+        drift = {}
+        for currency in set(exchange) | set(self.totals):
+            delta = exchange.get(currency, 0.0) - self.totals.get(currency, 0.0)
+            if abs(delta) > DRIFT_EPSILON:
+                drift[currency] = delta
+        self.totals = exchange
+        if drift:
+            logging.info("[Spike] Ledger drifted from the exchange: %r", drift)
+        return drift
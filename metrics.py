@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+metrics.py – In-process counters, gauges and histograms with a
+Prometheus-style text exporter.
+
+The client and the engine record into :py:data:`REGISTRY` by default;
+``serve(REGISTRY, port)`` exposes it at ``http://127.0.0.1:port/metrics``.
+Engine metrics update under a per-metric lock; the client's per-request
+bookkeeping is buffered (see :py:class:`ClientMetrics`) so it stays well
+under a microsecond.
+"""
+import bisect
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Request latency buckets in seconds (upper bounds, +Inf is implicit).
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_text(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join('%s="%s"' % (k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in labels) + '}'
+
+
+class Counter(object):
+    kind = 'counter'
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name, labels):
+        yield name, labels, self.value
+
+
+class Gauge(object):
+    kind = 'gauge'
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self.value -= amount
+
+    def samples(self, name, labels):
+        yield name, labels, self.value
+
+
+class Histogram(object):
+    """ Fixed-bucket histogram; :py:meth:`observe` is one bisect and three
+    additions. """
+    kind = 'histogram'
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.bounds = tuple(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def observe_many(self, values):
+        slots = [bisect.bisect_left(self.bounds, value) for value in values]
+        with self._lock:
+            for i in slots:
+                self.counts[i] += 1
+            self.sum += sum(values)
+            self.count += len(slots)
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float('inf'),), self.counts):
+            cumulative += count
+            yield name + '_bucket', labels + (('le', '+Inf' if bound == float('inf') else repr(bound)),), cumulative
+        yield name + '_sum', labels, self.sum
+        yield name + '_count', labels, self.count
+
+
+class Registry(object):
+    """ Named metric families, each holding one metric per label set.
+
+    ``counter``/``gauge``/``histogram`` get-or-create, so callers on a hot
+    path should look a metric up once and keep it.
+    """
+
+    def __init__(self):
+        self.families = {}  # name -> (kind, help, {labels: metric})
+        self.collectors = []  # callables run before rendering, e.g. ClientMetrics.fold
+        self.client_metrics = None  # see ClientMetrics.shared()
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help, labels, *args):
+        key = tuple(sorted(labels.items()))
+        family = self.families.get(name)
+        if family is None or key not in family[2]:
+            with self._lock:
+                family = self.families.setdefault(name, (cls.kind, help, {}))
+                if family[0] != cls.kind:
+                    raise Exception('Metric %s is a %s, not a %s' % (name, family[0], cls.kind))
+                family[2].setdefault(key, cls(*args))
+        return family[2][key]
+
+    def counter(self, name, help='', **labels):
+        return self._get(Counter, name, help, labels)
+
+    def gauge(self, name, help='', **labels):
+        return self._get(Gauge, name, help, labels)
+
+    def histogram(self, name, help='', buckets=LATENCY_BUCKETS, **labels):
+        return self._get(Histogram, name, help, labels, buckets)
+
+    def render(self):
+        """ Everything in the Prometheus text exposition format. """
+        for collect in list(self.collectors):
+            collect()
+        lines = []
+        for name, (kind, help, metrics) in sorted(self.families.items()):
+            if help:
+                lines.append('# HELP %s %s' % (name, help))
+            lines.append('# TYPE %s %s' % (name, kind))
+            for labels, metric in list(metrics.items()):
+                for sample, sample_labels, value in metric.samples(name, labels):
+                    lines.append('%s%s %s' % (sample, _label_text(sample_labels), repr(float(value))))
+        return '\n'.join(lines) + '\n'
+
+
+# Shared by the client and the engine unless they are handed another one.
+REGISTRY = Registry()
+
+
+class ClientMetrics(object):
+    """ Per-endpoint request latency, outcome counts and in-flight requests
+    for a :py:class:`tradeogre.TradeOgre` client.
+
+    ``outcome`` is the HTTP status code, or the error kind when there was
+    no usable response (``timeout``, ``connection``, ``bad_body``, ...).
+    The request path only appends to two deques (atomic, no lock); the
+    events are folded into the registry's metrics when it is rendered or
+    every ``fold_every`` requests.
+    """
+
+    def __init__(self, registry=None, fold_every=4096):
+        self.registry = registry if registry is not None else REGISTRY
+        self.fold_every = fold_every
+        self._begun = deque()
+        self._done = deque()
+        self._endpoints = {}
+        self._outcomes = {}
+        self._lock = threading.Lock()
+        self.registry.collectors.append(self.fold)
+
+    @classmethod
+    def shared(cls, registry=None):
+        """ The one instance recording into ``registry`` (default
+        :py:data:`REGISTRY`) for every client built with ``metrics=True``,
+        so short-lived clients don't each leave a collector behind. """
+        registry = registry if registry is not None else REGISTRY
+        with registry._lock:
+            if registry.client_metrics is None:
+                registry.client_metrics = cls(registry)
+            return registry.client_metrics
+
+    def begin(self, endpoint):
+        """ Mark a request as started; pass the result to :py:meth:`end`. """
+        self._begun.append(endpoint)
+        return endpoint, time.perf_counter()
+
+    def end(self, token, outcome):
+        self._done.append((token[0], time.perf_counter() - token[1], outcome))
+        if len(self._done) >= self.fold_every:
+            self.fold()
+
+    def _endpoint(self, endpoint):
+        metrics = self._endpoints.get(endpoint)
+        if metrics is None:
+            metrics = self._endpoints[endpoint] = (
+                self.registry.histogram('tradeogre_request_seconds', 'Request latency by endpoint',
+                                        endpoint=endpoint),
+                self.registry.gauge('tradeogre_requests_in_flight', 'Requests waiting for a response',
+                                    endpoint=endpoint))
+        return metrics
+
+    def fold(self):
+        """ Move buffered request events into the registry's metrics. """
+        with self._lock:
+            started, latencies, outcomes = {}, {}, {}
+            begun, done = self._begun, self._done
+            while begun:
+                endpoint = begun.popleft()
+                started[endpoint] = started.get(endpoint, 0) + 1
+            while done:
+                endpoint, seconds, outcome = done.popleft()
+                latencies.setdefault(endpoint, []).append(seconds)
+                outcomes[(endpoint, outcome)] = outcomes.get((endpoint, outcome), 0) + 1
+            for endpoint, count in started.items():
+                self._endpoint(endpoint)[1].inc(count)
+            for endpoint, seconds in latencies.items():
+                latency, in_flight = self._endpoint(endpoint)
+                latency.observe_many(seconds)
+                in_flight.dec(len(seconds))
+            for key, count in outcomes.items():
+                counter = self._outcomes.get(key)
+                if counter is None:
+                    counter = self._outcomes[key] = self.registry.counter(
+                        'tradeogre_requests_total', 'Requests by endpoint and outcome', endpoint=key[0],
+                        outcome=key[1])
+                counter.inc(count)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """ Serves :py:attr:`server.registry` at ``/metrics``. """
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def serve(registry=None, port=9108, host='127.0.0.1'):
+    """ Expose ``registry`` over HTTP from a daemon thread.
+
+    :returns: the server (``server.shutdown()`` stops it)
+    """
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    server.registry = registry if registry is not None else REGISTRY
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
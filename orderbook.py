@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+orderbook.py – Local mirror of a market's order book.
+
+Each ``order_book()`` snapshot is diffed against the previous one and only
+the price levels that changed are inserted into / removed from the sorted
+price lists. Best bid/ask are O(1); cumulative depth, VWAP-to-size and the
+price a given size reaches are a bisect over running totals (O(log n)),
+rebuilt lazily once per snapshot.
+"""
+import bisect
+from collections import namedtuple
+from itertools import accumulate
+
+BookDiff = namedtuple('BookDiff', ['bids', 'asks'])
+BookDiff.__doc__ = """ Result of :py:meth:`OrderBook.apply`: per side, {price: new quantity}
+for every level that changed, 0.0 for levels that went away. """
+
+
+class OrderBook(object):
+    """ Bids and asks of one market as {price: quantity} plus ascending price
+    lists. Sides are named 'bid' (buy orders) and 'ask' (sell orders).
+    """
+
+    def __init__(self, market=None):
+        self.market = market
+        self.bids = {}
+        self.asks = {}
+        self._prices = {'bid': [], 'ask': []}  # ascending; best bid is last, best ask first
+        self._totals = {}  # side -> (prices best first, cumulative qty, cumulative notional)
+        self.snapshots = 0
+
+    @staticmethod
+    def _levels(side):
+        return {float(price): float(qty) for price, qty in (side or {}).items() if float(qty) > 0}
+
+    def _book(self, side):
+        return self.bids if side == 'bid' else self.asks
+
+    def apply(self, snapshot):
+        """ Adopt an ``order_book()`` response.
+
+        :returns: :py:class:`BookDiff` against the previous snapshot
+        """
+        if not isinstance(snapshot, dict) or snapshot.get('success') in (False, 'false'):
+            raise Exception('Bad order book response: %r' % (snapshot,))
+        diff = BookDiff(self._update('bid', self._levels(snapshot.get('buy'))),
+                        self._update('ask', self._levels(snapshot.get('sell'))))
+        self.snapshots += 1
+        return diff
+
+    def _update(self, side, levels):
+        book, prices = self._book(side), self._prices[side]
+        changed = {price: qty for price, qty in levels.items() if book.get(price) != qty}
+        for price in book.keys() - levels.keys():
+            changed[price] = 0.0
+        if len(changed) * 8 > len(prices):
+            # a new or reshuffled book: one sort beats an insort per level
+            for price, qty in changed.items():
+                if qty == 0.0:
+                    del book[price]
+                else:
+                    book[price] = qty
+            prices[:] = sorted(book)
+        else:
+            for price, qty in changed.items():
+                if qty == 0.0:
+                    del book[price]
+                    del prices[bisect.bisect_left(prices, price)]
+                else:
+                    if price not in book:
+                        bisect.insort(prices, price)
+                    book[price] = qty
+        if changed:
+            self._totals.pop(side, None)
+        return changed
+
+    def _running(self, side):
+        """ (prices best first, cumulative qty, cumulative notional) """
+        totals = self._totals.get(side)
+        if totals is None:
+            book = self._book(side)
+            prices = self._prices[side][::-1] if side == 'bid' else list(self._prices[side])
+            qty = [book[price] for price in prices]
+            totals = self._totals[side] = (prices, list(accumulate(qty)),
+                                           list(accumulate(p * q for p, q in zip(prices, qty))))
+        return totals
+
+    def best_bid(self):
+        prices = self._prices['bid']
+        return prices[-1] if prices else None
+
+    def best_ask(self):
+        prices = self._prices['ask']
+        return prices[0] if prices else None
+
+    def spread(self):
+        bid, ask = self.best_bid(), self.best_ask()
+        return ask - bid if bid is not None and ask is not None else None
+
+    def mid(self):
+        bid, ask = self.best_bid(), self.best_ask()
+        return (ask + bid) / 2 if bid is not None and ask is not None else None
+
+    def levels(self, side, count=None):
+        """ [(price, quantity)] best first, ``count`` levels or all. """
+        prices = self._running(side)[0][:count]
+        book = self._book(side)
+        return [(price, book[price]) for price in prices]
+
+    def depth(self, side, levels):
+        """ Quantity resting in the best ``levels`` price levels of a side. """
+        cumulative = self._running(side)[1]
+        if not cumulative or levels <= 0:
+            return 0.0
+        return cumulative[min(levels, len(cumulative)) - 1]
+
+    def price_at_depth(self, side, size):
+        """ Price of the level where cumulative quantity from the top of
+        ``side`` first reaches ``size``, or None if the book is thinner. """
+        prices, cumulative, _ = self._running(side)
+        i = bisect.bisect_left(cumulative, size)
+        return prices[i] if i < len(prices) else None
+
+    def vwap(self, side, size):
+        """ Average price of filling ``size`` against ``side`` ('ask' is what
+        a buyer pays, 'bid' what a seller gets), or None if the book is
+        thinner than ``size``. """
+        prices, cumulative, notional = self._running(side)
+        if size <= 0:
+            return None
+        i = bisect.bisect_left(cumulative, size)
+        if i >= len(prices):
+            return None
+        before_qty = cumulative[i - 1] if i else 0.0
+        before_notional = notional[i - 1] if i else 0.0
+        return (before_notional + (size - before_qty) * prices[i]) / size
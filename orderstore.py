@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+orderstore.py – Tracked grid orders indexed by uuid and by grid level.
+
+Each pulse hands the store the latest ``orders()`` response; set differences
+against what was known open before turn that into added / removed / changed
+events in O(N + M), instead of scanning the whole open list once per
+tracked order.
+
+Orders are :py:class:`GridOrder` records (``__slots__``, no per-order dict)
+and a level maps straight to its order, so a tracked order costs under 200
+bytes rather than nearly 500 with the dict-per-order layout (see
+``python bench.py memory``).
+"""
+from collections import namedtuple
+
+OrderEvents = namedtuple('OrderEvents', ['added', 'removed', 'changed'])
+OrderEvents.__doc__ = """ Result of :py:meth:`OrderStore.sync`, lists of uuids.
+
+added: open on the exchange but not known before (e.g. placed by hand)
+removed: known open before, gone now (filled or cancelled)
+changed: still open but price/quantity moved (e.g. partially filled)
+"""
+
+
+class GridOrder(object):
+    """ One tracked order: ``uuid``, ``side`` ('buy'/'sell'), ``price`` and
+    ``level`` (index into the grid). """
+    __slots__ = ('uuid', 'side', 'price', 'level')
+
+    def __init__(self, uuid, side, price, level=None):
+        self.uuid = uuid
+        self.side = side
+        self.price = price
+        self.level = level
+
+    def __repr__(self):
+        return 'GridOrder(%r, %r, %r, %r)' % (self.uuid, self.side, self.price, self.level)
+
+
+class OrderStore(object):
+    """ The bot's own orders as :py:class:`GridOrder` records indexed by uuid
+    and by level, plus the last exchange snapshot.
+    """
+
+    def __init__(self):
+        self.by_uuid = {}
+        self.by_level = {}  # level -> order, or a list of orders if several share it
+        self.snapshot = {}  # uuid -> (price, quantity) as last seen in orders()
+        # the prices a market move reaches first, kept current on every change so a
+        # price feed thread can check for crossings in O(1) (see GridEngine.crossed)
+        self.highest_buy = None
+        self.lowest_sell = None
+        self._stale_bounds = False
+
+    def __len__(self):
+        return len(self.by_uuid)
+
+    def __iter__(self):
+        return iter(list(self.by_uuid.values()))
+
+    def __contains__(self, uuid):
+        return uuid in self.by_uuid
+
+    def get(self, uuid):
+        return self.by_uuid.get(uuid)
+
+    def at_level(self, level):
+        """ Orders currently tracked at a grid level. """
+        found = self.by_level.get(level)
+        if found is None:
+            return []
+        return list(found) if isinstance(found, list) else [found]
+
+    def _index(self, order):
+        if order.side == 'buy':
+            if self.highest_buy is None or order.price > self.highest_buy:
+                self.highest_buy = order.price
+        elif self.lowest_sell is None or order.price < self.lowest_sell:
+            self.lowest_sell = order.price
+        found = self.by_level.get(order.level)
+        if found is None:
+            self.by_level[order.level] = order
+        elif isinstance(found, list):
+            found.append(order)
+        else:
+            self.by_level[order.level] = [found, order]
+
+    def _unindex(self, order):
+        if order.price == (self.highest_buy if order.side == 'buy' else self.lowest_sell):
+            self._stale_bounds = True
+        found = self.by_level.get(order.level)
+        if found is order:
+            del self.by_level[order.level]
+        elif isinstance(found, list):
+            found.remove(order)
+            if len(found) == 1:
+                self.by_level[order.level] = found[0]
+
+    def _settle_bounds(self):
+        """ Rescan :py:attr:`highest_buy` / :py:attr:`lowest_sell` after the
+        order holding one of them went away (once per batch, not per order). """
+        if self._stale_bounds:
+            self._stale_bounds = False
+            orders = list(self.by_uuid.values())
+            self.highest_buy = max((o.price for o in orders if o.side == 'buy'), default=None)
+            self.lowest_sell = min((o.price for o in orders if o.side != 'buy'), default=None)
+
+    def _add(self, uuid, side, price, level):
+        order = GridOrder(uuid, side, price, level)
+        old = self.by_uuid.pop(uuid, None)
+        if old is not None:
+            self._unindex(old)
+        self.by_uuid[uuid] = order
+        self._index(order)
+        return order
+
+    def add(self, uuid, side, price, level=None):
+        order = self._add(uuid, side, price, level)
+        self._settle_bounds()
+        return order
+
+    def add_many(self, orders):
+        """ Track ``(uuid, side, price, level)`` tuples. """
+        for uuid, side, price, level in orders:
+            self._add(uuid, side, price, level)
+        self._settle_bounds()
+
+    def _remove(self, uuid):
+        order = self.by_uuid.pop(uuid, None)
+        if order is not None:
+            self._unindex(order)
+        return order
+
+    def remove(self, uuid):
+        order = self._remove(uuid)
+        self._settle_bounds()
+        return order
+
+    def remove_many(self, uuids):
+        """ Stop tracking several orders; returns the ones that were tracked. """
+        removed = [order for order in map(self._remove, uuids) if order is not None]
+        self._settle_bounds()
+        return removed
+
+    def replace(self, old_uuid, new_uuid, side, price, level=None):
+        """ Swap a filled order for its flip, keeping the same record. """
+        order = self._remove(old_uuid)
+        if order is None:
+            return self.add(new_uuid, side, price, level)
+        order.uuid, order.side, order.price, order.level = new_uuid, side, price, level
+        self.by_uuid[new_uuid] = order
+        self._index(order)
+        self._settle_bounds()
+        return order
+
+    def relevel(self, offset):
+        """ Add ``offset`` to every tracked order's level (the ladder under
+        them was shifted). """
+        self.by_level = {}
+        for order in self.by_uuid.values():
+            order.level += offset
+            self._index(order)
+
+    def sync(self, open_orders):
+        """ Diff an ``orders()`` response against the previous snapshot and
+        the tracked orders, then adopt it as the new snapshot.
+
+        Tracked orders count as known-open even if no snapshot has shown them
+        yet, so an order that fills between placement and the next pulse is
+        still reported as removed.
+
+        :returns: :py:class:`OrderEvents`
+        """
+        if not isinstance(open_orders, list):
+            raise Exception('Bad orders response: %r' % (open_orders,))
+        current = {o['uuid']: (o.get('price'), o.get('quantity')) for o in open_orders}
+        previous = self.snapshot
+        known = previous.keys() | self.by_uuid.keys()
+        now = current.keys()
+        added = list(now - known)
+        removed = list(known - now)
+        changed = [uuid for uuid in now & previous.keys() if current[uuid] != previous[uuid]]
+        self.snapshot = current
+        return OrderEvents(added, removed, changed)
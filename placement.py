@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+placement.py – Bulk grid placement for the bootstrap stage.
+
+Funds are checked once against a local budget, then every fundable level is
+submitted with bounded concurrency under a shared :py:class:`TokenBucket`,
+instead of one balance query + order + sleep per level.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from funcs import ticker_base_currency, ticker_pair_currency
+
+# TradeOgre rejects orders worth less than 1 unit of the quote currency.
+MIN_NOTIONAL = 1
+
+DEFAULT_CONCURRENCY = 8
+
+
+def plan_grid(market, qty, buy_prices, sell_prices, budget, min_notional=MIN_NOTIONAL):
+    """ Decide which grid levels can be funded. Buys spend ``qty * price``
+    of the quote currency, sells spend ``qty`` of the base currency; levels
+    are funded in list order until the budget runs out.
+
+    :param budget: {currency: amount} still available, debited in place so
+        several grids can be planned against one shared balance view
+
+    :returns: one row per level, status ``pending``, ``skipped_min`` or
+        ``skipped_funds``
+    """
+    base, quote = ticker_base_currency(market), ticker_pair_currency(market)
+    rows = []
+    for side, prices in (('buy', buy_prices), ('sell', sell_prices)):
+        for price in prices:
+            row = {'market': market, 'qty': qty, 'side': side, 'price': price,
+                   'status': 'pending', 'uuid': None, 'error': None}
+            currency, cost = (quote, qty * price) if side == 'buy' else (base, qty)
+            if qty * price < min_notional:
+                row['status'] = 'skipped_min'
+            elif cost > budget.get(currency, 0.0):
+                row['status'] = 'skipped_funds'
+            else:
+                budget[currency] = budget.get(currency, 0.0) - cost
+            rows.append(row)
+    return rows
+
+
+def submit_level(client, row, bucket=None):
+    """ Place the order described by ``row`` and record the outcome on it:
+    ``placed`` (with uuid and ``placed_at``, a ``time.monotonic()``
+    reading), ``rejected`` (exchange said no) or ``error``. """
+    if bucket is not None:
+        bucket.acquire()
+    place = client.buy if row['side'] == 'buy' else client.sell
+    try:
+        resp = place(row['market'], row['qty'], row['price'])
+    except Exception as exc:
+        row['status'] = 'error'
+        row['error'] = str(exc)
+        return row
+    if isinstance(resp, dict) and 'uuid' in resp:
+        row['status'] = 'placed'
+        row['uuid'] = resp['uuid']
+        row['placed_at'] = time.monotonic()
+    else:
+        row['status'] = 'rejected'
+        row['error'] = resp.get('error', resp) if isinstance(resp, dict) else resp
+    return row
+
+
+def submit_rows(client, rows, bucket=None, concurrency=DEFAULT_CONCURRENCY):
+    """ Submit every ``pending`` row, at most ``concurrency`` in flight, each
+    passing through ``bucket``. Rows may span several markets. """
+    pending = [row for row in rows if row['status'] == 'pending']
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(pending)))) as pool:
+            list(pool.map(lambda row: submit_level(client, row, bucket), pending))
+    return rows
+
+
+def cancel_orders(client, uuids, bucket=None, concurrency=DEFAULT_CONCURRENCY):
+    """ Cancel many orders, at most ``concurrency`` in flight, each passing
+    through ``bucket``.
+
+    :returns: {uuid: True if the exchange confirmed the cancel}
+    """
+    def cancel(uuid):
+        if bucket is not None:
+            bucket.acquire()
+        try:
+            resp = client.cancel(uuid)
+        except Exception:
+            return uuid, False
+        return uuid, isinstance(resp, dict) and resp.get('success') in (True, 'true')
+
+    if not uuids:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(uuids)))) as pool:
+        return dict(pool.map(cancel, uuids))
+
+
+def place_grid(client, market, qty, buy_prices, sell_prices, quote_available, base_available,
+               bucket=None, concurrency=DEFAULT_CONCURRENCY, min_notional=MIN_NOTIONAL):
+    """ Budget and place a whole grid in one go.
+
+    :param client: :py:class:`tradeogre.TradeOgre` (its pooled session is
+        shared by the worker threads)
+    :param market: market such as 'XTM-USDT'
+    :param qty: order size per level
+    :param buy_prices: buy levels, funded in order from ``quote_available``
+    :param sell_prices: sell levels, funded in order from ``base_available``
+    :param bucket: (optional) :py:class:`ratelimit.TokenBucket` every order
+        must pass through
+    :param concurrency: maximum orders in flight
+
+    :returns: per-level result table, see :py:func:`plan_grid`
+    """
+    budget = {ticker_pair_currency(market): quote_available, ticker_base_currency(market): base_available}
+    rows = plan_grid(market, qty, buy_prices, sell_prices, budget, min_notional)
+    return submit_rows(client, rows, bucket, concurrency)
+
+
+def grid_table(rows):
+    """ Render a result table from :py:func:`place_grid` as text lines. """
+    lines = ["MARKET       SIDE  PRICE            STATUS         UUID / ERROR"]
+    for row in rows:
+        detail = row['uuid'] or row['error'] or ''
+        lines.append(f"{row['market']:<12} {row['side'].upper():<5} {row['price']:<16.10g} {row['status']:<14} {detail}")
+    return lines
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+profiler.py – Per-pulse CPU and memory profiling for a running bot.
+
+Wrap each pulse in ``with profiler.pulse():``. While profiling is on, every
+pulse runs under cProfile and tracemalloc and leaves two files behind:
+
+    profiles/pulse-000042.prof   # cProfile stats: python -m pstats / snakeviz
+    profiles/pulse-000042.txt    # top functions by time, memory growth by line
+
+Only the newest ``keep`` pulses are kept on disk. ``profiles/memory.log``
+gets one line per profiled pulse (traced memory now, peak, growth since
+profiling started), which is the quickest way to spot a slow leak.
+
+:py:meth:`PulseProfiler.install` makes SIGUSR1 switch profiling on and off
+without a restart; the switch takes effect at the next pulse. While off, a
+pulse pays for one attribute check.
+"""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import signal
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+DEFAULT_PROFILE_DIR = 'profiles'
+# Frames tracemalloc keeps per allocation; more finds the real caller but costs more.
+TRACE_FRAMES = 5
+
+
+class PulseProfiler(object):
+    """ Rolling cProfile + tracemalloc reports, one pair of files per pulse. """
+
+    def __init__(self, directory=DEFAULT_PROFILE_DIR, enabled=False, keep=20, top=25):
+        """
+        :param directory: where reports are written (created on first use)
+        :param enabled: start with profiling on
+        :param keep: number of most recent pulses kept on disk
+        :param top: functions / allocation sites listed per report
+        """
+        self.directory = directory
+        self.keep = keep
+        self.top = top
+        self.wanted = enabled  # flipped by toggle(), applied at the next pulse
+        self.active = False
+        self.pulses = 0
+        self._baseline = None
+        self._previous = None
+        self._started_tracing = False
+
+    def toggle(self, signum=None, frame=None):
+        """ Switch profiling on/off (safe to use as a signal handler). """
+        self.wanted = not self.wanted
+
+    def install(self, signum=None):
+        """ Toggle profiling on ``signum`` (SIGUSR1 where the platform has it).
+
+        :returns: the signal number, or None if there is no such signal
+        """
+        signum = signum if signum is not None else getattr(signal, 'SIGUSR1', None)
+        if signum is not None:
+            signal.signal(signum, self.toggle)
+        return signum
+
+    @staticmethod
+    def _snapshot():
+        # leave out tracemalloc's own bookkeeping and the import machinery
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>')))
+
+    def _start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start(TRACE_FRAMES)
+        self._baseline = self._previous = self._snapshot()
+        self.active = True
+        logging.info("[Spike] Profiling on, reports in %s", self.directory)
+
+    def _stop(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+        self._baseline = self._previous = None
+        self.active = False
+        logging.info("[Spike] Profiling off.")
+
+    @contextmanager
+    def pulse(self):
+        """ Profile the enclosed pulse if profiling is on. """
+        if self.wanted and not self.active:
+            self._start()
+        elif self.active and not self.wanted:
+            self._stop()
+        if not self.active:
+            yield
+            return
+        self.pulses += 1
+        profile = cProfile.Profile()
+        tracemalloc.reset_peak()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self._report(profile, time.perf_counter() - started)
+
+    def _report(self, profile, elapsed):
+        name = os.path.join(self.directory, 'pulse-%06d' % self.pulses)
+        profile.dump_stats(name + '.prof')
+        snapshot = self._snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        growth = snapshot.compare_to(self._previous, 'lineno')
+        since = sum(stat.size_diff for stat in snapshot.compare_to(self._baseline, 'filename'))
+        self._previous = snapshot
+
+        text = io.StringIO()
+        text.write('pulse %d: %.1f ms, traced %.1f KiB (peak %.1f KiB), %+.1f KiB since profiling started\n\n'
+                   % (self.pulses, elapsed * 1000, current / 1024, peak / 1024, since / 1024))
+        pstats.Stats(profile, stream=text).sort_stats('cumulative').print_stats(self.top)
+        text.write('Memory growth this pulse by line:\n')
+        for stat in growth[:self.top]:
+            text.write('  %s\n' % stat)
+        with open(name + '.txt', 'w') as f:
+            f.write(text.getvalue())
+        with open(os.path.join(self.directory, 'memory.log'), 'a') as f:
+            f.write('%s pulse=%d ms=%.1f traced_kib=%.1f peak_kib=%.1f growth_kib=%+.1f\n'
+                    % (time.strftime('%Y-%m-%d %H:%M:%S'), self.pulses, elapsed * 1000, current / 1024,
+                       peak / 1024, since / 1024))
+
+        stale = self.pulses - self.keep
+        if stale > 0:
+            for ext in ('.prof', '.txt'):
+                try:
+                    os.remove(os.path.join(self.directory, 'pulse-%06d%s' % (stale, ext)))
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+ratelimit.py – Token bucket shared by everything that talks to TradeOgre.
+"""
+import threading
+import time
+
+
+class TokenBucket(object):
+    """ Thread-safe token bucket. Tokens refill continuously at ``rate`` per
+    second up to ``capacity``; each request spends one.
+
+    :py:meth:`acquire` reserves tokens even when the bucket is empty (the
+    balance goes negative) and sleeps for the debt, so concurrent callers are
+    served in arrival order and never burst past the configured rate.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        """
+        :param rate: tokens added per second
+        :type rate: float
+
+        :param capacity: (optional) burst size, defaults to ``rate``
+        :type capacity: float
+
+        :param clock: (optional) monotonic time source, for tests/simulation
+        :type clock: callable
+        """
+        if rate <= 0:
+            raise ValueError('TokenBucket rate must be positive')
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.tokens = self.capacity
+        self.clock = clock
+        self._stamp = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def available(self):
+        """ Tokens that could be spent right now without waiting. """
+        with self._lock:
+            self._refill()
+            return max(self.tokens, 0.0)
+
+    def try_acquire(self, n=1):
+        """ Spend ``n`` tokens if they are available now.
+
+        :returns: True if spent, False if the caller should back off
+        """
+        with self._lock:
+            self._refill()
+            if self.tokens >= n:
+                self.tokens -= n
+                return True
+            return False
+
+    def reserve(self, n=1):
+        """ Spend ``n`` tokens unconditionally.
+
+        :returns: seconds the caller must wait before using them
+        """
+        with self._lock:
+            self._refill()
+            self.tokens -= n
+            return max(-self.tokens / self.rate, 0.0)
+
+    def acquire(self, n=1):
+        """ Block until ``n`` tokens are available and spend them. """
+        wait = self.reserve(n)
+        if wait:
+            time.sleep(wait)
+        return wait
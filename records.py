@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+records.py – Typed TradeOgre responses.
+
+TradeOgre sends every number as a string, so code working on the raw dicts
+calls ``float()`` on the same field each time it looks at it. The records
+here are converted once, right after the body is decoded: ``__slots__``
+(no per-record dict), numeric fields already floats, attribute access.
+
+Bodies are parsed with orjson when it is installed and with the stdlib json
+module otherwise (:py:func:`loads`, also used by the clients in
+tradeogre.py). :py:class:`TypedClient` wraps a client so its queries return
+records; the raw-dict client stays what the engine uses. ``python bench.py
+decode`` times both parsers and the conversion on large payloads.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # optional, the stdlib parser is used instead
+    orjson = None
+
+JSON_LIBRARY = 'orjson' if orjson is not None else 'json'
+
+
+def loads(body):
+    """ Parse a JSON body (bytes or str) with the fastest parser available.
+
+    :raises ValueError: the body is not JSON
+    """
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def _num(value):
+    return float(value or 0)
+
+
+def _checked(body, what):
+    """ ``body`` if it is a successful response dict, else raise. """
+    if not isinstance(body, dict) or body.get('success') in (False, 'false'):
+        raise Exception('Bad %s response: %r' % (what, body))
+    return body
+
+
+class Record(object):
+    """ Base for the response records: slotted, repr lists every field. """
+    __slots__ = ()
+
+    def __repr__(self):
+        return '%s(%s)' % (type(self).__name__,
+                           ', '.join('%s=%r' % (name, getattr(self, name)) for name in self.__slots__))
+
+    def __eq__(self, other):
+        return type(other) is type(self) and all(getattr(self, name) == getattr(other, name)
+                                                 for name in self.__slots__)
+
+    __hash__ = None
+
+
+class Ticker(Record):
+    """ ``ticker()`` or one ``markets()`` entry. Volume, high and low cover
+    the last 24 hours; ``initial_price`` is the price 24 hours ago. """
+    __slots__ = ('market', 'price', 'bid', 'ask', 'high', 'low', 'volume', 'initial_price')
+
+    def __init__(self, market, price, bid, ask, high=0.0, low=0.0, volume=0.0, initial_price=0.0):
+        self.market = market
+        self.price = price
+        self.bid = bid
+        self.ask = ask
+        self.high = high
+        self.low = low
+        self.volume = volume
+        self.initial_price = initial_price
+
+    @classmethod
+    def decode(cls, body, market=None):
+        body = _checked(body, 'ticker')
+        return cls(market, _num(body.get('price')), _num(body.get('bid')), _num(body.get('ask')),
+                   _num(body.get('high')), _num(body.get('low')), _num(body.get('volume')),
+                   _num(body.get('initialprice')))
+
+
+class Balance(Record):
+    """ ``balance()``: the total and what is not locked in orders. """
+    __slots__ = ('currency', 'balance', 'available')
+
+    def __init__(self, currency, balance, available):
+        self.currency = currency
+        self.balance = balance
+        self.available = available
+
+    @classmethod
+    def decode(cls, body, currency=None):
+        body = _checked(body, 'balance')
+        if 'available' not in body:
+            raise Exception('Bad balance response: %r' % (body,))
+        return cls(currency, _num(body.get('balance')), _num(body['available']))
+
+
+class OpenOrder(Record):
+    """ One ``orders()`` entry, or an ``order()`` lookup (which also
+    reports ``fulfilled``). ``side`` is the API's ``type``. """
+    __slots__ = ('uuid', 'market', 'side', 'price', 'quantity', 'date', 'fulfilled')
+
+    def __init__(self, uuid, market, side, price, quantity, date=0, fulfilled=0.0):
+        self.uuid = uuid
+        self.market = market
+        self.side = side
+        self.price = price
+        self.quantity = quantity
+        self.date = date
+        self.fulfilled = fulfilled
+
+    @classmethod
+    def decode(cls, body, uuid=None):
+        get = body.get
+        return cls(get('uuid', uuid), get('market'), get('type'), float(get('price') or 0),
+                   float(get('quantity') or 0), int(get('date') or 0), float(get('fulfilled') or 0))
+
+
+class OrderResult(Record):
+    """ ``buy()``, ``sell()`` or ``cancel()``. Failures are records too
+    (``success`` False, ``error`` set); the ``*_available`` balances are
+    only reported for placed orders. """
+    __slots__ = ('success', 'uuid', 'error', 'quote_available', 'base_available')
+
+    def __init__(self, success, uuid=None, error=None, quote_available=None, base_available=None):
+        self.success = success
+        self.uuid = uuid
+        self.error = error
+        self.quote_available = quote_available
+        self.base_available = base_available
+
+    @classmethod
+    def decode(cls, body):
+        if not isinstance(body, dict):
+            return cls(False, error=body)
+        quote, base = body.get('bnewbalavail'), body.get('snewbalavail')
+        return cls(body.get('success') in (True, 'true'), body.get('uuid'), body.get('error'),
+                   None if quote is None else _num(quote), None if base is None else _num(base))
+
+
+class Trade(Record):
+    """ One ``history()`` entry. ``date`` is a Unix UTC timestamp. """
+    __slots__ = ('date', 'side', 'price', 'quantity')
+
+    def __init__(self, date, side, price, quantity):
+        self.date = date
+        self.side = side
+        self.price = price
+        self.quantity = quantity
+
+    @classmethod
+    def decode(cls, body):
+        return cls(int(body.get('date') or 0), body.get('type'), _num(body.get('price')),
+                   _num(body.get('quantity')))
+
+
+def decode_markets(body):
+    """ ``markets()`` response (a list of one-key dicts) -> {market: :py:class:`Ticker`}. """
+    if not isinstance(body, list):
+        raise Exception('Bad markets response: %r' % (body,))
+    return {market: Ticker.decode(ticker, market) for entry in body for market, ticker in entry.items()}
+
+
+def decode_balances(body):
+    """ ``balances()`` response -> {currency: total}. """
+    body = _checked(body, 'balances')
+    if not isinstance(body.get('balances'), dict):
+        raise Exception('Bad balances response: %r' % (body,))
+    return {currency: _num(amount) for currency, amount in body['balances'].items()}
+
+
+def decode_orders(body):
+    """ ``orders()`` response -> [:py:class:`OpenOrder`]. """
+    if not isinstance(body, list):
+        raise Exception('Bad orders response: %r' % (body,))
+    return [OpenOrder.decode(order) for order in body]
+
+
+def decode_history(body):
+    """ ``history()`` response -> [:py:class:`Trade`], oldest first as sent. """
+    if not isinstance(body, list):
+        raise Exception('Bad history response: %r' % (body,))
+    return [Trade.decode(trade) for trade in body]
+
+
+def decode_book(body):
+    """ ``order_book()`` response -> ({bid price: qty}, {ask price: qty}),
+    floats throughout and empty levels dropped. """
+    body = _checked(body, 'order book')
+    return tuple({float(price): float(qty) for price, qty in (body.get(side) or {}).items() if float(qty) > 0}
+                 for side in ('buy', 'sell'))
+
+
+class TypedClient(object):
+    """ A :py:class:`tradeogre.TradeOgre` whose queries return records.
+
+    Everything else (pooled session, cache, retries, circuit breakers,
+    metrics, credentials) is the wrapped client's, available as
+    :py:attr:`client`.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def markets(self):
+        return decode_markets(self.client.markets())
+
+    def ticker(self, market):
+        return Ticker.decode(self.client.ticker(market), market)
+
+    def order_book(self, market):
+        return decode_book(self.client.order_book(market))
+
+    def history(self, market):
+        return decode_history(self.client.history(market))
+
+    def balance(self, currency, key=None, secret=None):
+        return Balance.decode(self.client.balance(currency, key, secret), currency)
+
+    def balances(self, key=None, secret=None):
+        return decode_balances(self.client.balances(key, secret))
+
+    def buy(self, market, qty, price, key=None, secret=None):
+        return OrderResult.decode(self.client.buy(market, qty, price, key, secret))
+
+    def sell(self, market, qty, price, key=None, secret=None):
+        return OrderResult.decode(self.client.sell(market, qty, price, key, secret))
+
+    def order(self, uuid, key=None, secret=None):
+        return OpenOrder.decode(_checked(self.client.order(uuid, key, secret), 'order'), uuid)
+
+    def orders(self, market=None, key=None, secret=None):
+        return decode_orders(self.client.orders(market, key, secret))
+
+    def cancel(self, uuid, key=None, secret=None):
+        return OrderResult.decode(self.client.cancel(uuid, key, secret))
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+scheduler.py – Adaptive pulse timing for the grid loop.
+
+The pulse interval drops to ``min_secs`` right after fills or a large price
+move, then backs off exponentially towards ``max_secs`` while nothing
+happens. Time already spent inside the pulse is subtracted from the sleep,
+and the shared request budget can stretch the wait when it runs dry. A
+market feed can cut the sleep short with :py:meth:`PulseScheduler.wake`
+when the price reaches an order.
+"""
+import threading
+import time
+
+
+class PulseScheduler(object):
+    """ Decides how long to sleep before the next pulse.
+
+    Call :py:meth:`wait` then :py:meth:`begin` at the top of each pulse and
+    :py:meth:`record` once the pulse knows how many fills it saw and the
+    latest price. :py:meth:`metrics` exposes the chosen interval and the
+    fill reaction latency. :py:meth:`wake` (from any thread) ends the
+    current wait early.
+    """
+
+    def __init__(self, base_secs, min_secs=None, max_secs=None, backoff=2.0, move_threshold=0.005,
+                 bucket=None, requests_per_pulse=1, clock=time.monotonic, sleep=None):
+        """
+        :param base_secs: starting interval (the old fixed ``pulse_secs``)
+        :param min_secs: (optional) interval right after activity
+        :param max_secs: (optional) ceiling for the quiet-market backoff
+        :param backoff: interval multiplier per quiet pulse
+        :param move_threshold: relative price move that counts as activity
+        :param bucket: (optional) :py:class:`ratelimit.TokenBucket` the
+            pulse's baseline requests are drawn from
+        :param requests_per_pulse: requests every pulse makes regardless of
+            fills
+        :param sleep: (optional) ``sleep(secs)`` for tests/simulation; the
+            default sleep returns early on :py:meth:`wake`
+        """
+        self.base_secs = float(base_secs)
+        self.min_secs = float(min_secs if min_secs is not None else max(self.base_secs / 12, 1.0))
+        self.max_secs = float(max_secs if max_secs is not None else self.base_secs * 4)
+        self.backoff = backoff
+        self.move_threshold = move_threshold
+        self.bucket = bucket
+        self.requests_per_pulse = requests_per_pulse
+        self.clock = clock
+        self._woken = threading.Event()
+        self.sleep = sleep if sleep is not None else self._woken.wait
+
+        self.interval = self.base_secs
+        self.pulses = 0
+        self.started = None
+        self.last_pulse_secs = 0.0
+        self.last_price = {}  # market (None for a single market) -> price
+        self.reaction_latency = None
+        self.wakes = 0
+        self._budget_wait = 0.0
+        self._prev_started = None
+        self._latency_total = 0.0
+        self._latency_count = 0
+
+    def next_delay(self):
+        """ Seconds left to sleep: the interval minus time spent in the
+        pulse, stretched if the request budget needs time to refill. """
+        remaining = self.interval
+        if self.started is not None:
+            remaining -= self.clock() - self.started
+        budget_wait = self.bucket.reserve(self.requests_per_pulse) if self.bucket is not None else 0.0
+        self._budget_wait = budget_wait
+        return max(remaining, budget_wait, 0.0)
+
+    def wait(self):
+        delay = self.next_delay()
+        budget_until = self.clock() + self._budget_wait
+        if delay:
+            self.sleep(delay)
+        if self._woken.is_set():
+            # woken early: skip the rest of the interval, never the request budget
+            self._woken.clear()
+            self.wakes += 1
+            owed = budget_until - self.clock()
+            if owed > 0:
+                time.sleep(owed)
+        return delay
+
+    def wake(self):
+        """ Pulse now instead of at the end of the interval (thread-safe). """
+        self._woken.set()
+
+    def begin(self):
+        """ Mark the start of a pulse (i.e. when the exchange is polled). """
+        self._prev_started = self.started
+        self.started = self.clock()
+        self.pulses += 1
+
+    def record(self, fills=0, price=None):
+        """ Feed the pulse outcome back and pick the next interval.
+
+        :param fills: orders found filled this pulse
+        :param price: (optional) latest market price, or {market: price}
+            when one pulse covers several markets
+        :returns: the next interval in seconds
+        """
+        now = self.clock()
+        if self.started is not None:
+            self.last_pulse_secs = now - self.started
+        moved = False
+        if price is not None:
+            prices = price if isinstance(price, dict) else {None: price}
+            for market, p in prices.items():
+                before = self.last_price.get(market)
+                if before and abs(p - before) / before >= self.move_threshold:
+                    moved = True
+            self.last_price.update(prices)
+        if fills and self._prev_started is not None:
+            # the fill happened at some point since the previous poll
+            self.reaction_latency = self.started - self._prev_started
+            self._latency_total += self.reaction_latency
+            self._latency_count += 1
+        if fills or moved:
+            self.interval = self.min_secs
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_secs)
+        if self.bucket is not None:
+            # never plan to poll faster than the budget can sustain
+            self.interval = max(self.interval, self.requests_per_pulse / self.bucket.rate)
+        return self.interval
+
+    def metrics(self):
+        """ Current interval, last pulse duration and fill reaction latency
+        (worst case: time between the poll that saw a fill and the one
+        before it). """
+        return {
+            'interval_secs': self.interval,
+            'last_pulse_secs': self.last_pulse_secs,
+            'reaction_latency_secs': self.reaction_latency,
+            'mean_reaction_latency_secs': (self._latency_total / self._latency_count
+                                           if self._latency_count else None),
+            'pulses': self.pulses,
+            'wakes': self.wakes,
+        }
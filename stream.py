@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+stream.py – Ticker and trade subscriptions per market.
+
+Polling ``ticker()`` once per pulse means the bot sees a price up to a whole
+pulse late. A feed instead delivers each change as it happens, to callbacks
+(:py:meth:`MarketFeed.subscribe`) or an async iterator
+(:py:meth:`MarketFeed.events`), on its own thread:
+
+- :py:class:`PushFeed` reads a Server-Sent Events stream, such as the
+  ``/stream`` endpoint of exchange_sim.py, and hands events on as they land;
+- :py:class:`PollFeed` is the fallback for an exchange without one: it polls
+  ``ticker()`` / ``history()`` and only passes on what changed.
+
+Ticks arrive as :py:class:`records.Ticker`, trades as :py:class:`records.Trade`,
+wrapped in a :py:class:`MarketEvent`. Repeated ticks (same price, bid and ask)
+and trades already delivered are dropped, whichever feed produced them.
+"""
+import asyncio
+import itertools
+import logging
+import threading
+from collections import deque, namedtuple
+
+import requests
+
+from records import loads, Ticker, Trade, decode_history
+
+CHANNELS = ('ticker', 'trades')
+
+# Matches the ticker's fresh TTL in tradeogre.DEFAULT_CACHE_TTLS.
+DEFAULT_POLL_SECS = 2.0
+# Seconds between reconnects of a dropped push stream: (first, cap).
+DEFAULT_RECONNECT = (0.5, 10.0)
+# Read timeout of a push stream; the server sends a keep-alive well inside it.
+DEFAULT_STREAM_TIMEOUT = (3.05, 30)
+# Trades remembered per market to drop repeats.
+SEEN_TRADES = 512
+
+MarketEvent = namedtuple('MarketEvent', ['channel', 'market', 'data'])
+MarketEvent.__doc__ = """ One delivered update.
+
+channel: 'ticker' or 'trades'
+market: market such as 'XTM-USDT'
+data: :py:class:`records.Ticker` or :py:class:`records.Trade`
+"""
+
+
+class MarketFeed(object):
+    """ Subscriptions and de-duplication shared by the feeds. Subclasses
+    implement :py:meth:`run` and call :py:meth:`publish`.
+
+    Callbacks run on the feed thread, so they should be quick (set a flag,
+    wake a loop); one that raises is logged and skipped.
+    """
+
+    def __init__(self, markets, channels=CHANNELS):
+        unknown = set(channels) - set(CHANNELS)
+        if unknown:
+            raise Exception('Unknown channel(s): %s' % ', '.join(sorted(unknown)))
+        self.markets = list(markets)
+        self.channels = tuple(channels)
+        self.published = 0
+        self.dropped = 0
+        self._tickers = {}  # market -> last Ticker delivered
+        self._trades = {}  # market -> (deque, set) of recent trade keys
+        self._subscribers = {}  # token -> (callback, market, channel)
+        self._tokens = itertools.count(1)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self, callback, market=None, channel=None):
+        """ Call ``callback(event)`` for every :py:class:`MarketEvent` on
+        ``market`` / ``channel`` (None for all of them).
+
+        :returns: token for :py:meth:`unsubscribe`
+        """
+        token = next(self._tokens)
+        with self._lock:
+            self._subscribers[token] = (callback, market, channel)
+        return token
+
+    def unsubscribe(self, token):
+        with self._lock:
+            self._subscribers.pop(token, None)
+
+    def latest(self, market):
+        """ Last :py:class:`records.Ticker` delivered for ``market``, or None. """
+        return self._tickers.get(market)
+
+    def _is_new(self, channel, market, data):
+        if channel == 'ticker':
+            last = self._tickers.get(market)
+            if last is not None and (last.price, last.bid, last.ask) == (data.price, data.bid, data.ask):
+                return False
+            self._tickers[market] = data
+            return True
+        order, seen = self._trades.setdefault(market, (deque(), set()))
+        key = (data.date, data.side, data.price, data.quantity)
+        if key in seen:
+            return False
+        seen.add(key)
+        order.append(key)
+        if len(order) > SEEN_TRADES:
+            seen.discard(order.popleft())
+        return True
+
+    def publish(self, channel, market, data):
+        """ Deliver an update to its subscribers unless it repeats the last
+        one.
+
+        :returns: True if it was delivered
+        """
+        if not self._is_new(channel, market, data):
+            self.dropped += 1
+            return False
+        self.published += 1
+        event = MarketEvent(channel, market, data)
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+        for callback, want_market, want_channel in subscribers:
+            if want_market not in (None, market) or want_channel not in (None, channel):
+                continue
+            try:
+                callback(event)
+            except Exception as exc:
+                logging.warning("[Spike] Market feed subscriber failed: %s", exc)
+        return True
+
+    async def events(self, market=None, channel=None):
+        """ Async iterator over :py:class:`MarketEvent` (the feed must be
+        started). ::
+
+            async for event in feed.events('XTM-USDT', 'ticker'):
+                ...
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        token = self.subscribe(lambda event: loop.call_soon_threadsafe(queue.put_nowait, event), market, channel)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.unsubscribe(token)
+
+    def start(self):
+        """ Run the feed on a daemon thread. """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name=type(self).__name__, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run(self):
+        raise NotImplementedError
+
+
+class PollFeed(MarketFeed):
+    """ Fallback feed: polls ``ticker()`` (and ``history()`` for trades)
+    per market every ``interval`` seconds through a :py:class:`tradeogre.TradeOgre`.
+
+    The client's public-data cache still applies, so polling faster than
+    its ticker TTL only re-reads the cached tick (and is dropped as a repeat);
+    ``bucket`` is charged for each request attempt actually sent, retries
+    included, and never for a cache hit.
+    """
+
+    def __init__(self, client, markets, channels=CHANNELS, interval=DEFAULT_POLL_SECS, bucket=None):
+        """
+        :param client: :py:class:`tradeogre.TradeOgre`
+        :param interval: seconds between polls
+        :param bucket: (optional) :py:class:`ratelimit.TokenBucket` charged
+            for every request attempt a poll sends
+        """
+        MarketFeed.__init__(self, markets, channels)
+        self.client = client
+        self.interval = interval
+        self.bucket = bucket
+
+    def _call(self, endpoint, market):
+        return self.client._poll(endpoint, market, self.bucket)
+
+    def poll(self):
+        """ One round over every market and channel. """
+        for market in self.markets:
+            try:
+                if 'ticker' in self.channels:
+                    self.publish('ticker', market, Ticker.decode(self._call('ticker', market), market))
+                if 'trades' in self.channels:
+                    # history() is newest first; deliver in the order they happened
+                    for trade in reversed(decode_history(self._call('history', market))):
+                        self.publish('trades', market, trade)
+            except Exception as exc:
+                logging.info("[Spike] Polling %s came back empty: %s", market, exc)
+
+    def run(self):
+        while not self._stop.is_set():
+            self.poll()
+            self._stop.wait(self.interval)
+
+
+class PushFeed(MarketFeed):
+    """ Reads a Server-Sent Events stream: ``event: ticker`` or
+    ``event: trades`` lines followed by ``data:`` carrying a ticker or
+    trade body plus its ``market``. Reconnects with exponential backoff
+    when the stream drops.
+    """
+
+    def __init__(self, uri, markets, channels=CHANNELS, reconnect=DEFAULT_RECONNECT,
+                 timeout=DEFAULT_STREAM_TIMEOUT):
+        """
+        :param uri: stream endpoint, e.g. ``http://127.0.0.1:8099/api/v1/stream``
+        :param reconnect: (first, cap) seconds between reconnects
+        :param timeout: (connect, read) seconds
+        """
+        MarketFeed.__init__(self, markets, channels)
+        self.uri = uri
+        self.reconnect = tuple(reconnect)
+        self.timeout = tuple(timeout)
+        self.connects = 0
+        self._response = None
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        response = self._response
+        if response is not None:
+            response.close()  # unblocks the reading thread
+        MarketFeed.stop(self, timeout)
+
+    def dispatch(self, channel, data):
+        """ Publish one decoded SSE event body. """
+        if channel not in self.channels:
+            return False
+        market = data.pop('market', None)
+        record = Ticker.decode(data, market) if channel == 'ticker' else Trade.decode(data)
+        return self.publish(channel, market, record)
+
+    def _read(self, response):
+        channel, data = None, []
+        for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+            if self._stop.is_set():
+                return
+            if not line:
+                if channel and data:
+                    self.dispatch(channel, loads('\n'.join(data)))
+                channel, data = None, []
+            elif line.startswith('event:'):
+                channel = line[6:].strip()
+            elif line.startswith('data:'):
+                data.append(line[5:].strip())
+            # ':' lines are keep-alives
+
+    def run(self):
+        delay, cap = self.reconnect
+        while not self._stop.is_set():
+            try:
+                with requests.get(self.uri, params={'markets': ','.join(self.markets),
+                                                    'channels': ','.join(self.channels)},
+                                  stream=True, timeout=self.timeout) as response:
+                    response.raise_for_status()
+                    self._response = response
+                    self.connects += 1
+                    delay = self.reconnect[0]
+                    self._read(response)
+            except Exception as exc:
+                if self._stop.is_set():
+                    break
+                logging.info("[Spike] Market stream dropped (%s), reconnecting in %.1fs", exc, delay)
+            finally:
+                self._response = None
+            if self._stop.wait(delay):
+                break
+            delay = min(delay * 2, cap)
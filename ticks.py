@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+ticks.py – Exact fixed-point prices and quantities.
+
+A :py:class:`Fixed` is a whole number of ``10 ** -decimals`` units (TradeOgre
+quotes 8 decimals). Grid levels, flip targets and order quantities are kept
+as Fixed so that:
+
+- level keys are exact ints (``units``), not floats that almost match;
+- ``str()`` is the plain decimal the API expects ("0.00000510", never
+  "5.1e-06"), built once per value and cached for every request after;
+- arithmetic that has to stay on the grid is integer arithmetic on units.
+
+Mixing with plain numbers is allowed and gives floats, so a Fixed can flow
+straight into balance maths (``qty * price``) and struct/sqlite packing.
+"""
+import functools
+from decimal import Decimal, ROUND_HALF_EVEN
+
+# TradeOgre prices and quantities have 8 decimals.
+PRICE_DECIMALS = 8
+QTY_DECIMALS = 8
+
+
+def tick_decimals(tick):
+    """ Decimal places needed to print multiples of ``tick`` exactly. """
+    return max(0, -Decimal(repr(tick)).normalize().as_tuple().exponent)
+
+
+def to_units(value, decimals=PRICE_DECIMALS):
+    """ Whole ``10 ** -decimals`` units in ``value`` (a str, int, float or
+    :py:class:`Fixed`), rounded half-even. Strings are parsed exactly. """
+    if isinstance(value, Fixed):
+        if value.decimals == decimals:
+            return value.units
+        value = str(value)
+    if isinstance(value, str):
+        return int(Decimal(value).scaleb(decimals).to_integral_value(ROUND_HALF_EVEN))
+    if isinstance(value, int):
+        return value * 10 ** decimals
+    return int(round(value * 10 ** decimals))
+
+
+@functools.total_ordering
+class Fixed(object):
+    """ An exact decimal amount: ``units * 10 ** -decimals``. Immutable and
+    hashable; equal Fixed values (and the float they convert to) hash alike. """
+    __slots__ = ('units', 'decimals', '_text')
+
+    def __init__(self, units, decimals=PRICE_DECIMALS):
+        self.units = int(units)
+        self.decimals = decimals
+        self._text = None
+
+    @classmethod
+    def parse(cls, value, decimals=PRICE_DECIMALS):
+        """ Fixed from a str, int, float or Fixed (see :py:func:`to_units`). """
+        return cls(to_units(value, decimals), decimals)
+
+    def __float__(self):
+        return self.units / 10 ** self.decimals
+
+    def __str__(self):
+        text = self._text
+        if text is None:
+            digits = str(abs(self.units)).rjust(self.decimals + 1, '0')
+            text = digits[:len(digits) - self.decimals]
+            if self.decimals:
+                text += '.' + digits[len(digits) - self.decimals:]
+            text = self._text = ('-' if self.units < 0 else '') + text
+        return text
+
+    def __repr__(self):
+        return 'Fixed(%r)' % str(self)
+
+    def __format__(self, spec):
+        return str(self) if not spec else format(float(self), spec)
+
+    def __hash__(self):
+        return hash(float(self))
+
+    def __bool__(self):
+        return self.units != 0
+
+    def _same_scale(self, other):
+        """ (self units, other units) at a common scale, or None if ``other``
+        is not a Fixed. """
+        if not isinstance(other, Fixed):
+            return None
+        if other.decimals == self.decimals:
+            return self.units, other.units
+        if other.decimals > self.decimals:
+            return self.units * 10 ** (other.decimals - self.decimals), other.units
+        return self.units, other.units * 10 ** (self.decimals - other.decimals)
+
+    def __eq__(self, other):
+        pair = self._same_scale(other)
+        if pair is not None:
+            return pair[0] == pair[1]
+        if isinstance(other, (int, float)):
+            return float(self) == other
+        return NotImplemented
+
+    def __lt__(self, other):
+        pair = self._same_scale(other)
+        if pair is not None:
+            return pair[0] < pair[1]
+        if isinstance(other, (int, float)):
+            return float(self) < other
+        return NotImplemented
+
+    def __add__(self, other):
+        pair = self._same_scale(other)
+        if pair is not None:
+            return Fixed(pair[0] + pair[1], max(self.decimals, other.decimals))
+        return float(self) + other
+
+    def __sub__(self, other):
+        pair = self._same_scale(other)
+        if pair is not None:
+            return Fixed(pair[0] - pair[1], max(self.decimals, other.decimals))
+        return float(self) - other
+
+    def __radd__(self, other):
+        return other + float(self)
+
+    def __rsub__(self, other):
+        return other - float(self)
+
+    def __mul__(self, other):
+        return float(self) * float(other)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        return float(self) / float(other)
+
+    def __rtruediv__(self, other):
+        return float(other) / float(self)
+
+    def __neg__(self):
+        return Fixed(-self.units, self.decimals)
+
+    def __abs__(self):
+        return Fixed(abs(self.units), self.decimals)
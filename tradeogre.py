@@ -1,529 +1,1282 @@
-#!/usr/bin/env python3
-"""
-run.py – Bootstrapper for the TradeOgre USDC/USDT grid bot.
-
-Usage:
-    python run.py         # uses config.json from setup.py
-    python run.py --once  # run a single grid cycle, then exit
-"""
-import argparse
-import json
-import logging
-import os
-import signal
-import sys
-import time
-from datetime import datetime, timezone
-
-
-CONFIG_FILE = "config.json"
-LOG_FILE    = "grid_bot.log"
-
-def load_config(path):
-    if not os.path.isfile(path):
-        sys.exit(f"Config {path} not found. Run setup.py first.")
-    with open(path) as fp:
-        return json.load(fp)
-
-def init_logger():
-    logging.basicConfig(
-        filename=LOG_FILE,
-        level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
-    logging.getLogger().addHandler(logging.StreamHandler(sys.stdout))
-
-def main():
-    parser = argparse.ArgumentParser(description="TradeOgre USDC/USDT Grid Bot")
-    parser.add_argument("--once", action="store_true", help="execute one cycle and exit")
-    args = parser.parse_args()
-
-    cfg = load_config(CONFIG_FILE)
-    init_logger()
-
-    bot = TradeOgre(
-        cfg["api_key"],
-        cfg["api_secret"],
-        cfg["order_amount"],
-        cfg["grid_spacing"],
-        cfg["min_price"],
-        cfg["max_price"],
-        cfg["max_active_orders"],
-    )
-
-    running = True
-
-    def handle_sigterm(signum, frame):
-        nonlocal running
-        running = False
-        logging.info("[Spike’s Log]Shutdown signal received – Later Cowboy!")
-
-    signal.signal(signal.SIGINT,  handle_sigterm)
-    signal.signal(signal.SIGTERM, handle_sigterm)
-
-    logging.info("[Spike’s Log]Okay the Bot's up. Don't know for how long. . .")
-
-    while running:
-        start = datetime.now(timezone.utc)
-        try:
-            bot.cycle()           # place/cancel orders, sync balances
-        except Exception as exc:
-            logging.exception("Cycle error: %s", exc)
-
-        # Check after one cycle
-        if args.once:
-            break
-
-        elapsed = (datetime.now(timezone.utc) - start).total_seconds()
-        time.sleep(max(60.0 - elapsed, 0.1))
-
-    bot.shutdown()
-    logging.info("[Spike’s Log]Okay, we got it shutdown, now what?")
-
-if __name__ == "__main__":
-    main()
-#!/usr/bin/env python3
-import requests
-import logging
-
-class TradeOgre(object):
-    """ Maintains a single session between this machine and TradeOgre.
-
-    Specifying a key/secret pair is optional. If not specified, key and
-    secret must be specified at the called method.
-
-    Query responses, as received by :py:mod:`requests`, are retained
-    as attribute :py:attr:`response` of this object. It is overwritten
-    on each query.
-    """
-
-    def __init__(self, key, secret, order_amount, grid_spacing, min_price, max_price, max_active_orders):
-        """ Create an object with authentication information. """
-        self.key = key
-        self.secret = secret
-        self.order_amount = order_amount
-        self.grid_spacing = grid_spacing
-        self.min_price = min_price
-        self.max_price = max_price
-        self.max_active_orders = max_active_orders
-        """ Create an object with authentication information.
-
-        :param key: (optional) key identifier for queries to the API
-        :type key: str
-
-        :param secret: (optional) actual private key used to sign messages
-        :type secret: str
-
-        :returns: None
-
-        """
-        self.key = key
-        self.secret = secret
-        self.uri = 'https://tradeogre.com/api/v1'
-        self.response = None
-        return
-    def fetch_market_price(self):
-        # Example: fetch current price from /api/v1/ticker/USDC-USDT
-        resp = requests.get("https://tradeogre.com/api/v1/ticker/USDC-USDT")
-        ticker = resp.json()
-        return float(ticker["price"])
-
-    def fetch_balance(self):
-        # Example: GET your balance via POST /api/v1/account/balance
-        # Replace with your signed API call!
-        payload = {"method": "balance"}
-        headers = {
-           "Authorization": f"Token {self.key}:{self.secret}"
-        }
-        resp = requests.post(
-            "https://tradeogre.com/api/v1/account/balance",
-            headers=headers,
-            data=payload
-        )
-        return resp.json()
-
-    def fetch_orders(self):
-        # Replace with your signed call to /api/v1/orders
-        payload = {"market": "USDC-USDT"}
-        headers = {
-           "Authorization": f"Token {self.key}:{self.secret}"
-        }
-        resp = requests.post("https://tradeogre.com/api/v1/orders", headers=headers, data=payload)
-        return resp.json()  # Returns list of open orders
-
-    def place_buy_order(self, price):
-        payload = {
-            "market": "USDC-USDT",
-            "type": "buy",
-            "quantity": str(self.order_amount),
-            "price": str(price)
-        }
-        resp = requests.post("https://tradeogre.com/api/v1/order/buy", data=payload, auth=(self.key, self.secret))
-        import logging
-        logging.info(f"[Spike] Order placed: {side.upper()} {amount}@{price}. Buy order POST status: {resp.status_code},body: {resp.text!r}")
-        try:
-            data = resp.json
-        except Exception as e:
-            logging.error(f"[Spike] Tried to parse that response—guess it wasn’t a noodle recipe. Just noise. Response: {resp}")
-            return None
-
-    def place_sell_order(self, price, quantity):
-        payload = {
-            "market": "USDC-USDT",
-            "type": "sell",
-            "quantity": str(quantity),
-            "price": str(price)
-        }
-        resp = requests.post("https://tradeogre.com/api/v1/order/sell", data=payload, auth=(self.key, self.secret))
-        import logging
-        logging.info(f"[Spike] Sell-Order placed: {side.upper()} {amount}@{price}. Let’s see if anyone bites.")
-        try:
-            data = resp.json()
-        except Exception as e:
-            logging.error(f"[Spike] Tried to parse that response—guess it wasn’t a noodle recipe. Just noise. Response: {resp}")
-            return None
-
-    def cancel_order(self, order_id):
-        payload = {"order_id": order_id}
-
-        resp = requests.post("https://tradeogre.com/api/v1/order/cancel", data=payload, auth=(self.key, self.secret))
-        import logging
-        logging.info(f"Cancel order POST status: {resp.status_code}, body: {resp.text!r}")
-        try:
-            data = resp.json()
-        except Exception as e:
-            logging.error(f"Non-JSON response: status={resp.status_code}, body={resp.text!r}")
-            return None
-
-    def shutdown(self):
-        import logging
-        logging.info("Grid bot shutdown cleanly. Console cowboy out.")
-
-    def cycle(self):
-        orders = None
-        try:
-            market = "USDC-USDT"
-
-            ticker = self.ticker(market)
-            logging.info(f"Raw ticker data: {ticker}")
-            if "price" not in ticker:
-                logging.warning("No 'price' in ticker! Full ticker response: %r", ticker)
-                logging.info(f"Raw balances: {balances}")
-                return  # Or handle error accordingly
-            price = float(ticker["price"])
-
-            balances = self.balances()
-            usdt = float(balances['balances'].get("USDT", 0))
-            usdc = float(balances['balances'].get("USDC", 0))
-            logging.info(f"[Spike] Checked the wallet for {asset}. Still scraping by. Balance: {resp.get('available', 'N/A')}")
-            logging.debug(f"Orders API raw response: {orders}")
-            logging.debug(f"Orders: {orders}")
-
-            orders = self.orders(market)
-        # Typically a list of dicts, but always LOG to confirm structure:
-            logging.debug(f"Fetched orders: {orders}")
-
-        # ...rest of grid logic here...
-
-            # Cancel any extra/invalid grid orders over limit or out-of-range
-            active_buys = [o for o in orders if o["type"] == "buy"]
-            active_sells = [o for o in orders if o["type"] == "sell"]
-
-            # Cancel excess buy orders if over max_active_orders
-            for order in active_buys[self.max_active_orders:]:
-                self.cancel_order(order["id"])
-                logging.info(f"Cancelled excess buy order at {order['price']}")
-
-            # Place buy orders on grid (if under max_active_orders)
-            grid_prices = []
-            p = self.min_price
-            while p <= self.max_price and len(grid_prices) < self.max_active_orders:
-                grid_prices.append(round(p, 6))
-                p += self.grid_spacing
-
-            # Place missing buy orders
-            for p in grid_prices:
-                # Only place a buy if not already an open buy order at that price
-                if not any(float(o["price"]) == p for o in active_buys):
-                    if usdt >= self.order_amount * p:
-                        result = self.place_buy_order(p)
-                        logging.info(f"[Spike] Order placed: {self.order_amount} at {p}")
-                    else:
-                        logging.info("[Spike] Well, that didn’t go as planned. Might need a bigger ship—or a better crew! Not enough USDT!!!")
-
-            # Place sell order for all USDC balance at sell_price if not already exists
-            #if usdc > 1 and not any(float(o["price"]) == self.sell_price for o in active_sells):
-                result = self.place_sell_order(self.sell_price, usdc)
-                logging.info(f"Placed sell order for {usdc} at {self.sell_price}")
-
-            logging.info("Cycle complete.")
-        except Exception as e:
-            logging.exception(f"Error in cycle: {e}")
-
-    def load_key(self, path):
-        """ Load key and secret from file.
-        Expected file format is key and secret on separate lines.
-
-        :param path: path to keyfile
-        :type path: str
-
-        :returns: None
-
-        """
-        #print(path)#debug
-
-        with open(path, 'r') as f:
-            self.key = f.readline().strip()
-            self.secret = f.readline().strip()
-        return
-
-    def markets(self):
-        """ Retrieve a listing of all markets and basic information
-        including current price, volume, high, low, bid and ask.
-
-        :returns: :py:meth:`requests.Response.json`-deserialised Python object
-
-        """
-        self.response = requests.get(self.uri + '/markets').json()
-        return self.response
-
-    def order_book(self, market):
-        """ Retrieve the current order book for a market such as 'BTC-XMR'.
-
-        :param market: market such as 'BTC-XMR'
-        :type market: str
-
-        :returns: :py:meth:`requests.Response.json`-deserialised Python object
-
-        """
-        self.response = requests.get(self.uri + '/orders/' + market).json()
-        return self.response
-
-    def ticker(self, market):
-        """ Retrieve the ticker for a market such as 'BTC-XMR', volume,
-        high, and low are in the last 24 hours, initial price is the
-        price from 24 hours ago.
-
-        :param market: market such as 'BTC-XMR'
-        :type market: str
-
-        :returns: :py:meth:`requests.Response.json`-deserialised Python object
-
-        """
-        self.response = requests.get(self.uri + '/ticker/' + market).json()
-        return self.response
-
-    def history(self, market):
-        """ Retrieve the history of the last trades on {market} limited to 100
-        of the most recent trades. The date is a Unix UTC timestamp.
-
-        :param market: market such as 'BTC-XMR'
-        :type market: str
-
-        :returns: :py:meth:`requests.Response.json`-deserialised Python object
-
-        """
-        self.response = requests.get(self.uri + '/history/' + market).json()
-        return self.response
-
-    def balance(self, currency, key=None, secret=None):
-        """ Get the balance of a specific currency for you account. The currency
-        field is required, such as 'BTC'. The total balance is returned and the
-        available balance is what can be used in orders or withdrawn.
-
-        :param currency: currency such as 'BTC'
-        :type currency: str
-
-        :param key: key identifier
-        :type key: str
-
-        :param secret: actual private key
-        :type secret: str
-
-        :returns: :py:meth:`requests.Response.json`-deserialised Python object
-
-        """
-        if key is None or secret is None:
-            key = self.key
-            secret = self.secret
-
-        if key is None or secret is None:
-            raise Exception('Either key or secret is not set! (Use `load_key()`.')
-
-        data = {"currency": currency}
-        self.response = requests.post(self.uri + '/account/balance', data=data, auth=(key, secret)).json()
-        return self.response
-
-    def balances(self, key=None, secret=None):
-        """ Retrieve all balances for your account.
-
-        :returns: :py:meth:`requests.Response.json`-deserialised Python object
-
-        """
-        if key is None or secret is None:
-            key = self.key
-            secret = self.secret
-
-        if key is None or secret is None:
-            raise Exception('Either key or secret is not set! (Use `load_key()`.')
-
-        self.response = requests.get(self.uri + '/account/balances', auth=(key, secret)).json()
-        return self.response
-
-    def buy(self, market, qty, price, key=None, secret=None):
-        """ Submit a buy order to the order book for a market. The success status
-        will be false if there is an error, and error will contain the error message.
-        Your available buy and sell balance for the market will be returned if
-        successful. If your order is successful but not fully fulfilled, the order
-        is placed onto the order book and you will receive a uuid for the order.
-
-        :param market: market such as 'BTC-XMR'
-        :type market: str
-
-        :param qty: quantity to buy
-        :type qty: str
-
-        :param price: price to buy for
-        :type price: str
-
-        :param key: key identifier
-        :type key: str
-
-        :param secret: actual private key
-        :type secret: str
-
-        :returns: :py:meth:`requests.Response.json`-deserialised Python object
-
-        """
-        if key is None or secret is None:
-            key = self.key
-            secret = self.secret
-
-        if key is None or secret is None:
-            raise Exception('Either key or secret is not set! (Use `load_key()`.')
-
-        data = {"market": market, "quantity": qty, "price": price}
-        self.response = requests.post(self.uri + '/order/buy', data=data, auth=(key, secret)).json()
-        return self.response
-
-    def sell(self, market, qty, price, key=None, secret=None):
-        """ Submit a sell order to the order book for a market. The success status
-        will be false if there is an error, and error will contain the error
-        message. Your available buy and sell balance for the market will be returned
-        if successful. If your order is successful but not fully fulfilled, the order
-        is placed onto the order book and you will receive a uuid for the order.
-
-        :param market: market such as 'BTC-XMR'
-        :type market: str
-
-        :param qty: quantity to sell
-        :type qty: str
-
-        :param price: price to sell for
-        :type price: str
-
-        :param key: key identifier
-        :type key: str
-
-        :param secret: actual private key
-        :type secret: str
-
-        :returns: :py:meth:`requests.Response.json`-deserialised Python object
-
-        """
-        if key is None or secret is None:
-            key = self.key
-            secret = self.secret
-
-        if key is None or secret is None:
-            raise Exception('Either key or secret is not set! (Use `load_key()`.')
-
-        data = {"market": market, "quantity": qty, "price": price}
-        self.response = requests.post(self.uri + '/order/sell', data=data, auth=(key, secret)).json()
-        return self.response
-
-    def order(self, uuid, key=None, secret=None):
-        """ Retrieve information about a specific order by the
-        uuid of the order. Date is a Unix UTC timestamp.
-
-        :param uuid: ID of order
-        :type uuid: str
-
-        :param key: key identifier
-        :type key: str
-
-        :param secret: actual private key
-        :type secret: str
-
-        :returns: :py:meth:`requests.Response.json`-deserialised Python object
-
-        """
-        if key is None or secret is None:
-            key = self.key
-            secret = self.secret
-
-        if key is None or secret is None:
-            raise Exception('Either key or secret is not set! (Use `load_key()`.')
-
-        self.response = requests.get(self.uri + '/account/order/' + uuid, auth=(key, secret)).json()
-        return self.response
-
-    def orders(self, market=None, key=None, secret=None):
-        """ Retrieve the active orders under your account. The market
-        field is optional, and leaving it out will return all orders
-        in every market. date is a Unix UTC timestamp.
-
-        :param market: (optional) market to list orders from
-        :type market: str
-
-        :param key: key identifier
-        :type key: str
-
-        :param secret: actual private key
-        :type secret: str
-
-        :returns: :py:meth:`requests.Response.json`-deserialised Python object
-
-        """
-        if key is None or secret is None:
-            key = self.key
-            secret = self.secret
-
-        if key is None or secret is None:
-            raise Exception('Either key or secret is not set! (Use `load_key()`.')
-
-        if market is None:
-            market = ''
-
-        data = {"market": market}
-        self.response = requests.post(self.uri + '/account/orders', data=data, auth=(key, secret)).json()
-        return self.response
-
-    def cancel(self, uuid, key=None, secret=None):
-        """ Cancel an order on the order book based on the order uuid.
-        The uuid parameter can also be set to all and all of your
-        orders will be cancelled across all markets.
-
-        :param uuid: ID of order to cancel
-        :type uuid: str
-
-        :param key: key identifier
-        :type key: str
-
-        :param secret: actual private key
-        :type secret: str
-
-        :returns: :py:meth:`requests.Response.json`-deserialised Python object
-
-        """
-        if key is None or secret is None:
-            key = self.key
-            secret = self.secret
-
-        if key is None or secret is None:
-            raise Exception('Either key or secret is not set! (Use `load_key()`.')
-
-        data = {"uuid": uuid}
-        self.response = requests.post(self.uri + '/order/cancel', data=data, auth=(key, secret)).json()
-        return self.response
\ No newline at end of file
+#!/usr/bin/env python3
+"""
+run.py – Bootstrapper for the TradeOgre USDC/USDT grid bot.
+
+Usage:
+    python run.py         # uses config.json from setup.py
+    python run.py --once  # run a single grid cycle, then exit
+    python run.py --profile [DIR]  # cProfile + tracemalloc report per cycle (kill -USR1 toggles)
+"""
+import argparse
+import json
+import logging
+import os
+import signal
+import sys
+import time
+from datetime import datetime, timezone
+
+
+CONFIG_FILE = "config.json"
+LOG_FILE    = "grid_bot.log"
+
+def load_config(path):
+    if not os.path.isfile(path):
+        sys.exit(f"Config {path} not found. Run setup.py first.")
+    with open(path) as fp:
+        return json.load(fp)
+
+def init_logger():
+    logging.basicConfig(
+        filename=LOG_FILE,
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    logging.getLogger().addHandler(logging.StreamHandler(sys.stdout))
+
+def main():
+    parser = argparse.ArgumentParser(description="TradeOgre USDC/USDT Grid Bot")
+    parser.add_argument("--once", action="store_true", help="execute one cycle and exit")
+    parser.add_argument("--profile", nargs="?", const=DEFAULT_PROFILE_DIR, metavar="DIR",
+                        help="profile every cycle into DIR (SIGUSR1 toggles it while running)")
+    args = parser.parse_args()
+
+    cfg = load_config(CONFIG_FILE)
+    init_logger()
+
+    bot = TradeOgre(
+        cfg["api_key"],
+        cfg["api_secret"],
+        cfg["order_amount"],
+        cfg["grid_spacing"],
+        cfg["min_price"],
+        cfg["max_price"],
+        cfg["max_active_orders"],
+        sell_price=cfg.get("sell_price"),
+        tick_size=cfg.get("tick_size"),
+    )
+
+    running = True
+
+    def handle_sigterm(signum, frame):
+        nonlocal running
+        running = False
+        logging.info("[Spike’s Log]Shutdown signal received – Later Cowboy!")
+
+    signal.signal(signal.SIGINT,  handle_sigterm)
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    profiler = PulseProfiler(args.profile or DEFAULT_PROFILE_DIR, enabled=bool(args.profile))
+    profiler.install()
+
+    logging.info("[Spike’s Log]Okay the Bot's up. Don't know for how long. . .")
+
+    while running:
+        start = datetime.now(timezone.utc)
+        try:
+            with profiler.pulse():
+                bot.cycle()       # place/cancel orders, sync balances
+        except Exception as exc:
+            logging.exception("Cycle error: %s", exc)
+
+        # Check after one cycle
+        if args.once:
+            break
+
+        elapsed = (datetime.now(timezone.utc) - start).total_seconds()
+        time.sleep(max(60.0 - elapsed, 0.1))
+
+    bot.shutdown()
+    logging.info("[Spike’s Log]Okay, we got it shutdown, now what?")
+
+if __name__ == "__main__":
+    main()
+#!/usr/bin/env python3
+import asyncio
+import base64
+import email.utils
+import math
+import random
+import threading
+from collections import OrderedDict, namedtuple
+import requests
+from requests.adapters import HTTPAdapter
+
+from funcs import ticker_base_currency
+from ledger import BalanceLedger
+from metrics import ClientMetrics
+from placement import cancel_orders, submit_rows, MIN_NOTIONAL
+from ticks import Fixed, to_units, tick_decimals, PRICE_DECIMALS, QTY_DECIMALS
+from profiler import PulseProfiler, DEFAULT_PROFILE_DIR
+from records import loads
+from stream import PollFeed, PushFeed, CHANNELS, DEFAULT_POLL_SECS
+
+try:
+    import aiohttp
+except ImportError:  # only AsyncTradeOgre needs it
+    aiohttp = None
+
+# Market of the built-in cycle() grid.
+CYCLE_MARKET = 'USDC-USDT'
+
+CyclePlan = namedtuple('CyclePlan', ['cancels', 'places', 'live'])
+CyclePlan.__doc__ = """ Result of :py:meth:`TradeOgre.plan_cycle`.
+
+cancels: uuids to cancel
+places: order rows for :py:func:`placement.submit_rows`
+live: distinct (side, price) slots already on the book
+"""
+
+# Connection pool size shared by every host the client talks to.
+DEFAULT_POOL_SIZE = 10
+
+# (connect, read) timeouts in seconds, per endpoint. Order placement and
+# cancels get a longer read window since the matcher can lag under load.
+DEFAULT_TIMEOUTS = {
+    'markets': (3.05, 10),
+    'order_book': (3.05, 10),
+    'ticker': (3.05, 5),
+    'history': (3.05, 10),
+    'balance': (3.05, 5),
+    'balances': (3.05, 5),
+    'buy': (3.05, 15),
+    'sell': (3.05, 15),
+    'order': (3.05, 5),
+    'orders': (3.05, 10),
+    'cancel': (3.05, 15),
+}
+
+# (fresh, stale) seconds for cached public endpoints. A fresh entry is served
+# as-is; a stale one is still served while a background refresh runs.
+DEFAULT_CACHE_TTLS = {
+    'markets': (10, 30),
+    'order_book': (1, 2),
+    'ticker': (2, 5),
+    'history': (5, 15),
+}
+
+# Markets kept in the public-data cache before the least recently used goes.
+DEFAULT_CACHE_MARKETS = 64
+
+# Endpoints that are safe to send twice. Orders and cancels are never
+# retried: a timeout does not say whether the exchange acted on them.
+IDEMPOTENT_ENDPOINTS = frozenset(['markets', 'order_book', 'ticker', 'history', 'balance', 'balances',
+                                  'order', 'orders'])
+
+# Extra attempts for an idempotent read after a transient failure.
+DEFAULT_RETRIES = 3
+
+# (base, cap) seconds of the jittered exponential backoff between retries.
+DEFAULT_BACKOFF = (0.25, 8.0)
+
+# Consecutive transient failures that open an endpoint's circuit, and how
+# long it stays open before one trial request is let through.
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_RESET_SECS = 30.0
+
+
+class TradeOgreError(Exception):
+    """ A request that got no usable answer. ``kind`` names the failure for
+    logs and metrics; ``retryable`` says whether trying again can help. """
+    kind = 'error'
+    retryable = False
+
+    def __init__(self, endpoint, message, status=None):
+        super(TradeOgreError, self).__init__('%s: %s' % (endpoint, message))
+        self.endpoint = endpoint
+        self.status = status
+
+
+class TransientError(TradeOgreError):
+    """ The exchange may well answer next time. """
+    retryable = True
+
+
+class RequestTimeout(TransientError):
+    kind = 'timeout'
+
+
+class ConnectionFailed(TransientError):
+    kind = 'connection'
+
+
+class ServerError(TransientError):
+    """ HTTP 5xx. """
+    kind = 'server_error'
+
+
+class RateLimited(TransientError):
+    """ HTTP 429; ``retry_after`` holds the server's hint in seconds, if any. """
+    kind = 'rate_limited'
+
+    def __init__(self, endpoint, message, status=None, retry_after=None):
+        super(RateLimited, self).__init__(endpoint, message, status)
+        self.retry_after = retry_after
+
+
+class BadResponse(TransientError):
+    """ A body that is not JSON, e.g. a proxy's HTML error page. """
+    kind = 'bad_body'
+
+
+def parse_retry_after(value, now=time.time):
+    """ Seconds from a ``Retry-After`` header: delta-seconds (fractions
+    accepted) or an HTTP-date. None if absent or unparseable. """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when is None:
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = when.timestamp() - now()
+    return max(0.0, seconds) if math.isfinite(seconds) else None
+
+
+class CircuitOpen(TradeOgreError):
+    """ Not sent: the endpoint failed too often recently. """
+    kind = 'circuit_open'
+
+
+class CircuitBreaker(object):
+    """ Stops calling an endpoint that keeps failing.
+
+    ``closed``: requests flow. ``threshold`` consecutive transient failures
+    open the circuit; while ``open`` requests are refused locally. After
+    ``reset_secs`` it goes ``half_open`` and lets one trial request through:
+    success closes it, failure opens it again.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, threshold=DEFAULT_BREAKER_THRESHOLD, reset_secs=DEFAULT_BREAKER_RESET_SECS,
+                 clock=time.monotonic):
+        self.threshold = threshold
+        self.reset_secs = reset_secs
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """ Whether a request may be sent now. """
+        with self._lock:
+            if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_secs:
+                self.state = self.HALF_OPEN
+                self._trial = False
+            if self.state == self.HALF_OPEN:
+                if self._trial:
+                    return False
+                self._trial = True
+                return True
+            return self.state == self.CLOSED
+
+    def available(self):
+        """ Whether :py:meth:`allow` would let a request through, without
+        claiming the half-open trial. """
+        with self._lock:
+            if self.state == self.OPEN:
+                return self.clock() - self.opened_at >= self.reset_secs
+            return self.state == self.CLOSED or not self._trial
+
+    def success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                if self.state != self.OPEN:
+                    logging.warning("[Spike] Circuit opened after %d failures", self.failures)
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+                self._trial = False
+
+    def retry_in(self):
+        """ Seconds until an open circuit lets a trial request through. """
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_secs - (self.clock() - self.opened_at))
+
+
+class MarketDataCache(object):
+    """ Thread-safe TTL cache for public market data with
+    stale-while-revalidate and LRU eviction by market.
+
+    Concurrent misses on the same (endpoint, market) share one fetch, so
+    every consumer of a client sees at most one request per TTL window.
+    Cached bodies are shared objects: treat them as read-only.
+    """
+
+    def __init__(self, ttls=None, max_markets=DEFAULT_CACHE_MARKETS, clock=time.monotonic):
+        """
+        :param ttls: (optional) per-endpoint overrides of
+            :py:data:`DEFAULT_CACHE_TTLS`
+        :type ttls: dict
+
+        :param max_markets: (optional) markets kept before LRU eviction
+        :type max_markets: int
+        """
+        self.ttls = dict(DEFAULT_CACHE_TTLS)
+        self.ttls.update(ttls or {})
+        self.max_markets = max_markets
+        self.clock = clock
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.evictions = 0
+        self._markets = OrderedDict()  # market -> {endpoint: (body, fetched_at)}
+        self._inflight = {}  # (endpoint, market) -> threading.Event
+        self._lock = threading.Lock()
+
+    def get(self, endpoint, market, fetch):
+        """ Return the cached body for (endpoint, market), calling ``fetch()``
+        on a miss and in the background once the entry goes stale. """
+        key = (endpoint, market)
+        fresh, stale = self.ttls[endpoint]
+        while True:
+            with self._lock:
+                entry = self._markets.get(market, {}).get(endpoint)
+                if entry is not None:
+                    self._markets.move_to_end(market)
+                    age = self.clock() - entry[1]
+                    if age < fresh:
+                        self.hits += 1
+                        return entry[0]
+                    if age < fresh + stale:
+                        self.stale_hits += 1
+                        if key not in self._inflight:
+                            self._inflight[key] = threading.Event()
+                            threading.Thread(target=self._refresh, args=(key, fetch), daemon=True).start()
+                        return entry[0]
+                waiting = self._inflight.get(key)
+                if waiting is None:
+                    self.misses += 1
+                    self._inflight[key] = threading.Event()
+                    break
+            # someone else is already fetching this key; use their result
+            waiting.wait()
+        try:
+            body = fetch()
+            self._store(key, body)
+            return body
+        finally:
+            self._done(key)
+
+    def _refresh(self, key, fetch):
+        try:
+            self._store(key, fetch())
+            with self._lock:
+                self.refreshes += 1
+        except Exception as exc:
+            logging.warning("[Spike] Background refresh of %s failed, serving stale: %s", key, exc)
+        finally:
+            self._done(key)
+
+    def _store(self, key, body):
+        endpoint, market = key
+        with self._lock:
+            self._markets.setdefault(market, {})[endpoint] = (body, self.clock())
+            self._markets.move_to_end(market)
+            while len(self._markets) > self.max_markets:
+                self._markets.popitem(last=False)
+                self.evictions += 1
+
+    def _done(self, key):
+        with self._lock:
+            event = self._inflight.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def invalidate(self, market=None):
+        """ Drop one market's entries, or everything. """
+        with self._lock:
+            if market is None:
+                self._markets.clear()
+            else:
+                self._markets.pop(market, None)
+
+    def stats(self):
+        """ Hit/miss counters and current size. """
+        with self._lock:
+            return {'hits': self.hits, 'stale_hits': self.stale_hits, 'misses': self.misses,
+                    'refreshes': self.refreshes, 'evictions': self.evictions, 'markets': len(self._markets)}
+
+class TradeOgre(object):
+    """ Maintains a single session between this machine and TradeOgre.
+
+    Specifying a key/secret pair is optional. If not specified, key and
+    secret must be specified at the called method.
+
+    Query responses, as received by :py:mod:`requests`, are retained
+    as attribute :py:attr:`response` of this object. It is overwritten
+    on each query.
+
+    All queries go through one pooled, keep-alive :py:class:`requests.Session`
+    (attribute :py:attr:`session`), so repeated calls reuse warm connections
+    instead of paying a new TCP+TLS handshake each time.
+
+    Public market data (markets, order book, ticker, history) is served from
+    a :py:class:`MarketDataCache` (attribute :py:attr:`cache`) unless the
+    client is built with ``cache=False``.
+
+    Every request is timed and counted per endpoint in a
+    :py:class:`metrics.ClientMetrics` (attribute :py:attr:`metrics`).
+
+    Failures are raised as :py:class:`TradeOgreError` subclasses. Idempotent
+    reads are retried with jittered exponential backoff; orders and cancels
+    never are. Each endpoint has a :py:class:`CircuitBreaker` (attribute
+    :py:attr:`breakers`), see :py:meth:`available`.
+    """
+
+    def __init__(self, key=None, secret=None, order_amount=None, grid_spacing=None, min_price=None, max_price=None,
+                 max_active_orders=None, pool_size=DEFAULT_POOL_SIZE, timeouts=None, cache=True, metrics=True,
+                 retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, breaker_threshold=DEFAULT_BREAKER_THRESHOLD,
+                 breaker_reset_secs=DEFAULT_BREAKER_RESET_SECS, sell_price=None, tick_size=None):
+        """ Create an object with authentication information. """
+        self.key = key
+        self.secret = secret
+        self.order_amount = order_amount
+        self.grid_spacing = grid_spacing
+        self.min_price = min_price
+        self.max_price = max_price
+        self.max_active_orders = max_active_orders
+        self.sell_price = sell_price
+        # cycle() grid prices are whole ticks of CYCLE_MARKET (TradeOgre quotes 8 decimals)
+        self.tick_size = tick_size
+        self.cycle_orders = set()  # uuids cycle() placed; the only ones it may cancel
+        """ Create an object with authentication information.
+
+        :param key: (optional) key identifier for queries to the API
+        :type key: str
+
+        :param secret: (optional) actual private key used to sign messages
+        :type secret: str
+
+        :param pool_size: (optional) keep-alive connections kept per host
+        :type pool_size: int
+
+        :param timeouts: (optional) per-endpoint overrides of
+            :py:data:`DEFAULT_TIMEOUTS`, e.g. ``{'buy': (2, 5)}``
+        :type timeouts: dict
+
+        :param cache: (optional) True for a default :py:class:`MarketDataCache`,
+            a cache instance to share one between clients, or False to always
+            fetch public data fresh
+        :type cache: bool or MarketDataCache
+
+        :param metrics: (optional) True to record into :py:data:`metrics.REGISTRY`
+            (through the one :py:meth:`metrics.ClientMetrics.shared` recorder),
+            a :py:class:`metrics.ClientMetrics` to record elsewhere, or False
+        :type metrics: bool or ClientMetrics
+
+        :param retries: (optional) extra attempts for idempotent reads
+        :type retries: int
+
+        :param backoff: (optional) (base, cap) seconds between retries
+        :type backoff: tuple
+
+        :param breaker_threshold: (optional) consecutive failures that open
+            an endpoint's circuit
+        :type breaker_threshold: int
+
+        :param breaker_reset_secs: (optional) seconds before an open circuit
+            lets a trial request through
+        :type breaker_reset_secs: float
+
+        :returns: None
+
+        """
+        self.key = key
+        self.secret = secret
+        self.uri = 'https://tradeogre.com/api/v1'
+        self.response = None
+        if cache is True:
+            cache = MarketDataCache()
+        self.cache = cache or None
+        if metrics is True:
+            metrics = ClientMetrics.shared()
+        self.metrics = metrics or None
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        for endpoint, timeout in (timeouts or {}).items():
+            # JSON configs hand us lists; requests only accepts tuples
+            self.timeouts[endpoint] = tuple(timeout) if isinstance(timeout, list) else timeout
+        self.retries = retries
+        self.backoff = tuple(backoff)
+        self.breakers = {endpoint: CircuitBreaker(breaker_threshold, breaker_reset_secs) for endpoint in self.timeouts}
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._auth_pair = None
+        self._auth_header = None
+        return
+
+    def _auth(self, key=None, secret=None):
+        """ Resolve the Authorization header for a private query.
+        The header is built once per key/secret pair and reused, rather than
+        re-encoding the credentials on every request.
+
+        :param key: key identifier, defaults to :py:attr:`key`
+        :type key: str
+
+        :param secret: actual private key, defaults to :py:attr:`secret`
+        :type secret: str
+
+        :returns: headers dict carrying HTTP basic auth
+
+        """
+        if key is None or secret is None:
+            key = self.key
+            secret = self.secret
+
+        if key is None or secret is None:
+            raise Exception('Either key or secret is not set! (Use `load_key()`.')
+
+        if (key, secret) != self._auth_pair:
+            token = base64.b64encode(('%s:%s' % (key, secret)).encode('latin1')).decode('ascii')
+            self._auth_header = {'Authorization': 'Basic ' + token}
+            self._auth_pair = (key, secret)
+        return self._auth_header
+
+    def _attempt(self, endpoint, method, path, data=None, headers=None):
+        """ One round trip on the pooled session, decoded from JSON,
+        classified and recorded in :py:attr:`metrics`.
+
+        :raises TransientError: timeouts, connection failures, 5xx, 429 and
+            non-JSON bodies
+        """
+        token = self.metrics.begin(endpoint) if self.metrics is not None else None
+        outcome = 'error'
+        try:
+            try:
+                resp = self.session.request(method, self.uri + path, data=data, headers=headers,
+                                            timeout=self.timeouts[endpoint])
+            except requests.Timeout as exc:
+                raise RequestTimeout(endpoint, exc)
+            except requests.ConnectionError as exc:
+                raise ConnectionFailed(endpoint, exc)
+            except requests.RequestException as exc:
+                # chunked/decoding errors, redirect loops, bad URLs: no usable answer
+                raise ConnectionFailed(endpoint, exc)
+            outcome = resp.status_code
+            if resp.status_code == 429:
+                raise RateLimited(endpoint, 'HTTP 429', 429, parse_retry_after(resp.headers.get('Retry-After')))
+            if resp.status_code >= 500:
+                raise ServerError(endpoint, 'HTTP %d' % resp.status_code, resp.status_code)
+            try:
+                return loads(resp.content)
+            except ValueError:
+                outcome = 'bad_body'
+                raise BadResponse(endpoint, 'not JSON: %r' % resp.text[:80], resp.status_code)
+        except (RequestTimeout, ConnectionFailed) as exc:
+            outcome = exc.kind
+            raise
+        finally:
+            if token is not None:
+                self.metrics.end(token, outcome)
+
+    def _send(self, endpoint, method, path, data=None, headers=None, bucket=None):
+        """ Send through the endpoint's circuit breaker, retrying idempotent
+        reads on transient failures with full-jitter exponential backoff.
+        ``bucket``, if given, is charged one token per attempt sent.
+
+        :raises CircuitOpen: the endpoint's circuit is open
+        :raises TransientError: every attempt failed
+        """
+        breaker = self.breakers[endpoint]
+        attempts = 1 + (self.retries if endpoint in IDEMPOTENT_ENDPOINTS else 0)
+        for attempt in range(attempts):
+            if not breaker.allow():
+                raise CircuitOpen(endpoint, 'circuit open, retry in %.1fs' % breaker.retry_in())
+            try:
+                if bucket is not None:
+                    bucket.acquire()
+                body = self._attempt(endpoint, method, path, data, headers)
+            except TransientError as exc:
+                breaker.failure()
+                if attempt + 1 >= attempts:
+                    raise
+                base, cap = self.backoff
+                delay = random.uniform(0, min(cap, base * 2 ** attempt))
+                if isinstance(exc, RateLimited) and exc.retry_after:
+                    delay = max(delay, exc.retry_after)
+                logging.info("[Spike] %s, retrying in %.2fs", exc, delay)
+                time.sleep(delay)
+                continue
+            except BaseException:
+                # anything else must still settle a half-open trial, or the
+                # circuit would refuse every later request
+                breaker.failure()
+                raise
+            breaker.success()
+            return body
+
+    def available(self, endpoint):
+        """ Whether ``endpoint``'s circuit lets requests through (a half-open
+        circuit counts: the next request is its trial). """
+        return self.breakers[endpoint].available()
+
+    def breaker_states(self):
+        """ {endpoint: 'closed' | 'open' | 'half_open'} """
+        return {endpoint: breaker.state for endpoint, breaker in self.breakers.items()}
+
+    def _fetch(self, endpoint, path, headers=None, bucket=None):
+        return self._send(endpoint, 'GET', path, headers=headers, bucket=bucket)
+
+    def _get(self, endpoint, path, headers=None):
+        """ GET :py:attr:`uri` + path on the pooled session and retain the
+        decoded body as :py:attr:`response`. """
+        self.response = self._fetch(endpoint, path, headers)
+        return self.response
+
+    def _public(self, endpoint, market, path, bucket=None):
+        """ GET a public endpoint through :py:attr:`cache` when enabled.
+        ``bucket`` is only charged for requests that actually go out. """
+        def fetch():
+            return self._fetch(endpoint, path, bucket=bucket)
+        self.response = fetch() if self.cache is None else self.cache.get(endpoint, market, fetch)
+        return self.response
+
+    def _poll(self, endpoint, market, bucket=None):
+        """ 'ticker' or 'history' for :py:class:`stream.PollFeed`: like the
+        public query, but charging ``bucket`` for every attempt sent (cache
+        hits are free). """
+        return self._public(endpoint, market, '/%s/%s' % (endpoint, market), bucket)
+
+    def _post(self, endpoint, path, data, headers=None):
+        """ POST form data to :py:attr:`uri` + path on the pooled session and
+        retain the decoded body as :py:attr:`response`. """
+        self.response = self._send(endpoint, 'POST', path, data, headers)
+        return self.response
+
+    def close(self):
+        """ Release the pooled connections held by :py:attr:`session`. """
+        self.session.close()
+
+    def stream(self, markets, channels=CHANNELS, push_uri=None, poll_secs=None, bucket=None):
+        """ Subscribe to ticker and trade updates for ``markets``.
+
+        :param markets: markets such as ['XTM-USDT']
+        :param channels: (optional) any of 'ticker', 'trades'
+        :param push_uri: (optional) Server-Sent Events endpoint to read
+            updates from as they happen; without one the feed polls this
+            client and drops repeats
+        :param poll_secs: (optional) seconds between polls; defaults to
+            :py:data:`stream.DEFAULT_POLL_SECS` or the ticker's fresh TTL in
+            :py:attr:`cache`, whichever is longer, since polling faster than
+            that only re-reads the cached tick
+        :param bucket: (optional) :py:class:`ratelimit.TokenBucket` charged
+            for each poll that reaches the exchange
+
+        :returns: an unstarted :py:class:`stream.MarketFeed`; ``subscribe()``
+            callbacks or ``async for event in feed.events()``, then ``start()``
+        """
+        if push_uri:
+            return PushFeed(push_uri, markets, channels)
+        if poll_secs is None:
+            poll_secs = max(DEFAULT_POLL_SECS, self.cache.ttls['ticker'][0] if self.cache is not None else 0)
+        return PollFeed(self, markets, channels, poll_secs, bucket)
+
+    def fetch_market_price(self):
+        # Example: fetch current price from /api/v1/ticker/USDC-USDT
+        resp = self.session.get(self.uri + "/ticker/USDC-USDT", timeout=self.timeouts['ticker'])
+        ticker = resp.json()
+        return float(ticker["price"])
+
+    def fetch_balance(self):
+        # Example: GET your balance via POST /api/v1/account/balance
+        # Replace with your signed API call!
+        payload = {"method": "balance"}
+        headers = {
+           "Authorization": f"Token {self.key}:{self.secret}"
+        }
+        resp = self.session.post(
+            self.uri + "/account/balance",
+            headers=headers,
+            data=payload,
+            timeout=self.timeouts['balance']
+        )
+        return resp.json()
+
+    def fetch_orders(self):
+        # Replace with your signed call to /api/v1/orders
+        payload = {"market": "USDC-USDT"}
+        headers = {
+           "Authorization": f"Token {self.key}:{self.secret}"
+        }
+        resp = self.session.post(self.uri + "/orders", headers=headers, data=payload, timeout=self.timeouts['orders'])
+        return resp.json()  # Returns list of open orders
+
+    def place_buy_order(self, price):
+        payload = {
+            "market": "USDC-USDT",
+            "type": "buy",
+            "quantity": str(self.order_amount),
+            "price": str(price)
+        }
+        resp = self.session.post(self.uri + "/order/buy", data=payload, headers=self._auth(), timeout=self.timeouts['buy'])
+        import logging
+        logging.info(f"[Spike] Order placed: {side.upper()} {amount}@{price}. Buy order POST status: {resp.status_code},body: {resp.text!r}")
+        try:
+            data = resp.json
+        except Exception as e:
+            logging.error(f"[Spike] Tried to parse that response—guess it wasn’t a noodle recipe. Just noise. Response: {resp}")
+            return None
+
+    def place_sell_order(self, price, quantity):
+        payload = {
+            "market": "USDC-USDT",
+            "type": "sell",
+            "quantity": str(quantity),
+            "price": str(price)
+        }
+        resp = self.session.post(self.uri + "/order/sell", data=payload, headers=self._auth(), timeout=self.timeouts['sell'])
+        import logging
+        logging.info(f"[Spike] Sell-Order placed: {side.upper()} {amount}@{price}. Let’s see if anyone bites.")
+        try:
+            data = resp.json()
+        except Exception as e:
+            logging.error(f"[Spike] Tried to parse that response—guess it wasn’t a noodle recipe. Just noise. Response: {resp}")
+            return None
+
+    def cancel_order(self, order_id):
+        payload = {"order_id": order_id}
+
+        resp = self.session.post(self.uri + "/order/cancel", data=payload, headers=self._auth(), timeout=self.timeouts['cancel'])
+        import logging
+        logging.info(f"Cancel order POST status: {resp.status_code}, body: {resp.text!r}")
+        try:
+            data = resp.json()
+        except Exception as e:
+            logging.error(f"Non-JSON response: status={resp.status_code}, body={resp.text!r}")
+            return None
+
+    def shutdown(self):
+        import logging
+        self.close()
+        logging.info("Grid bot shutdown cleanly. Console cowboy out.")
+
+    def plan_cycle(self, price, orders, balances):
+        """ Desired-state plan for :py:meth:`cycle`: buys on the grid from
+        ``min_price`` every ``grid_spacing`` up to ``max_price``, below the
+        current price and at most ``max_active_orders`` of them, plus one
+        sell of the whole USDC balance at ``sell_price`` if that is set.
+
+        Prices are compared as whole units of the market's tick
+        (``tick_size``, else TradeOgre's 8 decimals), so live orders are
+        matched in one dict lookup each whatever float noise their price
+        strings carry. Buys the bot placed (:py:attr:`cycle_orders`) that are
+        off the grid, above the price, duplicated or past the
+        ``max_active_orders`` nearest the price are cancelled; manual orders
+        are left alone but still fill their slot. Sells are only ever added.
+
+        :param price: current price
+        :param orders: ``orders()`` response for :py:data:`CYCLE_MARKET`
+        :param balances: ``balances()`` response
+        :returns: :py:class:`CyclePlan`
+        """
+        market = CYCLE_MARKET
+        decimals = tick_decimals(self.tick_size) if self.tick_size else PRICE_DECIMALS
+        lowest = to_units(self.min_price, decimals)
+        highest = to_units(self.max_price, decimals)
+        spacing = max(1, to_units(self.grid_spacing, decimals))
+        below = int(math.ceil(price * 10 ** decimals - 1e-6)) - 1  # highest unit strictly under the price
+        qty = Fixed.parse(self.order_amount, QTY_DECIMALS)
+        top = min(highest, below)
+        # nearest the price first, so max_active_orders trims from the bottom
+        wanted = [] if top < lowest else list(range(top - (top - lowest) % spacing, lowest - 1, -spacing))
+        wanted = wanted[:self.max_active_orders]
+
+        live = {}
+        for order in orders if isinstance(orders, list) else ():
+            if order.get('market', market) == market:
+                key = (order['type'], to_units(order['price'], decimals))
+                live.setdefault(key, []).append(order)
+        wanted_set = set(wanted)
+        own = self.cycle_orders
+        cancels = []
+        for (side, tick), found in live.items():
+            if side != 'buy':
+                continue
+            if tick in wanted_set:
+                # one order keeps the slot, a manual one first
+                found = sorted(found, key=lambda o: o['uuid'] in own)[1:]
+            cancels.extend(o['uuid'] for o in found if o['uuid'] in own)
+
+        ledger = BalanceLedger()
+        ledger.seed(balances, orders)
+        for uuid in cancels:
+            ledger.release(uuid)
+        places = []
+        for tick in wanted:
+            buy_price = Fixed(tick, decimals)
+            if ('buy', tick) in live:
+                continue
+            if not ledger.can_afford('buy', market, qty, buy_price):
+                logging.info("[Spike] Well, that didn’t go as planned. Might need a bigger ship—or a better crew! Not enough USDT!!!")
+                break
+            ledger.reserve(('planned', tick), 'buy', market, qty, buy_price)
+            places.append({'market': market, 'qty': qty, 'side': 'buy', 'price': buy_price,
+                           'status': 'pending', 'uuid': None, 'error': None})
+        if self.sell_price:
+            usdc = ledger.available(ticker_base_currency(market))
+            sell_tick = to_units(self.sell_price, decimals)
+            if usdc * self.sell_price >= MIN_NOTIONAL and ('sell', sell_tick) not in live:
+                # whole balance, rounded down so it never asks for more than there is
+                places.append({'market': market, 'qty': Fixed(int(usdc * 10 ** QTY_DECIMALS), QTY_DECIMALS),
+                               'side': 'sell', 'price': Fixed(sell_tick, decimals), 'status': 'pending',
+                               'uuid': None, 'error': None})
+        return CyclePlan(cancels, places, len(live))
+
+    def cycle(self):
+        """ One pass of the USDC-USDT grid: fetch price, balances and open
+        orders, build a :py:meth:`plan_cycle` and run its cancels, then its
+        placements, each as one concurrent batch.
+
+        :returns: report dict (``cancels``, ``places``, ``placed``,
+            ``plan_ms``, ``exec_ms``), or None if the cycle was skipped
+        """
+        try:
+            market = CYCLE_MARKET
+
+            ticker = self.ticker(market)
+            if "price" not in ticker:
+                logging.warning("No 'price' in ticker! Full ticker response: %r", ticker)
+                return None
+            price = float(ticker["price"])
+            balances = self.balances()
+            orders = self.orders(market)
+            logging.debug(f"Fetched orders: {orders}")
+            if not isinstance(orders, list):
+                logging.warning("Orders came back funny: %r", orders)
+                return None
+
+            started = time.perf_counter()
+            self.cycle_orders.intersection_update(order['uuid'] for order in orders)  # filled ones are gone
+            plan = self.plan_cycle(price, orders, balances)
+            planned = time.perf_counter()
+            cancelled = cancel_orders(self, plan.cancels)
+            submit_rows(self, plan.places)
+            done = time.perf_counter()
+            self.cycle_orders.difference_update(uuid for uuid, ok in cancelled.items() if ok)
+            self.cycle_orders.update(row['uuid'] for row in plan.places if row['status'] == 'placed')
+
+            report = {'cancels': len(plan.cancels), 'places': len(plan.places),
+                      'cancelled': sum(1 for ok in cancelled.values() if ok),
+                      'placed': sum(1 for row in plan.places if row['status'] == 'placed'),
+                      'plan_ms': (planned - started) * 1000, 'exec_ms': (done - planned) * 1000}
+            for row in plan.places:
+                if row['status'] != 'placed':
+                    logging.info(f"[Spike] {row['side']} at {row['price']} didn't stick: {row['error']}")
+            logging.info("[Spike] Cycle plan: {cancels} cancels ({cancelled} done), {places} orders "
+                         "({placed} placed); planned in {plan_ms:.2f} ms, executed in {exec_ms:.0f} ms.".format(**report))
+            return report
+        except Exception as e:
+            logging.exception(f"Error in cycle: {e}")
+
+    def load_key(self, path):
+        """ Load key and secret from file.
+        Expected file format is key and secret on separate lines.
+
+        :param path: path to keyfile
+        :type path: str
+
+        :returns: None
+
+        """
+        #print(path)#debug
+
+        with open(path, 'r') as f:
+            self.key = f.readline().strip()
+            self.secret = f.readline().strip()
+        return
+
+    def markets(self):
+        """ Retrieve a listing of all markets and basic information
+        including current price, volume, high, low, bid and ask.
+
+        :returns: :py:meth:`requests.Response.json`-deserialised Python object
+
+        """
+        return self._public('markets', None, '/markets')
+
+    def order_book(self, market):
+        """ Retrieve the current order book for a market such as 'BTC-XMR'.
+
+        :param market: market such as 'BTC-XMR'
+        :type market: str
+
+        :returns: :py:meth:`requests.Response.json`-deserialised Python object
+
+        """
+        return self._public('order_book', market, '/orders/' + market)
+
+    def ticker(self, market):
+        """ Retrieve the ticker for a market such as 'BTC-XMR', volume,
+        high, and low are in the last 24 hours, initial price is the
+        price from 24 hours ago.
+
+        :param market: market such as 'BTC-XMR'
+        :type market: str
+
+        :returns: :py:meth:`requests.Response.json`-deserialised Python object
+
+        """
+        return self._public('ticker', market, '/ticker/' + market)
+
+    def history(self, market):
+        """ Retrieve the history of the last trades on {market} limited to 100
+        of the most recent trades. The date is a Unix UTC timestamp.
+
+        :param market: market such as 'BTC-XMR'
+        :type market: str
+
+        :returns: :py:meth:`requests.Response.json`-deserialised Python object
+
+        """
+        return self._public('history', market, '/history/' + market)
+
+    def balance(self, currency, key=None, secret=None):
+        """ Get the balance of a specific currency for you account. The currency
+        field is required, such as 'BTC'. The total balance is returned and the
+        available balance is what can be used in orders or withdrawn.
+
+        :param currency: currency such as 'BTC'
+        :type currency: str
+
+        :param key: key identifier
+        :type key: str
+
+        :param secret: actual private key
+        :type secret: str
+
+        :returns: :py:meth:`requests.Response.json`-deserialised Python object
+
+        """
+        headers = self._auth(key, secret)
+
+        data = {"currency": currency}
+        return self._post('balance', '/account/balance', data, headers)
+
+    def balances(self, key=None, secret=None):
+        """ Retrieve all balances for your account.
+
+        :returns: :py:meth:`requests.Response.json`-deserialised Python object
+
+        """
+        headers = self._auth(key, secret)
+
+        return self._get('balances', '/account/balances', headers)
+
+    def buy(self, market, qty, price, key=None, secret=None):
+        """ Submit a buy order to the order book for a market. The success status
+        will be false if there is an error, and error will contain the error message.
+        Your available buy and sell balance for the market will be returned if
+        successful. If your order is successful but not fully fulfilled, the order
+        is placed onto the order book and you will receive a uuid for the order.
+
+        :param market: market such as 'BTC-XMR'
+        :type market: str
+
+        :param qty: quantity to buy
+        :type qty: str
+
+        :param price: price to buy for
+        :type price: str
+
+        :param key: key identifier
+        :type key: str
+
+        :param secret: actual private key
+        :type secret: str
+
+        :returns: :py:meth:`requests.Response.json`-deserialised Python object
+
+        """
+        headers = self._auth(key, secret)
+
+        data = {"market": market, "quantity": qty, "price": price}
+        return self._post('buy', '/order/buy', data, headers)
+
+    def sell(self, market, qty, price, key=None, secret=None):
+        """ Submit a sell order to the order book for a market. The success status
+        will be false if there is an error, and error will contain the error
+        message. Your available buy and sell balance for the market will be returned
+        if successful. If your order is successful but not fully fulfilled, the order
+        is placed onto the order book and you will receive a uuid for the order.
+
+        :param market: market such as 'BTC-XMR'
+        :type market: str
+
+        :param qty: quantity to sell
+        :type qty: str
+
+        :param price: price to sell for
+        :type price: str
+
+        :param key: key identifier
+        :type key: str
+
+        :param secret: actual private key
+        :type secret: str
+
+        :returns: :py:meth:`requests.Response.json`-deserialised Python object
+
+        """
+        headers = self._auth(key, secret)
+
+        data = {"market": market, "quantity": qty, "price": price}
+        return self._post('sell', '/order/sell', data, headers)
+
+    def order(self, uuid, key=None, secret=None):
+        """ Retrieve information about a specific order by the
+        uuid of the order. Date is a Unix UTC timestamp.
+
+        :param uuid: ID of order
+        :type uuid: str
+
+        :param key: key identifier
+        :type key: str
+
+        :param secret: actual private key
+        :type secret: str
+
+        :returns: :py:meth:`requests.Response.json`-deserialised Python object
+
+        """
+        headers = self._auth(key, secret)
+
+        return self._get('order', '/account/order/' + uuid, headers)
+
+    def orders(self, market=None, key=None, secret=None):
+        """ Retrieve the active orders under your account. The market
+        field is optional, and leaving it out will return all orders
+        in every market. date is a Unix UTC timestamp.
+
+        :param market: (optional) market to list orders from
+        :type market: str
+
+        :param key: key identifier
+        :type key: str
+
+        :param secret: actual private key
+        :type secret: str
+
+        :returns: :py:meth:`requests.Response.json`-deserialised Python object
+
+        """
+        headers = self._auth(key, secret)
+
+        if market is None:
+            market = ''
+
+        data = {"market": market}
+        return self._post('orders', '/account/orders', data, headers)
+
+    def cancel(self, uuid, key=None, secret=None):
+        """ Cancel an order on the order book based on the order uuid.
+        The uuid parameter can also be set to all and all of your
+        orders will be cancelled across all markets.
+
+        :param uuid: ID of order to cancel
+        :type uuid: str
+
+        :param key: key identifier
+        :type key: str
+
+        :param secret: actual private key
+        :type secret: str
+
+        :returns: :py:meth:`requests.Response.json`-deserialised Python object
+
+        """
+        headers = self._auth(key, secret)
+
+        data = {"uuid": uuid}
+        return self._post('cancel', '/order/cancel', data, headers)
+
+
+class AsyncTradeOgre(object):
+    """ asyncio counterpart of :py:class:`TradeOgre` with the same query
+    surface, built on one keep-alive :py:class:`aiohttp.ClientSession`.
+
+    One instance is meant to be shared by every grid running on an event
+    loop: independent queries can be awaited together (``asyncio.gather``)
+    and are multiplexed over at most ``pool_size`` pooled connections, which
+    also bounds how hard the bot leans on the exchange at once.
+
+    The session is opened lazily on the first query so the object can be
+    built outside a running loop. :py:attr:`response` holds the body of the
+    most recently completed query.
+
+    Failures are raised as the same :py:class:`TradeOgreError` subclasses
+    as the blocking client's, but nothing is retried, there are no circuit
+    breakers and nothing is recorded in metrics: the caller decides what to
+    do with a :py:class:`TransientError`.
+    """
+
+    def __init__(self, key=None, secret=None, pool_size=DEFAULT_POOL_SIZE, timeouts=None):
+        """ Create an object with authentication information.
+
+        :param key: (optional) key identifier for queries to the API
+        :type key: str
+
+        :param secret: (optional) actual private key used to sign messages
+        :type secret: str
+
+        :param pool_size: (optional) maximum simultaneous connections
+        :type pool_size: int
+
+        :param timeouts: (optional) per-endpoint overrides of
+            :py:data:`DEFAULT_TIMEOUTS`, e.g. ``{'buy': (2, 5)}``
+        :type timeouts: dict
+
+        :returns: None
+
+        """
+        if aiohttp is None:
+            raise Exception('AsyncTradeOgre needs aiohttp (pip install aiohttp).')
+        self.key = key
+        self.secret = secret
+        self.uri = 'https://tradeogre.com/api/v1'
+        self.response = None
+        self.pool_size = pool_size
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        self.timeouts.update(timeouts or {})
+        self._client_timeouts = {}
+        for endpoint, (connect, read) in self.timeouts.items():
+            self._client_timeouts[endpoint] = aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+        self.session = None
+        self._auth_pair = None
+        self._auth_header = None
+        return
+
+    # Credential handling is identical to the blocking client.
+    _auth = TradeOgre._auth
+    load_key = TradeOgre.load_key
+
+    def _session(self):
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=30)
+            self.session = aiohttp.ClientSession(connector=connector)
+        return self.session
+
+    async def _attempt(self, endpoint, method, path, data=None, headers=None):
+        """ One round trip on the pooled session, decoded from JSON and
+        classified like :py:meth:`TradeOgre._attempt`.
+
+        :raises TransientError: timeouts, connection failures, 5xx, 429 and
+            non-JSON bodies
+        """
+        try:
+            async with self._session().request(method, self.uri + path, data=data, headers=headers,
+                                               timeout=self._client_timeouts[endpoint]) as resp:
+                status = resp.status
+                retry_after = resp.headers.get('Retry-After')
+                body = await resp.read()
+        except asyncio.TimeoutError as exc:
+            raise RequestTimeout(endpoint, str(exc) or 'timed out')
+        except aiohttp.ClientError as exc:
+            raise ConnectionFailed(endpoint, exc)
+        if status == 429:
+            raise RateLimited(endpoint, 'HTTP 429', 429, parse_retry_after(retry_after))
+        if status >= 500:
+            raise ServerError(endpoint, 'HTTP %d' % status, status)
+        try:
+            return loads(body)
+        except ValueError:
+            raise BadResponse(endpoint, 'not JSON: %r' % body[:80], status)
+
+    async def _get(self, endpoint, path, headers=None):
+        """ GET :py:attr:`uri` + path on the pooled session and retain the
+        decoded body as :py:attr:`response`. """
+        self.response = await self._attempt(endpoint, 'GET', path, headers=headers)
+        return self.response
+
+    async def _post(self, endpoint, path, data, headers=None):
+        """ POST form data to :py:attr:`uri` + path on the pooled session and
+        retain the decoded body as :py:attr:`response`. """
+        self.response = await self._attempt(endpoint, 'POST', path, data, headers)
+        return self.response
+
+    async def close(self):
+        """ Close the pooled session. A later query opens a fresh one. """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def markets(self):
+        """ See :py:meth:`TradeOgre.markets`. """
+        return await self._get('markets', '/markets')
+
+    async def order_book(self, market):
+        """ See :py:meth:`TradeOgre.order_book`. """
+        return await self._get('order_book', '/orders/' + market)
+
+    async def ticker(self, market):
+        """ See :py:meth:`TradeOgre.ticker`. """
+        return await self._get('ticker', '/ticker/' + market)
+
+    async def history(self, market):
+        """ See :py:meth:`TradeOgre.history`. """
+        return await self._get('history', '/history/' + market)
+
+    async def balance(self, currency, key=None, secret=None):
+        """ See :py:meth:`TradeOgre.balance`. """
+        headers = self._auth(key, secret)
+        return await self._post('balance', '/account/balance', {"currency": currency}, headers)
+
+    async def balances(self, key=None, secret=None):
+        """ See :py:meth:`TradeOgre.balances`. """
+        headers = self._auth(key, secret)
+        return await self._get('balances', '/account/balances', headers)
+
+    async def buy(self, market, qty, price, key=None, secret=None):
+        """ See :py:meth:`TradeOgre.buy`. """
+        headers = self._auth(key, secret)
+        data = {"market": market, "quantity": qty, "price": price}
+        return await self._post('buy', '/order/buy', data, headers)
+
+    async def sell(self, market, qty, price, key=None, secret=None):
+        """ See :py:meth:`TradeOgre.sell`. """
+        headers = self._auth(key, secret)
+        data = {"market": market, "quantity": qty, "price": price}
+        return await self._post('sell', '/order/sell', data, headers)
+
+    async def order(self, uuid, key=None, secret=None):
+        """ See :py:meth:`TradeOgre.order`. """
+        headers = self._auth(key, secret)
+        return await self._get('order', '/account/order/' + uuid, headers)
+
+    async def orders(self, market=None, key=None, secret=None):
+        """ See :py:meth:`TradeOgre.orders`. """
+        headers = self._auth(key, secret)
+        if market is None:
+            market = ''
+        return await self._post('orders', '/account/orders', {"market": market}, headers)
+
+    async def cancel(self, uuid, key=None, secret=None):
+        """ See :py:meth:`TradeOgre.cancel`. """
+        headers = self._auth(key, secret)
+        return await self._post('cancel', '/order/cancel', {"uuid": uuid}, headers)